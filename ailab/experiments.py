@@ -0,0 +1,262 @@
+# experiments.py
+#
+# Time/memory comparison of the solvers (the day 5 results_summary.csv and
+# its plots), measured reproducibly. Every (solver, parameter) point runs in
+# a fresh interpreter, so one run's allocations and ru_maxrss high-water mark
+# cannot leak into the next. Inside the child the instance is built outside
+# the clock, the run is repeated after --warmup unmeasured runs, and one
+# extra run under tracemalloc gives the peak Python allocation (NumPy
+# buffers included).
+#
+# A spec is NAME or NAME:P1,P2,... and P is the solver's sweep parameter:
+#   bfs dfs ucs ils    Hanoi disc count (none: the day 5 river crossing)
+#   dls ids            depth limit on the river crossing
+#   hanoi hanoi-bidir  disc count (ailab.hanoi)
+#   npuzzle            length of a random scramble of the 15-puzzle (IDA*, MD + LC)
+#   tsp                random cities (ailab.tsp.anneal, 10000 iterations)
+#   games              board size, perfect play from the empty board
+#
+# The CSV keeps the day 5 columns (algorithm, param, time, memory; memory is
+# the tracemalloc peak in KB) followed by nodes, nodes/s, the time spread and
+# the child's maxrss; `plot` redraws the day 5 figures from it.
+#
+#   python -m ailab.experiments run [SPEC ...] [--repeat 5] [--warmup 1] [--out results.csv]
+#   python -m ailab.experiments plot results.csv [--prefix day5_]
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+DAY5 = ['bfs', 'dfs', 'dls:2,3,4', 'ids:2,3,4', 'ucs', 'ils']
+FIELDS = ['algorithm', 'param', 'time', 'memory', 'nodes', 'nodes_per_s', 'time_min', 'time_max',
+          'repeat', 'maxrss_kb']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _search(algo):
+    def setup(param, seed):
+        from ailab import search
+        from ailab.problems import Hanoi, RiverCrossing
+        fn = getattr(search, algo)
+        if algo in ('dls', 'ids'):
+            problem = RiverCrossing()
+            return lambda: fn(problem, int(param)).expanded
+        problem = RiverCrossing() if param is None else Hanoi(int(param))
+        if algo == 'ils':
+            return lambda: fn(problem, seed=seed).expanded
+        return lambda: fn(problem).expanded
+    return setup
+
+
+def _hanoi(bidirectional):
+    def setup(param, seed):
+        from ailab import hanoi
+        n = int(param or 10)
+        fn = hanoi.bidirectional if bidirectional else hanoi.bfs
+        return lambda: fn(n, [0] * n, [2] * n).expanded
+    return setup
+
+
+def _npuzzle(param, seed):
+    from ailab.npuzzle import Board, solve
+    size, steps = 4, int(param or 30)
+    goal = list(range(1, size * size)) + [0]
+    tiles, blank, prev = goal[:], size * size - 1, None
+    rnd = random.Random(seed)
+    bd = Board(size)
+    for _ in range(steps):
+        nxt = [q for q, _ in bd.nbrs[blank] if q != prev]
+        q = rnd.choice(nxt)
+        tiles[blank], tiles[q] = tiles[q], 0
+        prev, blank = blank, q
+    return lambda: solve(size, tiles, goal).expanded
+
+
+def _tsp(param, seed):
+    import numpy as np
+    from ailab.tsp import TSP, anneal
+    n = int(param or 1000)
+    inst = TSP(coords=np.random.default_rng(seed).uniform(0, 1000, (n, 2)))
+    iterations = 10000
+
+    def run():
+        anneal(inst, iterations=iterations, seed=seed)
+        return iterations
+    return run
+
+
+def _games(param, seed):
+    from ailab.games import Engine, Game
+    g = Game(int(param or 3))
+
+    def run():
+        eng = Engine(g)
+        eng.search(g.position())
+        return eng.nodes
+    return run
+
+
+SOLVERS = {
+    'bfs': _search('bfs'), 'dfs': _search('dfs'), 'dls': _search('dls'),
+    'ids': _search('ids'), 'ucs': _search('ucs'), 'ils': _search('ils'),
+    'hanoi': _hanoi(False), 'hanoi-bidir': _hanoi(True),
+    'npuzzle': _npuzzle, 'tsp': _tsp, 'games': _games,
+}
+
+
+def parse_spec(spec):
+    # 'dls:2,3,4' -> [('dls', '2'), ('dls', '3'), ('dls', '4')]; 'bfs' -> [('bfs', None)]
+    name, _, params = spec.partition(':')
+    if name not in SOLVERS:
+        raise ValueError(f"unknown solver {name!r} (one of {', '.join(SOLVERS)})")
+    return [(name, p) for p in params.split(',')] if params else [(name, None)]
+
+
+def child(name, param, repeat, warmup, seed):
+    # runs in the isolated interpreter; returns the measurement dict
+    run = SOLVERS[name](param, seed)
+    for _ in range(warmup):
+        run()
+    times = []
+    nodes = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        nodes = run()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'times': times, 'nodes': int(nodes), 'peak_kb': peak / 1024,
+            'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def measure(name, param=None, repeat=5, warmup=1, seed=0, timeout=None):
+    # one point in a fresh interpreter; returns a results row
+    cmd = [sys.executable, '-m', 'ailab.experiments', 'child', name, '' if param is None else str(param),
+           '--repeat', str(repeat), '--warmup', str(warmup), '--seed', str(seed)]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    p = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=timeout)
+    if p.returncode:
+        raise RuntimeError(f"{name} {param}: child failed\n{p.stderr[-2000:]}")
+    m = json.loads(p.stdout.strip().splitlines()[-1])
+    t = statistics.median(m['times'])
+    return {'algorithm': name.upper(), 'param': '' if param is None else param,
+            'time': t, 'memory': round(m['peak_kb'], 1), 'nodes': m['nodes'],
+            'nodes_per_s': round(m['nodes'] / t, 1) if t else 0.0,
+            'time_min': min(m['times']), 'time_max': max(m['times']),
+            'repeat': repeat, 'maxrss_kb': m['maxrss_kb']}
+
+
+def run(specs, out=None, repeat=5, warmup=1, seed=0, timeout=None, log=print):
+    points = [pt for spec in specs for pt in parse_spec(spec)]
+    rows = []
+    for name, param in points:
+        row = measure(name, param, repeat, warmup, seed, timeout)
+        rows.append(row)
+        if log:
+            log(f"{row['algorithm']:12s} {str(row['param']):>6s}  time={row['time']:9.4f}s  "
+                f"nodes={row['nodes']:10d}  {row['nodes_per_s']:12.0f} nodes/s  peak={row['memory']:10.1f} KB")
+        if out:
+            write(out, rows)
+    return rows
+
+
+def write(path, rows):
+    # CSV, or JSON lines for a .jsonl path
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.jsonl'):
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        else:
+            w = csv.DictWriter(f, FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+
+
+def load(path):
+    with open(path) as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def plot(path, prefix='', outdir='.'):
+    # the day 5 figures: time and memory bars over every row, and time /
+    # memory against the parameter for each algorithm that was swept
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    rows = load(path)
+    labels = [f"{r['algorithm']}{r['param']}" for r in rows]
+    saved = []
+
+    def save(name):
+        fn = os.path.join(outdir, f"{prefix}{name}.png")
+        plt.savefig(fn)
+        plt.close()
+        saved.append(fn)
+
+    for key, unit, title in (('time', 'Time (seconds)', 'Time'), ('memory', 'Memory (KB)', 'Memory')):
+        plt.figure(figsize=(8, 4))
+        plt.bar(labels, [float(r[key]) for r in rows])
+        plt.ylabel(unit)
+        plt.title(f"Algorithm {title} Comparison")
+        save(f"algorithm_{key}_comparison")
+    for algo in dict.fromkeys(r['algorithm'] for r in rows):
+        sub = [r for r in rows if r['algorithm'] == algo and str(r['param']) != '']
+        if len(sub) < 2:
+            continue
+        xs = [float(r['param']) for r in sub]
+        what = 'depth' if algo in ('DLS', 'IDS') else 'size'
+        for key, unit, title in (('time', 'Time (seconds)', 'Time'), ('memory', 'Memory (KB)', 'Memory')):
+            plt.figure(figsize=(8, 4))
+            plt.plot(xs, [float(r[key]) for r in sub], marker='o')
+            plt.xlabel("Depth Limit" if what == 'depth' else "Size")
+            plt.ylabel(unit)
+            plt.title(f"{algo} {title} vs {what.capitalize()}")
+            save(f"{algo.lower()}_{key}_vs_{what}")
+    return saved
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.experiments')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    r = sub.add_parser('run')
+    r.add_argument('specs', nargs='*', help='NAME or NAME:P1,P2 (default: the day 5 set)')
+    r.add_argument('--repeat', type=int, default=5)
+    r.add_argument('--warmup', type=int, default=1)
+    r.add_argument('--seed', type=int, default=0)
+    r.add_argument('--timeout', type=float)
+    r.add_argument('--out', default='results_summary.csv')
+    c = sub.add_parser('child')
+    c.add_argument('name')
+    c.add_argument('param')
+    c.add_argument('--repeat', type=int, default=5)
+    c.add_argument('--warmup', type=int, default=1)
+    c.add_argument('--seed', type=int, default=0)
+    p = sub.add_parser('plot')
+    p.add_argument('results')
+    p.add_argument('--prefix', default='')
+    p.add_argument('--outdir', default='.')
+    args = ap.parse_args(argv)
+    if args.cmd == 'child':
+        print(json.dumps(child(args.name, args.param or None, args.repeat, args.warmup, args.seed)))
+    elif args.cmd == 'run':
+        run(args.specs or DAY5, args.out, args.repeat, args.warmup, args.seed, args.timeout)
+        print(f"Results written to {args.out}")
+    else:
+        for fn in plot(args.results, args.prefix, args.outdir):
+            print(f"Saved {fn}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,517 @@
+# games.py
+#
+# k-in-a-row on an n x n board (tic-tac-toe is n = k = 3) for the day 6
+# best-first search and the day 9 player.
+#
+# A position is two ints, one bit per cell for X and for O. Every winning
+# line is a precomputed mask, and each cell knows the lines through it, so a
+# move checks for a win, and updates the evaluation and the day 6 open-line
+# counts, from those lines only. Each position carries 8 Zobrist hashes, one
+# per symmetry of the square, updated with one XOR each per move. The smallest
+# is the transposition-table key, so mirrored and rotated positions share an
+# entry.
+#
+# Engine.search is iterative-deepening negamax with alpha-beta, the table's
+# move first and a history ordering after it. A side facing an immediate
+# loss only considers the blocking cells.
+#
+#   python -m ailab.games play [--size 4] [--k 4] [--time-limit 5]
+#   python -m ailab.games best-first "input (3).txt" [--steps steps.txt] [--out output.txt]
+#       [--trace-level off|summary|full] [--every N]
+#   python -m ailab.games solve --size 4
+
+import argparse
+import heapq
+import itertools
+import random
+import time
+
+from ailab.trace import LEVELS, Tracer
+
+WIN = 10 ** 9
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Game:
+    # geometry shared by every position on one board size
+
+    def __init__(self, n, k=None):
+        self.n = n
+        self.k = k = k or n
+        if not 1 <= k <= n:
+            raise ValueError('need 1 <= k <= n')
+        self.cells = n * n
+        self.full = (1 << self.cells) - 1
+        lines = []
+        for r in range(n):
+            for c in range(n):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    er, ec = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= er < n and 0 <= ec < n:
+                        lines.append(sum(1 << ((r + dr * i) * n + c + dc * i) for i in range(k)))
+        self.lines = lines
+        self.lines_at = [[L for L in lines if L >> c & 1] for c in range(self.cells)]
+        # evaluation weight of a line holding i pieces of one side only
+        self.weight = [0] + [10 ** (i - 1) for i in range(1, k)] + [0]
+        # cell permutations for the 8 symmetries (identity first)
+        maps = [lambda r, c: (r, c), lambda r, c: (c, n - 1 - r),
+                lambda r, c: (n - 1 - r, n - 1 - c), lambda r, c: (n - 1 - c, r),
+                lambda r, c: (r, n - 1 - c), lambda r, c: (n - 1 - r, c),
+                lambda r, c: (c, r), lambda r, c: (n - 1 - c, n - 1 - r)]
+        self.perm = [[f(*divmod(p, n))[0] * n + f(*divmod(p, n))[1] for p in range(self.cells)] for f in maps]
+        self.inv = [[0] * self.cells for _ in maps]
+        for s, pm in enumerate(self.perm):
+            for p, q in enumerate(pm):
+                self.inv[s][q] = p
+        rnd = random.Random(n * 100 + k)
+        self.zobrist = [[rnd.getrandbits(64) for _ in range(self.cells)] for _ in range(2)]
+        self.zside = rnd.getrandbits(64)
+        # static move order: cells on more lines first
+        self.centrality = [len(ls) for ls in self.lines_at]
+
+    def position(self, rows=None, turn='X'):
+        pos = Position(self)
+        if rows:
+            for r, row in enumerate(rows):
+                for c, ch in enumerate(row):
+                    if ch in 'XO':
+                        pos.place(r * self.n + c, ch == 'O')
+        pos.set_turn(turn)
+        return pos
+
+
+class Position:
+
+    def __init__(self, game):
+        self.g = game
+        self.bits = [0, 0]           # X, O
+        self.side = 0                # 0 = X to move
+        self.hash = [0] * 8
+        self.score = 0               # line evaluation, X positive
+        self.open = [len(game.lines), len(game.lines)]   # lines free of the other side
+        self.stack = []
+
+    @property
+    def turn(self):
+        return 'XO'[self.side]
+
+    def set_turn(self, turn):
+        side = 'XO'.index(turn)
+        if side != self.side:
+            self.side = side
+            self.hash = [h ^ self.g.zside for h in self.hash]
+
+    def empties(self):
+        return self.g.cells - (self.bits[0] | self.bits[1]).bit_count()
+
+    def moves(self):
+        free = self.g.full & ~(self.bits[0] | self.bits[1])
+        out = []
+        while free:
+            low = free & -free
+            out.append(low.bit_length() - 1)
+            free ^= low
+        return out
+
+    def place(self, c, side):
+        # put a piece down without switching turns; returns True if it
+        # completes a line
+        g = self.g
+        mine, theirs = self.bits[side], self.bits[1 - side]
+        w = g.weight
+        sign = 1 if side == 0 else -1
+        won = False
+        delta = 0
+        closed = 0
+        nm = mine | 1 << c
+        for L in g.lines_at[c]:
+            cnt = (mine & L).bit_count()
+            if cnt == 0:
+                closed += 1
+            if theirs & L:
+                continue
+            if cnt + 1 == g.k:
+                won = True
+            delta += w[cnt + 1] - w[cnt]
+        self.bits[side] = nm
+        self.score += sign * delta
+        self.open[1 - side] -= closed
+        z = g.zobrist[side]
+        self.hash = [h ^ z[pm[c]] for h, pm in zip(self.hash, g.perm)]
+        return won
+
+    def play(self, c):
+        self.stack.append((c, self.score, self.open[self.side ^ 1]))
+        won = self.place(c, self.side)
+        self.side ^= 1
+        zs = self.g.zside
+        self.hash = [h ^ zs for h in self.hash]
+        return won
+
+    def undo(self):
+        c, score, opn = self.stack.pop()
+        side = self.side = self.side ^ 1
+        self.bits[side] &= ~(1 << c)
+        self.score = score
+        self.open[1 - side] = opn
+        z, zs = self.g.zobrist[side], self.g.zside
+        self.hash = [h ^ z[pm[c]] ^ zs for h, pm in zip(self.hash, self.g.perm)]
+
+    def wins(self, side):
+        b = self.bits[side]
+        return any(b & L == L for L in self.g.lines)
+
+    def threats(self, side):
+        # empty cells that would complete a line for side
+        mine, theirs = self.bits[side], self.bits[1 - side]
+        k = self.g.k
+        out = set()
+        for L in self.g.lines:
+            if not theirs & L and (mine & L).bit_count() == k - 1:
+                out.add((L & ~mine).bit_length() - 1)
+        return out
+
+    def canonical(self):
+        h = min(self.hash)
+        return h, self.hash.index(h)
+
+    def rows(self):
+        x, o = self.bits
+        return [['X' if x >> (r * self.g.n + c) & 1 else 'O' if o >> (r * self.g.n + c) & 1 else '.'
+                 for c in range(self.g.n)] for r in range(self.g.n)]
+
+
+class Engine:
+
+    def __init__(self, game):
+        self.g = game
+        self.tt = {}
+        self.history = list(game.centrality)
+        self.nodes = 0
+
+    def evaluate(self, pos):
+        return pos.score if pos.side == 0 else -pos.score
+
+    def negamax(self, pos, depth, alpha, beta):
+        self.nodes += 1
+        g = self.g
+        empties = pos.empties()
+        key, sym = pos.canonical()
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            edepth, flag, val, cmove = entry
+            tt_move = g.inv[sym][cmove]
+            if edepth >= min(depth, empties):
+                if flag == EXACT or (flag == LOWER and val >= beta) or (flag == UPPER and val <= alpha):
+                    return val
+        mine = pos.threats(pos.side)
+        if mine:
+            # a win in one; the value depends only on the position, so it is
+            # cached as exact. Winning moves are only ever taken here, so no
+            # finished game is searched below.
+            c = min(mine)
+            val = WIN + empties - 1
+            self.tt[key] = (empties, EXACT, val, g.perm[sym][c])
+            return val
+        if depth == 0:
+            return self.evaluate(pos)
+        forced = pos.threats(pos.side ^ 1)
+        if forced:
+            moves = sorted(forced)
+        else:
+            hist = self.history
+            moves = sorted(pos.moves(), key=lambda c: -hist[c])
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        alpha0 = alpha
+        best, best_move = -WIN * 2, moves[0]
+        for c in moves:
+            pos.play(c)
+            if empties == 1:
+                val = 0
+            else:
+                val = -self.negamax(pos, depth - 1, -beta, -alpha)
+            pos.undo()
+            if val > best:
+                best, best_move = val, c
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        self.history[c] += depth * depth
+                        break
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        self.tt[key] = (min(depth, empties), flag, best, g.perm[sym][best_move])
+        return best
+
+    def search(self, pos, max_depth=None, time_limit=None):
+        # iterative deepening; returns (move, value, depth reached). value is
+        # from the side to move: > WIN/2 wins, < -WIN/2 loses, 0 at full depth
+        # is a draw
+        empties = pos.empties()
+        if not empties or pos.wins(0) or pos.wins(1):
+            return None, 0, 0
+        limit = min(max_depth or empties, empties)
+        t0 = time.perf_counter()
+        move = val = None
+        depth = 0
+        for depth in range(1, limit + 1):
+            val = self.negamax(pos, depth, -WIN * 2, WIN * 2)
+            key, sym = pos.canonical()
+            move = self.g.inv[sym][self.tt[key][3]]
+            if abs(val) > WIN // 2 or (time_limit and time.perf_counter() - t0 > time_limit):
+                break
+        return move, val, depth
+
+
+def solve(pos, engine=None):
+    # perfect play: +1 side to move wins, 0 draw, -1 loses, with the best move
+    engine = engine or Engine(pos.g)
+    move, val, _ = engine.search(pos)
+    return move, (val > WIN // 2) - (val < -WIN // 2)
+
+
+# ---- day 9 player
+
+def print_b(b, f=None):
+    s = '\n'.join(' '.join(r) for r in b) + '\n'
+    print(s)
+    if f:
+        f.write(s + '\n')
+
+
+def easy_move(pos, rnd=random):
+    return rnd.choice(pos.moves())
+
+
+def medium_move(pos, rnd=random):
+    # win if possible, else block, else random
+    for side in (pos.side, pos.side ^ 1):
+        t = pos.threats(side)
+        if t:
+            return min(t)
+    return easy_move(pos, rnd)
+
+
+def hard_move(pos, engine=None, max_depth=None, time_limit=None):
+    engine = engine or Engine(pos.g)
+    return engine.search(pos, max_depth, time_limit)[0]
+
+
+def play(n=3, k=None, out="output.txt", ask=input, max_depth=None, time_limit=None):
+    # the day 9 console game on any board size
+    g = Game(n, k)
+    pos = g.position()
+    engine = Engine(g)
+    with open(out, "w") as f:
+        print("Choose your symbol: X (first) or O (second)")
+        user = ask("Enter X or O: ").strip().upper()
+        while user not in ('X', 'O'):
+            user = ask("Enter X or O: ").strip().upper()
+        ai = 'O' if user == 'X' else 'X'
+        print("Choose difficulty: easy, medium, hard")
+        diff = ask("Enter difficulty: ").strip().lower()
+        while diff not in ('easy', 'medium', 'hard'):
+            diff = ask("Enter difficulty: ").strip().lower()
+        f.write(f"You are {user}, computer is {ai}\n")
+        print_b(pos.rows(), f)
+        while True:
+            if pos.turn == user:
+                while True:
+                    try:
+                        r, c = map(int, ask(f"Enter row and col (0-{n - 1}): ").split())
+                        if 0 <= r < n and 0 <= c < n and pos.rows()[r][c] == '.':
+                            break
+                        print("Cell taken.")
+                    except ValueError:
+                        print("Invalid input.")
+                won = pos.play(r * n + c)
+                print_b(pos.rows(), f)
+                if won:
+                    print("You win!")
+                    f.write("You win!\n")
+                    break
+            else:
+                print("Computer move:")
+                f.write("Computer move:\n")
+                if diff == "easy":
+                    m = easy_move(pos)
+                elif diff == "medium":
+                    m = medium_move(pos)
+                else:
+                    m = hard_move(pos, engine, max_depth, time_limit)
+                won = pos.play(m)
+                print_b(pos.rows(), f)
+                if won:
+                    print("Computer wins!")
+                    f.write("Computer wins!\n")
+                    break
+            if not pos.empties():
+                print("Draw!")
+                f.write("Draw!\n")
+                break
+
+
+# ---- day 6 best-first search
+
+def read_inp(fn):
+    with open(fn) as f:
+        lines = [ln.strip() for ln in f.read().splitlines() if ln.strip() != '']
+    if not lines:
+        raise ValueError("input empty")
+    try:
+        n = int(lines[0])
+    except ValueError:
+        raise ValueError("first non-empty line must be board size (3 or 4)")
+    if len(lines) < 1 + n + 1:
+        raise ValueError(f"need 1 + {n} + 1 lines (size + board rows + player). Got {len(lines)}")
+    b = []
+    for i in range(n):
+        row = lines[1 + i]
+        row_chars = [c for c in row if c in "XO."]
+        if len(row_chars) != n:
+            parts = row.split()
+            if len(parts) == n and all(len(p) == 1 and p in "XO." for p in parts):
+                row_chars = parts
+            else:
+                raise ValueError(f"row {i + 1} must contain exactly {n} symbols X/O/. (found: {row!r})")
+        b.append(row_chars)
+    p = lines[1 + n].upper()
+    if p not in ("X", "O"):
+        raise ValueError("player line must be X or O")
+    return n, b, p
+
+
+def _board_lines(pos):
+    return [''.join(r) for r in pos.rows()]
+
+
+def best_first(fn_in, fn_steps="steps.txt", fn_out="output.txt", max_expansions=20000, k=None,
+               level='full', every=1):
+    # day 6 best_first on Position: a node is (bits, side, parent, depth, h,
+    # open-line counts) and h, the root's open lines minus the opponent's, is
+    # updated from the lines through the move. Expansions go to an
+    # ailab.trace.Tracer at `level`, one board every `every` expansions; the
+    # defaults write the notebook's steps.txt, which has no summary line
+    n, b, root = read_inp(fn_in)
+    g = Game(n, k)
+    pos = g.position(b, root)
+    r = 'XO'.index(root)
+    view = g.position()
+
+    def record(exp, code, h, d, frontier):
+        # state code: X bits, then O bits, then the side to move
+        view.bits = [code & g.full, code >> g.cells & g.full]
+        side = code >> 2 * g.cells
+        return (f"Step {exp}  h={h}  next={'XO'[side]} d={d}\n"
+                + '\n'.join(_board_lines(view)) + '\n' + "-" * 10 + "\n")
+
+    trace = Tracer(fn_steps, level, every=every, line=record) or None
+    tick = trace.gap() if trace is not None and trace.full else 0
+    with open(fn_out, "w") as fo:
+        try:
+            if pos.wins(0) or pos.wins(1):
+                fo.write("Initial board already terminal:\n")
+                for row in b:
+                    fo.write("".join(row) + "\n")
+                return None
+
+            def h_of(p):
+                return p.open[r] - p.open[1 - r]
+
+            ctr = itertools.count()
+            start = (tuple(pos.bits), pos.side, None, 0, h_of(pos), tuple(pos.open))
+            pq = [(-start[4], next(ctr), start)]
+            seen = set()
+            exp = 0
+            nd = None
+            found = None
+            while pq and exp < max_expansions:
+                _, _, nd = heapq.heappop(pq)
+                bits, side, _, d, h, opn = nd
+                exp += 1
+                if tick:
+                    tick -= 1
+                    if not tick:
+                        trace.step(exp, bits[0] | bits[1] << g.cells | side << 2 * g.cells, h, d, len(pq))
+                        tick = trace.gap()
+                if (bits, side) in seen:
+                    continue
+                seen.add((bits, side))
+                pos.bits = list(bits)
+                pos.side = side
+                pos.open = list(opn)
+                for c in pos.moves():
+                    won = pos.play(c)
+                    child = (tuple(pos.bits), pos.side, nd, d + 1, h_of(pos), tuple(pos.open))
+                    pos.undo()
+                    if won:
+                        found = child
+                        break
+                    heapq.heappush(pq, (-child[4], next(ctr), child))
+                if found:
+                    break
+            if trace is not None and (level != 'full' or every > 1):
+                trace.summary(found=found is not None, expanded=exp, depth=found[3] if found else None)
+            if found:
+                path = []
+                cur = found
+                while cur is not None:
+                    path.append(cur)
+                    cur = cur[2]
+                fo.write(f"Win found for {'XO'[side]} at step {exp}. Sequence:\n")
+                for node in reversed(path):
+                    pos.bits, pos.side = list(node[0]), node[1]
+                    fo.write(f"depth={node[3]} next={'XO'[node[1]]}\n")
+                    fo.write('\n'.join(_board_lines(pos)) + '\n' + '-' * 6 + '\n')
+                return found
+            fo.write(f"No winning sequence found within {exp} expansions.\n")
+            fo.write("Last examined board:\n")
+            if nd:
+                pos.bits = list(nd[0])
+                fo.write('\n'.join(_board_lines(pos)) + '\n')
+            return None
+        finally:
+            if trace is not None:
+                trace.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.games')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('play', help='day 9 console game against the engine')
+    p.add_argument('--size', type=int, default=3)
+    p.add_argument('--k', type=int)
+    p.add_argument('--out', default='output.txt')
+    p.add_argument('--max-depth', type=int)
+    p.add_argument('--time-limit', type=float)
+    p = sub.add_parser('best-first', help='day 6 best-first search for a forced line')
+    p.add_argument('input')
+    p.add_argument('--steps', default='steps.txt')
+    p.add_argument('--out', default='output.txt')
+    p.add_argument('--max-expansions', type=int, default=20000)
+    p.add_argument('--k', type=int)
+    p.add_argument('--trace-level', choices=LEVELS, default='full')
+    p.add_argument('--every', type=int, default=1, help='write every Nth expansion to the steps file')
+    p = sub.add_parser('solve', help='game value of the empty board under perfect play')
+    p.add_argument('--size', type=int, default=3)
+    p.add_argument('--k', type=int)
+    args = ap.parse_args(argv)
+    if args.cmd == 'play':
+        play(args.size, args.k, args.out, max_depth=args.max_depth, time_limit=args.time_limit)
+    elif args.cmd == 'best-first':
+        best_first(args.input, args.steps, args.out, args.max_expansions, args.k, args.trace_level, args.every)
+        print("Done. Check %s and %s" % (args.steps, args.out))
+    else:
+        g = Game(args.size, args.k)
+        eng = Engine(g)
+        t0 = time.perf_counter()
+        move, res = solve(g.position(), eng)
+        print(f"{args.size}x{args.size}, {g.k} in a row: "
+              f"{['first player loses', 'draw', 'first player wins'][res + 1]} "
+              f"({eng.nodes} nodes, {len(eng.tt)} table entries, {time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+# hanoi.py
+#
+# Breadth-first Tower of Hanoi (day 3) for large disc counts.
+#
+# A state is the base-3 code of ailab.problems.Hanoi (digit i = rod of disc i,
+# disc 0 the smallest). The search keeps one 2-bit mark per possible state in
+# a flat byte array (3^n / 4 bytes): 0 = unseen, else 1 + BFS depth mod 3. The
+# marks are the visited set and the parent pointers at once: the neighbours
+# of a state at depth d sit at depths d-1, d or d+1, so exactly the ones
+# marked (d-1) mod 3 are its parents, and the path is walked back from the
+# goal without storing a move per state.
+#
+# Levels are expanded with numpy: the top disc of every rod is found for the
+# whole frontier at once, the six rod-to-rod moves produce the next level in
+# the order the notebook's queue would, and the explored-states CSV is
+# streamed to disk one level at a time.
+#
+# Only legal configurations (every rod ordered largest at the bottom) have a
+# code, so the notebook's "increasing" arrangement, which puts larger discs
+# on smaller ones, is rejected for more than one disc.
+#
+#   python -m ailab.hanoi --discs 12 --from 0 --to 2 [--csv out.csv] [--path-only] [--bidirectional]
+
+import argparse
+import csv
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from ailab.problems import Hanoi
+from ailab.search import Result, get_memory_kb
+
+MOVES = [(a, b) for a in range(3) for b in range(3) if a != b]   # notebook order
+SRC, DST = (np.array(x) for x in zip(*MOVES))
+SHIFT = DST - SRC
+CHUNK = 7          # discs per top-disc lookup table (3^7 rows)
+EMPTY = 64
+
+
+def config(n, rod, order='decreasing'):
+    # disc -> rod list for all discs stacked on one rod
+    if order not in ('decreasing', 'increasing'):
+        raise ValueError('arrangement must be increasing or decreasing')
+    if order == 'increasing' and n > 1:
+        raise ValueError('an increasing stack puts larger discs on smaller ones; '
+                         'only legal configurations can be searched')
+    return [rod] * n
+
+
+class Marks:
+    # 2 bits per state: 0 unseen, 1 + depth mod 3
+
+    def __init__(self, n):
+        self.a = np.zeros((3 ** n + 3) // 4, np.uint8)
+
+    def get(self, s):
+        # s: one code or an array of codes
+        return self.a[s >> 2] >> ((s & 3) << 1) & 3
+
+    def set(self, s, label):
+        # s unique; states sharing a byte go in separate passes
+        for q in range(4):
+            sel = s[(s & 3) == q]
+            self.a[sel >> 2] |= np.uint8(label << (2 * q))
+
+
+@lru_cache(None)
+def top_table(k):
+    # smallest disc on each rod for every code of k discs (EMPTY if none)
+    codes = np.arange(3 ** k)
+    t = np.full((3 ** k, 3), EMPTY, np.int64)
+    for d in reversed(range(k)):
+        t[codes, codes // 3 ** d % 3] = d
+    return t
+
+
+def expand(F, n, pow3):
+    # successors of every state in F, parent-major and in MOVES order:
+    # (child codes, parent index, moved disc, move index), invalid moves dropped
+    top = np.full((len(F), 3), EMPTY, np.int64)              # smallest disc per rod
+    x = F
+    for base in range(0, n, CHUNK):
+        k = min(CHUNK, n - base)
+        np.minimum(top, top_table(k)[x % 3 ** k] + base, out=top)
+        x = x // 3 ** k
+    np.minimum(top, n, out=top)
+    da, db = top[:, SRC], top[:, DST]                        # len(F) x 6
+    parent, mv = np.nonzero((da < n) & (da < db))
+    disc = da[parent, mv]
+    return F[parent] + SHIFT[mv] * pow3[disc], parent, disc, mv
+
+
+def first_unique(x):
+    # indices of the first occurrence of each value, in order of appearance
+    _, idx = np.unique(x, return_index=True)
+    idx.sort()
+    return idx
+
+
+def _rows_writer(path, hanoi):
+    f = open(path, 'w', newline='')
+    w = csv.writer(f)
+    w.writerow(["S.No.", "Rod 0", "Rod 1", "Rod 2", "Move"])
+
+    def row(i, s, move):
+        rods = hanoi.decode(s)
+        w.writerow([i, list(rods[0]), list(rods[1]), list(rods[2]), move])
+    return f, w, row
+
+
+def _describe(disc, mv):
+    a, b = MOVES[mv]
+    return f"Move disc {disc + 1} from Rod {a} to Rod {b}"
+
+
+def walk_back(hanoi, marks, s, depth):
+    # codes from a depth-0 state to s, via marks (1 + depth mod 3)
+    path = [s]
+    while depth:
+        want = (depth - 1) % 3 + 1
+        for ns, _ in hanoi.next_states(s):
+            if marks.get(ns) == want:
+                s = ns
+                break
+        else:
+            raise RuntimeError('broken BFS marks')
+        path.append(s)
+        depth -= 1
+    path.reverse()
+    return path
+
+
+def actions_of(hanoi, path):
+    out = []
+    for s, ns in zip(path, path[1:]):
+        out.append(next(a for t, a in hanoi.next_states(s) if t == ns))
+    return out
+
+
+def bfs(n, start, goal, csv_path=None, max_steps=None, path_only=False):
+    # start, goal: disc -> rod lists. Writes the day 3 CSV: every explored
+    # state in queue order (or with path_only, just the solution path).
+    # Result.path holds state codes (Hanoi(n).decode gives rods).
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    h = Hanoi(n, start=start, goal=goal)
+    pow3 = np.array(h.pow3, np.int64)
+    marks = Marks(n)
+    F = np.array([h.start], np.int64)
+    info = (np.array([-1]), np.array([0]))          # moved disc, move index
+    marks.set(F, 1)
+    f = w = row = None
+    if csv_path and not path_only:
+        f, w, row = _rows_writer(csv_path, h)
+    explored = generated = peak = 0
+    depth = 0
+    found = False
+    try:
+        while len(F):
+            peak = max(peak, len(F))
+            # the notebook pops states in this order; stop at the goal or the step cap
+            hit = np.flatnonzero(F == h.goal)
+            upto = hit[0] + 1 if len(hit) else len(F)
+            if max_steps is not None and explored + upto > max_steps:
+                upto = max_steps - explored
+            if row:
+                disc, mv = info
+                for i in range(upto):
+                    move = "Initial state" if disc[i] < 0 else _describe(int(disc[i]), int(mv[i]))
+                    row(explored + i + 1, int(F[i]), move)
+            explored += upto
+            if len(hit) and upto == hit[0] + 1:
+                found = True
+                break
+            if max_steps is not None and explored >= max_steps:
+                if w:
+                    w.writerow([f"Max steps ({max_steps}) reached before finding a solution.", "", "", "", ""])
+                break
+            kids, _, disc, mv = expand(F, n, pow3)
+            generated += len(kids)
+            keep = first_unique(kids)
+            kids, disc, mv = kids[keep], disc[keep], mv[keep]
+            new = marks.get(kids) == 0
+            F, info = kids[new], (disc[new], mv[new])
+            depth += 1
+            marks.set(F, depth % 3 + 1)
+        path = actions = None
+        if found:
+            path = walk_back(h, marks, h.goal, depth)
+            actions = actions_of(h, path)
+            if w:
+                w.writerow([f"Goal state reached after exploring {explored} states.", "", "", "",
+                            f"Solution path length: {len(actions)} moves."])
+        elif w and (max_steps is None or explored < max_steps):
+            w.writerow(["No solution found within the explored states.", "", "", "", ""])
+    finally:
+        if f:
+            f.close()
+    if found and path_only and csv_path:
+        write_path(csv_path, h, path, actions)
+    return Result(path, actions, explored, generated, peak,
+                  time.perf_counter() - t0, get_memory_kb() - m0)
+
+
+def bidirectional(n, start, goal, csv_path=None):
+    # level-synchronous BFS from both ends, always growing the smaller
+    # frontier; each side has its own marks
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    h = Hanoi(n, start=start, goal=goal)
+    pow3 = np.array(h.pow3, np.int64)
+    sides = []
+    for s in (h.start, h.goal):
+        m = Marks(n)
+        F = np.array([s], np.int64)
+        m.set(F, 1)
+        sides.append([m, F, 0])
+    explored = generated = peak = 0
+    meet = None
+    if h.start == h.goal:
+        meet = h.start
+    while meet is None and len(sides[0][1]) and len(sides[1][1]):
+        i = 0 if len(sides[0][1]) <= len(sides[1][1]) else 1
+        marks, F, depth = sides[i]
+        other = sides[1 - i][0]
+        peak = max(peak, len(sides[0][1]) + len(sides[1][1]))
+        explored += len(F)
+        kids = expand(F, n, pow3)[0]
+        generated += len(kids)
+        kids = np.unique(kids)
+        kids = kids[marks.get(kids) == 0]
+        depth += 1
+        marks.set(kids, depth % 3 + 1)
+        sides[i][1:] = [kids, depth]
+        both = kids[other.get(kids) != 0]
+        if len(both):
+            meet = int(both[0])
+    path = actions = None
+    if meet is not None:
+        # every overlap is seen when its second mark is set, so the meeting
+        # state is in the newest level of both sides
+        (ms, _, ds), (mg, _, dg) = sides
+        path = walk_back(h, ms, meet, ds) + walk_back(h, mg, meet, dg)[::-1][1:]
+        actions = actions_of(h, path)
+        if csv_path:
+            write_path(csv_path, h, path, actions)
+    return Result(path, actions, explored, generated, peak,
+                  time.perf_counter() - t0, get_memory_kb() - m0)
+
+
+def write_path(path_csv, h, path, actions):
+    with open(path_csv, 'w', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(["S.No.", "Rod 0", "Rod 1", "Rod 2", "Move"])
+        prev = None
+        for i, s in enumerate(path):
+            rods = h.decode(s)
+            if prev is None:
+                move = "Initial state"
+            else:
+                a, b = actions[i - 1]
+                move = f"Move disc {rods[b][-1]} from Rod {a} to Rod {b}"
+            w.writerow([i + 1, list(rods[0]), list(rods[1]), list(rods[2]), move])
+            prev = s
+        w.writerow([f"Goal state reached in {len(actions)} moves.", "", "", "", ""])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.hanoi')
+    ap.add_argument('--discs', type=int, required=True)
+    ap.add_argument('--from', dest='src', type=int, default=0)
+    ap.add_argument('--to', dest='dst', type=int, default=2)
+    ap.add_argument('--init-order', default='decreasing')
+    ap.add_argument('--final-order', default='decreasing')
+    ap.add_argument('--max-steps', type=int)
+    ap.add_argument('--csv', default='041_Output_Assignment3_SusharHembram.csv')
+    ap.add_argument('--path-only', action='store_true', help='write only the solution path to the CSV')
+    ap.add_argument('--bidirectional', action='store_true')
+    args = ap.parse_args(argv)
+    start = config(args.discs, args.src, args.init_order)
+    goal = config(args.discs, args.dst, args.final_order)
+    if args.bidirectional:
+        r = bidirectional(args.discs, start, goal, args.csv)
+    else:
+        r = bfs(args.discs, start, goal, args.csv, args.max_steps, args.path_only)
+    if r.found:
+        print(f"Solution found in {len(r.actions)} moves after exploring {r.expanded} states "
+              f"({r.seconds:.2f}s, {r.rate:.0f} states/s). Steps written to {args.csv}")
+    else:
+        print(f"No solution found after exploring {r.expanded} states. Details written to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+# npuzzle.py
+#
+# IDA* for the N-puzzle (day 4), reading and writing the assignment's files.
+#
+# The board is one int with w bits per cell (row-major, the blank's field is
+# 0); a move rewrites two fields of it and the heuristic is updated from the
+# moved tile alone, so nothing is copied per node. Heuristics:
+#
+#   Manhattan      Manhattan distance + linear conflict. Conflicts per row and
+#                  column are looked up by the line's packed contents; the
+#                  transposed board is kept alongside for the column keys.
+#   PatternDB      additive disjoint pattern databases (5-5-5 for the 15-puzzle
+#                  by default). Each table holds, for every placement of its
+#                  tiles, the fewest moves of those tiles needed to reach the
+#                  goal. Tables are built once with a vectorised 0-1 BFS, saved
+#                  as flat byte arrays under AILAB_PDB_DIR (default
+#                  ~/.cache/ailab) and memory-mapped on load.
+#
+#   python -m ailab.npuzzle INPUT OUTPUT [--pdb] [--max-depth N] [--trace FILE]
+
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+import time
+
+from ailab.search import Result, get_memory_kb
+
+FOUND = -1
+
+
+def read_input(filename):
+    # size, start, goal: one size line then two rows of numbers (blank = 0)
+    with open(filename) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    size = int(lines[0])
+    start = list(map(int, lines[1].split()))
+    goal = list(map(int, lines[2].split()))
+    return size, start, goal
+
+
+def write_steps_to_file(filename, steps, size, found, message="No solution within depth limit.\n"):
+    with open(filename, "w") as f:
+        if found:
+            for idx, state in enumerate(steps):
+                if idx == len(steps) - 1:
+                    f.write("Output State:\n")
+                else:
+                    f.write(f"Step {idx}:\n")
+                for i in range(size):
+                    row = state[i * size:(i + 1) * size]
+                    f.write(" ".join(str(x) for x in row) + "\n")
+                f.write("\n")
+        else:
+            f.write(message)
+
+
+def check_board(size, tiles):
+    if sorted(tiles) != list(range(size * size)):
+        raise ValueError('a %dx%d board must hold 0..%d once each' % (size, size, size * size - 1))
+
+
+def inversions(tiles):
+    t = [x for x in tiles if x]
+    return sum(1 for i in range(len(t)) for j in range(i + 1, len(t)) if t[i] > t[j])
+
+
+def solvable(size, start, goal):
+    # odd width: inversion parity is invariant; even width: inversions + blank
+    # row changes parity with every vertical move
+    a, b = inversions(start), inversions(goal)
+    if size % 2 == 0:
+        a += start.index(0) // size
+        b += goal.index(0) // size
+    return a % 2 == b % 2
+
+
+class Board:
+    # packing for one board size
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.w = max(1, (self.cells - 1).bit_length())
+        self.mask = (1 << self.w) - 1
+        self.shift = [p * self.w for p in range(self.cells)]
+        # transposed position of each cell
+        self.tpos = [(p % size) * size + p // size for p in range(self.cells)]
+        self.nbrs = []
+        for p in range(self.cells):
+            r, c = divmod(p, size)
+            self.nbrs.append([((r + dr) * size + c + dc, m) for dr, dc, m in
+                              ((-1, 0, 'U'), (1, 0, 'D'), (0, -1, 'L'), (0, 1, 'R'))
+                              if 0 <= r + dr < size and 0 <= c + dc < size])
+
+    def pack(self, tiles):
+        b = 0
+        for p, t in enumerate(tiles):
+            b |= t << self.shift[p]
+        return b
+
+    def unpack(self, b):
+        return [b >> s & self.mask for s in self.shift]
+
+    def transpose(self, tiles):
+        out = [0] * self.cells
+        for p, t in enumerate(tiles):
+            out[self.tpos[p]] = t
+        return out
+
+
+def line_conflicts(goal_idx):
+    # tiles that must leave the line so the rest are in goal order:
+    # count - longest increasing run of goal positions
+    n = len(goal_idx)
+    if n < 2:
+        return 0
+    best = [1] * n
+    for i in range(n):
+        for j in range(i):
+            if goal_idx[j] < goal_idx[i] and best[j] + 1 > best[i]:
+                best[i] = best[j] + 1
+    return n - max(best)
+
+
+class Manhattan:
+
+    def __init__(self, board, goal, linear_conflict=True):
+        bd = self.bd = board
+        n, size = bd.cells, bd.size
+        gpos = [0] * n
+        for p, t in enumerate(goal):
+            gpos[t] = p
+        self.gpos = gpos
+        # dist[t][p]: Manhattan distance of tile t standing on p
+        self.dist = [[0] * n if t == 0 else
+                     [abs(p // size - gpos[t] // size) + abs(p % size - gpos[t] % size) for p in range(n)]
+                     for t in range(n)]
+        self.lc = linear_conflict
+        self.line_bits = size * bd.w
+        self.line_mask = (1 << self.line_bits) - 1
+        # conflict tables, filled on first use of a line's contents
+        self.rows = [{} for _ in range(size)]
+        self.cols = [{} for _ in range(size)]
+
+    def _row(self, r, key):
+        v = self.rows[r].get(key)
+        if v is None:
+            bd, size = self.bd, self.bd.size
+            ts = [key >> (c * bd.w) & bd.mask for c in range(size)]
+            v = self.rows[r][key] = 2 * line_conflicts(
+                [self.gpos[t] % size for t in ts if t and self.gpos[t] // size == r])
+        return v
+
+    def _col(self, c, key):
+        v = self.cols[c].get(key)
+        if v is None:
+            bd, size = self.bd, self.bd.size
+            ts = [key >> (r * bd.w) & bd.mask for r in range(size)]
+            v = self.cols[c][key] = 2 * line_conflicts(
+                [self.gpos[t] // size for t in ts if t and self.gpos[t] % size == c])
+        return v
+
+    def _lines(self, b, bt):
+        lb, lm = self.line_bits, self.line_mask
+        return (sum(self._row(r, b >> (r * lb) & lm) for r in range(self.bd.size)) +
+                sum(self._col(c, bt >> (c * lb) & lm) for c in range(self.bd.size)))
+
+    def initial(self, tiles):
+        # (h, aux); aux is the packed transposed board
+        bd = self.bd
+        h = sum(self.dist[t][p] for p, t in enumerate(tiles))
+        bt = bd.pack(bd.transpose(tiles))
+        if self.lc:
+            h += self._lines(bd.pack(tiles), bt)
+        return h, bt
+
+    def step(self, h, bt, b, nb, t, p, q):
+        # tile t moved from p to q, board b -> nb
+        h += self.dist[t][q] - self.dist[t][p]
+        bd = self.bd
+        tp, tq = bd.tpos[p], bd.tpos[q]
+        nbt = bt ^ (t << bd.shift[tp]) ^ (t << bd.shift[tq])
+        if self.lc:
+            size, lb, lm = bd.size, self.line_bits, self.line_mask
+            if p // size != q // size:
+                for r in (p // size, q // size):
+                    h += self._row(r, nb >> (r * lb) & lm) - self._row(r, b >> (r * lb) & lm)
+            else:
+                for c in (p % size, q % size):
+                    h += self._col(c, nbt >> (c * lb) & lm) - self._col(c, bt >> (c * lb) & lm)
+        return h, nbt
+
+
+def default_partition(size, goal):
+    # goal cells in row-major order, blank skipped, cut into groups of 5
+    # (4 for the 8-puzzle)
+    tiles = [t for t in goal if t]
+    k = 4 if size == 3 else 5
+    return [tiles[i:i + k] for i in range(0, len(tiles), k)]
+
+
+def pdb_dir():
+    return os.environ.get('AILAB_PDB_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'ailab')
+
+
+def build_pdb(size, goal, tiles):
+    # 0-1 BFS from the goal over (placement of `tiles`, blank position);
+    # moving a pattern tile costs 1, any other tile 0. State id =
+    # (positions packed w bits per tile) << w | blank. Returns bytes indexed by
+    # the packed positions: min over blank positions (255 = unreachable).
+    import numpy as np
+    bd = Board(size)
+    w, k = bd.w, len(tiles)
+    R = 1 << w
+    gpos = [goal.index(t) for t in tiles]
+    dist = np.full(R ** (k + 1), 255, np.uint8)
+    s0 = sum(p << (w * i) for i, p in enumerate(gpos)) << w | goal.index(0)
+    dist[s0] = 0
+    frontier = np.array([s0], np.int64)
+    moves = ((-size, lambda r, c: r > 0), (size, lambda r, c: r < size - 1),
+             (-1, lambda r, c: c > 0), (1, lambda r, c: c < size - 1))
+    c = 0
+    while frontier.size:
+        cur, ones = frontier, []
+        while cur.size:
+            blank = cur & (R - 1)
+            pidx = cur >> w
+            pos = [pidx >> (w * i) & (R - 1) for i in range(k)]
+            row, col = blank // size, blank % size
+            zeros = []
+            for d, ok in moves:
+                sel = ok(row, col)
+                b, pi = blank[sel], pidx[sel]
+                nb = b + d
+                hit = np.zeros(b.size, bool)
+                npi = pi.copy()
+                for i in range(k):
+                    m = pos[i][sel] == nb
+                    npi[m] += (b[m] - nb[m]) << (w * i)
+                    hit |= m
+                nid = npi << w | nb
+                ones.append(nid[hit])
+                z = nid[~hit]
+                zeros.append(z[dist[z] == 255])
+            cur = np.unique(np.concatenate(zeros))
+            dist[cur] = c
+        nxt = np.unique(np.concatenate(ones))
+        frontier = nxt[dist[nxt] == 255]
+        dist[frontier] = c + 1
+        c += 1
+    return dist.reshape(-1, R).min(axis=1).tobytes()
+
+
+class PatternDB:
+
+    def __init__(self, board, goal, partition=None, directory=None):
+        self.bd = bd = board
+        self.partition = partition or default_partition(bd.size, goal)
+        covered = sorted(t for g in self.partition for t in g)
+        if covered != list(range(1, bd.cells)):
+            raise ValueError('the partition must cover tiles 1..%d exactly once' % (bd.cells - 1))
+        directory = directory or pdb_dir()
+        self.tables, self.offset, self.gmask = [], [], []
+        self.group = [0] * bd.cells
+        self.slot = [0] * bd.cells   # bit offset of each tile's position field
+        off = 0
+        for j, tiles in enumerate(self.partition):
+            self.tables.append(self._load(directory, goal, tiles))
+            self.offset.append(off)
+            self.gmask.append((1 << (bd.w * len(tiles))) - 1)
+            for i, t in enumerate(tiles):
+                self.group[t] = j
+                self.slot[t] = off + bd.w * i
+            off += bd.w * len(tiles)
+
+    def _load(self, directory, goal, tiles):
+        key = '%d:%s:%s' % (self.bd.size, [goal.index(t) for t in tiles], goal.index(0))
+        path = os.path.join(directory, 'pdb%d-%s.bin' % (self.bd.size, hashlib.sha1(key.encode()).hexdigest()[:16]))
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            data = build_pdb(self.bd.size, goal, tiles)
+            tmp = path + '.tmp%d' % os.getpid()
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def initial(self, tiles):
+        # (h, aux); aux packs every tile's position, grouped by table
+        inv = 0
+        for p, t in enumerate(tiles):
+            if t:
+                inv |= p << self.slot[t]
+        h = sum(tab[inv >> off & m] for tab, off, m in zip(self.tables, self.offset, self.gmask))
+        return h, inv
+
+    def step(self, h, inv, b, nb, t, p, q):
+        j = self.group[t]
+        ninv = inv ^ ((p ^ q) << self.slot[t])
+        tab, off, m = self.tables[j], self.offset[j], self.gmask[j]
+        return h + tab[ninv >> off & m] - tab[inv >> off & m], ninv
+
+
+def ida_star(size, start, goal, heuristic=None, max_depth=None, trace=None):
+    # Result with path = boards from start to goal, actions = blank moves
+    # ('U', 'D', 'L', 'R'), max_frontier = deepest bound tried
+    check_board(size, start)
+    check_board(size, goal)
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    trace = trace or None
+    tick = trace.gap() if trace is not None and trace.full else 0
+    bd = Board(size)
+    heur = heuristic or Manhattan(bd, goal)
+    shift, mask, nbrs = bd.shift, bd.mask, bd.nbrs
+    gb = bd.pack(goal)
+    moves = []
+    count = [0, 0]   # expanded, generated
+    bound = 0
+    if not solvable(size, start, goal):
+        if trace is not None:
+            trace.event('unsolvable: start and goal have different parity')
+        return Result(None, None, 0, 0, 0, time.perf_counter() - t0, get_memory_kb() - m0)
+
+    def dfs(b, blank, g, h, aux, prev):
+        nonlocal tick
+        f = g + h
+        if f > bound:
+            return f
+        if b == gb:
+            return FOUND
+        count[0] += 1
+        if tick:
+            tick -= 1
+            if not tick:
+                trace.step(count[0], b, f, g)
+                tick = trace.gap()
+        best = None
+        for p, mv in nbrs[blank]:
+            if p == prev:
+                continue
+            t = b >> shift[p] & mask
+            nb = b ^ (t << shift[p]) ^ (t << shift[blank])
+            nh, naux = heur.step(h, aux, b, nb, t, p, blank)
+            count[1] += 1
+            moves.append(mv)
+            r = dfs(nb, p, g + 1, nh, naux, blank)
+            if r == FOUND:
+                return FOUND
+            moves.pop()
+            if best is None or r < best:
+                best = r
+        return best
+
+    h0, aux0 = heur.initial(start)
+    bound = h0
+    r = None
+    limit = sys.getrecursionlimit()
+    while True:
+        if max_depth is not None and bound > max_depth:
+            bound = None
+            break
+        if bound + 50 > limit:
+            limit = bound + 100
+            sys.setrecursionlimit(limit)
+        if trace is not None:
+            trace.event('bound %d' % bound)
+        r = dfs(bd.pack(start), start.index(0), 0, h0, aux0, -1)
+        if r == FOUND or r is None:
+            break
+        bound = r
+    path = actions = None
+    if bound is not None and r == FOUND:
+        actions = list(moves)
+        path = replay(bd, start, actions)
+    res = Result(path, actions, count[0], count[1], bound or 0,
+                 time.perf_counter() - t0, get_memory_kb() - m0)
+    if trace is not None:
+        trace.summary(found=res.found, moves=len(actions) if actions is not None else None,
+                      expanded=res.expanded, generated=res.generated)
+    return res
+
+
+def replay(bd, start, actions):
+    step = {'U': -bd.size, 'D': bd.size, 'L': -1, 'R': 1}
+    s = list(start)
+    out = [list(s)]
+    for a in actions:
+        i = s.index(0)
+        j = i + step[a]
+        s[i], s[j] = s[j], s[i]
+        out.append(list(s))
+    return out
+
+
+def solve(size, start, goal, pdb=False, partition=None, max_depth=None, trace=None):
+    heur = PatternDB(Board(size), goal, partition) if pdb else None
+    return ida_star(size, start, goal, heur, max_depth, trace)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.npuzzle')
+    ap.add_argument('input')
+    ap.add_argument('output')
+    ap.add_argument('--pdb', action='store_true',
+                    help='additive pattern databases instead of Manhattan + linear conflict')
+    ap.add_argument('--max-depth', type=int)
+    ap.add_argument('--trace', help='write a trace of the search to this file')
+    args = ap.parse_args(argv)
+    size, start, goal = read_input(args.input)
+    print("Solving...")
+    if not solvable(size, start, goal):
+        print("No solution: the goal is not reachable from the start state.")
+        write_steps_to_file(args.output, [], size, False,
+                            "No solution: the goal is not reachable from the start state.\n")
+        return
+    trace = None
+    if args.trace:
+        from ailab.trace import Tracer
+        trace = Tracer(args.trace, 'summary')
+    r = solve(size, start, goal, pdb=args.pdb, max_depth=args.max_depth, trace=trace)
+    if trace is not None:
+        trace.close()
+    if r.found:
+        print("Solution found in", len(r.actions), "moves.")
+        print(f"Expanded {r.expanded} nodes in {r.seconds:.3f}s ({r.rate:.0f} nodes/s)")
+        write_steps_to_file(args.output, r.path, size, True)
+        print("Steps and output state written to", args.output)
+    else:
+        print("No solution within depth limit.")
+        write_steps_to_file(args.output, [], size, False)
+
+
+if __name__ == '__main__':
+    main()
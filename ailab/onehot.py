@@ -0,0 +1,213 @@
+# onehot.py
+#
+# Categorical CSV -> one-hot matrix -> attribute co-occurrence graph (day 2).
+#
+# The file is read in chunks as pandas categoricals, so a cell is a small
+# integer code rather than a Python string. Each attribute=value pair gets a
+# column of the vocabulary the first time it appears (row by row, left to
+# right, the order of the notebook's unique_values), and a row is stored as
+# the column ids of its attributes: an N x A int32 array, which is the index
+# array of the CSR one-hot matrix. The same rows can be packed 8 columns to a
+# byte.
+#
+# Co-occurrence is one sparse product, C = X^T X: C[i, j] counts the rows
+# holding both items and the diagonal is the item supports. The graph and the
+# shortest paths come from C; drawing is separate and needs matplotlib.
+#
+#   python -m ailab.onehot cancer_demographics.csv [--binary binary_data.csv]
+#       [--source Gender=Male --target "Stage=Stage III"] [--plot graph.png]
+
+import argparse
+
+import numpy as np
+
+CHUNK = 1 << 16
+
+
+class Vocab:
+    # attribute=value item <-> column id
+
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def add(self, item):
+        i = self.index.get(item)
+        if i is None:
+            i = self.index[item] = len(self.items)
+            self.items.append(item)
+        return i
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, item):
+        return self.index[item]
+
+
+class OneHot:
+    # rows of a categorical table as column ids: idx[r, a] is the vocabulary
+    # column of attribute a in row r
+
+    def __init__(self, header, vocab, idx):
+        self.header = header
+        self.vocab = vocab
+        self.idx = idx
+
+    def __len__(self):
+        return len(self.idx)
+
+    def to_csr(self):
+        from scipy.sparse import csr_matrix
+        n, a = self.idx.shape
+        return csr_matrix((np.ones(n * a, np.int32), self.idx.ravel(), np.arange(0, n * a + 1, a)),
+                          shape=(n, len(self.vocab)))
+
+    def packed(self):
+        # rows x ceil(V/8) bytes, np.packbits bit order
+        n = len(self.idx)
+        out = np.zeros((n, (len(self.vocab) + 7) // 8), np.uint8)
+        rows = np.arange(n)
+        for col in self.idx.T:
+            # one attribute at a time: no row is hit twice in one update
+            out[rows, col >> 3] |= (128 >> (col & 7)).astype(np.uint8)
+        return out
+
+    def transactions(self):
+        # the notebook's make_transactions lists (small tables only)
+        items = self.vocab.items
+        return [[items[i] for i in row] for row in self.idx.tolist()]
+
+    def write_csv(self, path, chunk=CHUNK):
+        # the notebook's binary_data.csv, written a block of rows at a time
+        v = len(self.vocab)
+        with open(path, 'wb') as f:
+            f.write((','.join(self.vocab.items) + '\n').encode())
+            for lo in range(0, len(self.idx), chunk):
+                part = self.idx[lo:lo + chunk]
+                text = np.full((len(part), 2 * v), ord(','), np.uint8)
+                text[:, 0::2] = ord('0')
+                text[np.arange(len(part))[:, None], 2 * part] = ord('1')
+                text[:, -1] = ord('\n')
+                f.write(text.tobytes())
+
+
+def read_onehot(path, chunksize=CHUNK, skip_first=True):
+    # skip_first drops the ID column, as make_transactions does
+    import pandas as pd
+    vocab = Vocab()
+    header = None
+    blocks = []
+    reader = pd.read_csv(path, dtype='category', keep_default_na=False, chunksize=chunksize)
+    for df in reader:
+        if header is None:
+            cols = list(df.columns[1:] if skip_first else df.columns)
+            header = [str(c) for c in cols]
+        ids = np.empty((len(df), len(cols)), np.int32)
+        luts, new = [], []
+        for a, c in enumerate(cols):
+            cat = df[c].cat
+            codes = cat.codes.to_numpy()
+            names = [f"{header[a]}={v}" for v in cat.categories]
+            first = np.full(len(names), -1)
+            used, at = np.unique(codes, return_index=True)
+            first[used] = at
+            new += [(first[k], a, name) for k, name in enumerate(names)
+                    if first[k] >= 0 and name not in vocab.index]
+            luts.append((codes, names))
+        # new items in row-major order of first appearance
+        for _, _, name in sorted(new):
+            vocab.add(name)
+        for a, (codes, names) in enumerate(luts):
+            lut = np.array([vocab.index.get(name, -1) for name in names], np.int32)
+            ids[:, a] = lut[codes]
+        blocks.append(ids)
+    if header is None:
+        raise ValueError(f'{path}: no rows')
+    return OneHot(header, vocab, np.concatenate(blocks))
+
+
+def cooccurrence(X):
+    # X: CSR one-hot rows. C[i, j] = rows holding items i and j
+    X = X.astype(np.int64)
+    return (X.T @ X).tocsr()
+
+
+def adjacency(C):
+    # items joined when they share a row; self-pairs dropped
+    A = C.tocsr(copy=True)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    return A
+
+
+def graph(C, labels):
+    import networkx as nx
+    A = adjacency(C).tocoo()
+    G = nx.Graph()
+    G.add_nodes_from(labels)
+    G.add_weighted_edges_from((labels[i], labels[j], int(w))
+                              for i, j, w in zip(A.row, A.col, A.data) if i < j)
+    return G
+
+
+def shortest_path(C, labels, source, target):
+    # fewest hops between two items (unweighted, like nx.shortest_path);
+    # None if they are not connected
+    from scipy.sparse.csgraph import breadth_first_order
+    index = {name: i for i, name in enumerate(labels)}
+    s, t = index[source], index[target]
+    _, pred = breadth_first_order(adjacency(C), s, directed=False, return_predecessors=True)
+    if s != t and pred[t] < 0:
+        return None
+    path = [t]
+    while path[-1] != s:
+        path.append(pred[path[-1]])
+    return [labels[i] for i in reversed(path)]
+
+
+def draw(G, path=None, out=None, title="Graph from Binary Dataset", seed=None):
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    pos = nx.spring_layout(G, seed=seed)
+    plt.figure(figsize=(12, 6))
+    nx.draw_networkx(G, pos, with_labels=False, node_color='skyblue', edge_color='gray')
+    if path:
+        nx.draw_networkx_nodes(G, pos, nodelist=path, node_color='red', node_size=500)
+        nx.draw_networkx_edges(G, pos, edgelist=list(zip(path, path[1:])), edge_color='red', width=2)
+    plt.title(title)
+    plt.axis('off')
+    if out:
+        plt.savefig(out, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.onehot')
+    ap.add_argument('input')
+    ap.add_argument('--binary', help='write the binary table CSV')
+    ap.add_argument('--source')
+    ap.add_argument('--target')
+    ap.add_argument('--plot', help='save the graph (with the path, if any) as an image')
+    ap.add_argument('--chunksize', type=int, default=CHUNK)
+    args = ap.parse_args(argv)
+    oh = read_onehot(args.input, args.chunksize)
+    print(f"{len(oh)} rows, {len(oh.header)} attributes, {len(oh.vocab)} items")
+    if args.binary:
+        oh.write_csv(args.binary)
+        print(f"Binary table written to {args.binary}")
+    C = cooccurrence(oh.to_csr())
+    labels = oh.vocab.items
+    path = None
+    if args.source and args.target:
+        path = shortest_path(C, labels, args.source, args.target)
+        print(f"Shortest path between '{args.source}' and '{args.target}': {path}")
+    if args.plot:
+        draw(graph(C, labels), path, args.plot)
+        print(f"Graph saved to {args.plot}")
+
+
+if __name__ == '__main__':
+    main()
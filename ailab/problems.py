@@ -0,0 +1,144 @@
+# problems.py
+#
+# Search problems from the day 3/4/5 assignments, with states packed into
+# ints so the search can key its parent dict on them directly.
+#
+#   RiverCrossing  farmer/wolf/goat/cabbage (day 5): one bit per item, 1 = right bank
+#   Hanoi          Tower of Hanoi (day 3): base-3 digit per disc = its rod
+#   NPuzzle        sliding puzzle (day 4): tiles in fixed-width bit fields,
+#                  blank position in the low bits
+
+ITEMS = 'FWGCB'  # farmer, wolf, goat, cabbage, boat
+
+
+class RiverCrossing:
+
+    def __init__(self, start=('L',) * 5, goal=('R',) * 5):
+        self.start = self.encode(start)
+        self.goal = self.encode(goal)
+
+    @staticmethod
+    def encode(state):
+        return sum(1 << i for i, side in enumerate(state) if side == 'R')
+
+    @staticmethod
+    def decode(s):
+        return tuple('R' if s >> i & 1 else 'L' for i in range(5))
+
+    @staticmethod
+    def state_str(s):
+        return ', '.join(f"{x}:{y}" for x, y in zip(ITEMS, RiverCrossing.decode(s)))
+
+    @staticmethod
+    def valid(s):
+        f, w, g, c = s & 1, s >> 1 & 1, s >> 2 & 1, s >> 3 & 1
+        return not ((g == w and f != g) or (g == c and f != g))
+
+    def next_states(self, s):
+        # same moves, in the same order, as next_states in the day 5 notebook
+        f, b = s & 1, s >> 4 & 1
+        flip = 1 << 4
+        if f == b:
+            flip |= 1
+        out = []
+        ns = s ^ flip
+        if self.valid(ns):
+            out.append((ns, "F alone"))
+        for bit, name in ((1, "F+W"), (2, "F+G"), (3, "F+C")):
+            if f == b == (s >> bit & 1):
+                ns = s ^ (1 | 1 << bit | 1 << 4)
+                if self.valid(ns):
+                    out.append((ns, name))
+        return out
+
+    def is_goal(self, s):
+        return s == self.goal
+
+
+class Hanoi:
+    # discs 0..n-1, smallest first; digit i of the code is the rod of disc i.
+    # Only legal stacks can be encoded (each rod is ordered by size).
+
+    def __init__(self, n, start_rod=0, goal_rod=2, start=None, goal=None):
+        self.n = n
+        self.pow3 = [3 ** i for i in range(n)]
+        self.start = self.encode(start if start is not None else [start_rod] * n)
+        self.goal = self.encode(goal if goal is not None else [goal_rod] * n)
+
+    def encode(self, rods_of):
+        return sum(r * p for r, p in zip(rods_of, self.pow3))
+
+    def decode(self, s):
+        # rods as tuples of disc numbers (1 = smallest), bottom first
+        rods = ([], [], [])
+        for d in range(self.n, 0, -1):
+            rods[s // self.pow3[d - 1] % 3].append(d)
+        return tuple(tuple(r) for r in rods)
+
+    def next_states(self, s):
+        top = [None, None, None]
+        x = s
+        for d in range(self.n):
+            r = x % 3
+            x //= 3
+            if top[r] is None:
+                top[r] = d
+                if None not in top:
+                    break
+        out = []
+        for a in range(3):
+            da = top[a]
+            if da is None:
+                continue
+            for b in range(3):
+                if a != b and (top[b] is None or da < top[b]):
+                    out.append((s + (b - a) * self.pow3[da], (a, b)))
+        return out
+
+    def is_goal(self, s):
+        return s == self.goal
+
+
+class NPuzzle:
+    # code = (tile fields << w) | blank position; the blank's field holds 0
+
+    MOVES = ((-1, 0, 'U'), (1, 0, 'D'), (0, -1, 'L'), (0, 1, 'R'))  # blank moves
+
+    def __init__(self, size, start, goal):
+        self.size = size
+        self.cells = size * size
+        self.w = max(1, (self.cells - 1).bit_length())
+        self.mask = (1 << self.w) - 1
+        if sorted(start) != list(range(self.cells)) or sorted(goal) != sorted(start):
+            raise ValueError('start and goal must be permutations of 0..%d' % (self.cells - 1))
+        self.start = self.encode(start)
+        self.goal = self.encode(goal)
+        self.nbrs = []
+        for p in range(self.cells):
+            r, c = divmod(p, size)
+            self.nbrs.append([((r + dr) * size + c + dc, m) for dr, dc, m in self.MOVES
+                              if 0 <= r + dr < size and 0 <= c + dc < size])
+
+    def encode(self, tiles):
+        b = 0
+        for i, t in enumerate(tiles):
+            b |= t << (i * self.w)
+        return b << self.w | list(tiles).index(0)
+
+    def decode(self, s):
+        b = s >> self.w
+        return [b >> (i * self.w) & self.mask for i in range(self.cells)]
+
+    def next_states(self, s):
+        w = self.w
+        blank = s & self.mask
+        b = s >> w
+        out = []
+        for p, m in self.nbrs[blank]:
+            t = b >> (p * w) & self.mask
+            nb = b - (t << (p * w)) + (t << (blank * w))
+            out.append((nb << w | p, m))
+        return out
+
+    def is_goal(self, s):
+        return s == self.goal
@@ -0,0 +1,195 @@
+# rules.py
+#
+# Frequent itemsets and association rules over the day 2 transactions.
+#
+# Eclat on vertical tidlists: each item's rows are one Python int used as a
+# bitset (bit r set if row r holds the item), so the support of an itemset
+# is a chain of & and one int.bit_count(). Itemsets grow depth-first from
+# the least frequent item, each branch keeping only the extensions that are
+# still frequent. The branches under different first items are independent,
+# which is how the work is split across processes.
+#
+# Everything is a generator: itemsets are yielded as they are found and
+# rules as their itemsets arrive. Antecedent supports come from the itemsets
+# already seen, or from the tidlists when a subset has not been reached yet.
+# Consequents grow one item at a time and only from confident rules, since
+# moving an item from the antecedent to the consequent never raises the
+# confidence.
+#
+#   python -m ailab.rules cancer_demographics.csv [--min-support 0.2]
+#       [--min-confidence 0.6] [--min-lift 1] [--max-len 3] [--workers 4]
+
+import argparse
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+
+class Rule(namedtuple('Rule', 'antecedent consequent support confidence lift')):
+    __slots__ = ()
+
+    def __str__(self):
+        return (f"{', '.join(self.antecedent)} => {', '.join(self.consequent)} "
+                f"(support={self.support:.3f}, confidence={self.confidence:.3f}, lift={self.lift:.3f})")
+
+
+def _bitset(rows, n):
+    # row indices -> int with those bits set
+    bits = np.zeros(n, bool)
+    bits[rows] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def tidlists(data):
+    # data: an ailab.onehot.OneHot, or transactions as lists of items (the
+    # day 2 make_transactions format). Returns labels, bitsets, row count.
+    if hasattr(data, 'idx'):
+        idx = data.idx
+        n = len(idx)
+        flat = idx.ravel()
+        order = np.argsort(flat, kind='stable')
+        bounds = np.searchsorted(flat[order], np.arange(len(data.vocab) + 1))
+        rows = order // idx.shape[1]
+        return (list(data.vocab.items), [_bitset(rows[lo:hi], n) for lo, hi in zip(bounds, bounds[1:])],
+                n)
+    labels, index, rows = [], {}, []
+    n = 0
+    for r, row in enumerate(data):
+        n = r + 1
+        for item in row:
+            i = index.get(item)
+            if i is None:
+                i = index[item] = len(labels)
+                labels.append(item)
+                rows.append([])
+            rows[i].append(r)
+    return labels, [_bitset(x, n) for x in rows], n
+
+
+def _grow(prefix, cands, i, min_count, max_len):
+    # itemsets prefix + cands[i] + later candidates; cands holds
+    # (item, tidlist, count) extensions of prefix that are all frequent
+    item, t, c = cands[i]
+    found = prefix + (item,)
+    yield found, c
+    if max_len and len(found) >= max_len:
+        return
+    nxt = []
+    for item2, t2, _ in cands[i + 1:]:
+        u = t & t2
+        k = u.bit_count()
+        if k >= min_count:
+            nxt.append((item2, u, k))
+    for j in range(len(nxt)):
+        yield from _grow(found, nxt, j, min_count, max_len)
+
+
+_JOB = None
+
+
+def _init_job(cands, min_count, max_len):
+    global _JOB
+    _JOB = (cands, min_count, max_len)
+
+
+def _branch(i):
+    # worker side: every itemset whose first item is cands[i]
+    cands, min_count, max_len = _JOB
+    return list(_grow((), cands, i, min_count, max_len))
+
+
+class Miner:
+
+    def __init__(self, data, min_support=0.1, max_len=None):
+        if not 0 < min_support <= 1:
+            raise ValueError('min_support must be in (0, 1]')
+        self.labels, self.tids, self.n = tidlists(data)
+        self.min_count = max(1, math.ceil(min_support * self.n - 1e-9))
+        self.max_len = max_len
+        self.counts = {}
+
+    def support(self, items):
+        # row count of an itemset of item ids
+        key = frozenset(items)
+        c = self.counts.get(key)
+        if c is None:
+            it = iter(key)
+            t = self.tids[next(it)]
+            for i in it:
+                t &= self.tids[i]
+            c = self.counts[key] = t.bit_count()
+        return c
+
+    def itemsets(self, workers=None):
+        # (item ids, row count) for every frequent itemset, lazily; with
+        # workers > 1 the first-item branches run in a process pool
+        cands = [(i, t, t.bit_count()) for i, t in enumerate(self.tids)]
+        cands = sorted((x for x in cands if x[2] >= self.min_count), key=lambda x: (x[2], x[0]))
+        if workers in (None, 1) or len(cands) < 2:
+            branches = (_grow((), cands, i, self.min_count, self.max_len) for i in range(len(cands)))
+        else:
+            branches = self._pooled(cands, workers)
+        for branch in branches:
+            for items, c in branch:
+                self.counts[frozenset(items)] = c
+                yield items, c
+
+    def _pooled(self, cands, workers):
+        ex = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_job,
+                                 initargs=(cands, self.min_count, self.max_len))
+        try:
+            yield from ex.map(_branch, range(len(cands)))
+        finally:
+            # a consumer that stops early drops the branches not yet started
+            ex.shutdown(cancel_futures=True)
+
+    def rules(self, min_confidence=0.5, min_lift=0.0, workers=None):
+        n = self.n
+        for items, c in self.itemsets(workers):
+            if len(items) < 2:
+                continue
+            whole = frozenset(items)
+            cons = [frozenset([x]) for x in items]
+            while cons and len(next(iter(cons))) < len(items):
+                keep = []
+                for q in cons:
+                    a = whole - q
+                    conf = c / self.support(a)
+                    if conf < min_confidence:
+                        continue
+                    keep.append(q)
+                    lift = conf * n / self.support(q)
+                    if lift >= min_lift:
+                        yield Rule(self.named(a), self.named(q), c / n, conf, lift)
+                cons = list({x | y for x, y in combinations(keep, 2) if len(x | y) == len(x) + 1})
+
+    def named(self, items):
+        return tuple(self.labels[i] for i in sorted(items))
+
+
+def main(argv=None):
+    from ailab.onehot import read_onehot
+    ap = argparse.ArgumentParser(prog='python -m ailab.rules')
+    ap.add_argument('input')
+    ap.add_argument('--min-support', type=float, default=0.2)
+    ap.add_argument('--min-confidence', type=float, default=0.6)
+    ap.add_argument('--min-lift', type=float, default=0.0)
+    ap.add_argument('--max-len', type=int)
+    ap.add_argument('--workers', type=int)
+    ap.add_argument('--limit', type=int, help='stop after this many rules')
+    args = ap.parse_args(argv)
+    m = Miner(read_onehot(args.input), args.min_support, args.max_len)
+    k = 0
+    for k, rule in enumerate(m.rules(args.min_confidence, args.min_lift, args.workers), 1):
+        print(rule)
+        if args.limit and k >= args.limit:
+            break
+    print(f"{k} rules from {m.n} transactions (min support {m.min_count} rows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+# search.py
+#
+# Uninformed search shared by the day 3/4/5 solvers. States are compact codes
+# (ints) produced by the problem; the search keeps one parent pointer per
+# state in a dict and rebuilds the path only when the goal is reached, so a
+# frontier entry is just (state, cost) instead of a copied path.
+#
+# A problem provides
+#   start                  initial state code
+#   next_states(s)         iterable of (next state code, action)
+#   is_goal(s)             bool
+#   cost(s, a, ns)         step cost (1 if the problem does not define it)
+#   decode(s)              readable state, used for paths and printing
+#
+# Every search takes an optional trace (ailab.trace.Tracer); one step record
+# per expansion carries the state code, path cost and frontier size.
+
+import heapq
+import random
+import resource
+import time
+from collections import deque, namedtuple
+
+
+def get_memory_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Result(namedtuple('Result', 'path actions expanded generated max_frontier seconds memory_kb')):
+    __slots__ = ()
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    @property
+    def rate(self):
+        # expanded nodes per second
+        return self.expanded / self.seconds if self.seconds else 0.0
+
+
+# frontiers: push(state, cost), pop() -> (state, cost), len()
+
+class FIFO(deque):
+
+    def push(self, s, c):
+        self.append((s, c))
+
+    pop = deque.popleft
+
+
+class LIFO(list):
+
+    def push(self, s, c):
+        self.append((s, c))
+
+
+class Priority:
+
+    def __init__(self):
+        self.q = []
+        self.n = 0
+
+    def push(self, s, c):
+        # insertion counter breaks ties, so states never get compared
+        self.n += 1
+        heapq.heappush(self.q, (c, self.n, s))
+
+    def pop(self):
+        c, _, s = heapq.heappop(self.q)
+        return s, c
+
+    def __len__(self):
+        return len(self.q)
+
+
+def step_cost(problem):
+    return getattr(problem, 'cost', None) or (lambda s, a, ns: 1)
+
+
+def rebuild(parent, s, decode=None):
+    # walk the parent pointers back from s; returns (states, actions)
+    states, actions = [s], []
+    while parent[s] is not None:
+        s, a = parent[s]
+        states.append(s)
+        actions.append(a)
+    states.reverse()
+    actions.reverse()
+    if decode:
+        states = [decode(x) for x in states]
+    return states, actions
+
+
+def graph_search(problem, frontier, limit=None, reopen=False, trace=None):
+    # limit: depth limit (DLS); reopen: re-expand a state reached more cheaply
+    # (UCS cost, DLS depth)
+    trace = trace or None
+    tick = trace.gap() if trace is not None and trace.full else 0
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    cost = step_cost(problem) if limit is None else (lambda s, a, ns: 1)
+    decode = getattr(problem, 'decode', None)
+    s0 = problem.start
+    parent = {s0: None}
+    # cheapest cost/depth seen per state; only kept when states can be reopened
+    best = {s0: 0} if reopen else None
+    frontier.push(s0, 0)
+    expanded = generated = peak = 0
+    goal = None
+    while frontier:
+        if len(frontier) > peak:
+            peak = len(frontier)
+        s, g = frontier.pop()
+        if reopen and g > best[s]:
+            continue
+        expanded += 1
+        if tick:
+            tick -= 1
+            if not tick:
+                trace.step(expanded, s, g, frontier=len(frontier))
+                tick = trace.gap()
+        if problem.is_goal(s):
+            goal = s
+            break
+        if limit is not None and g >= limit:
+            continue
+        for ns, a in problem.next_states(s):
+            generated += 1
+            ng = g + cost(s, a, ns)
+            if reopen:
+                old = best.get(ns)
+                if old is not None and ng >= old:
+                    continue
+                best[ns] = ng
+            elif ns in parent:
+                continue
+            parent[ns] = (s, a)
+            frontier.push(ns, ng)
+    path = actions = None
+    if goal is not None:
+        path, actions = rebuild(parent, goal, decode)
+    res = Result(path, actions, expanded, generated, peak,
+                 time.perf_counter() - t0, get_memory_kb() - m0)
+    if trace is not None:
+        summarize(trace, res)
+    return res
+
+
+def summarize(trace, res):
+    trace.summary(found=res.found, moves=len(res.actions) if res.found else None,
+                  expanded=res.expanded, generated=res.generated,
+                  max_frontier=res.max_frontier)
+
+
+def bfs(problem, trace=None):
+    return graph_search(problem, FIFO(), trace=trace)
+
+
+def dfs(problem, trace=None):
+    return graph_search(problem, LIFO(), trace=trace)
+
+
+def dls(problem, limit, trace=None):
+    return graph_search(problem, LIFO(), limit=limit, reopen=True, trace=trace)
+
+
+def ucs(problem, trace=None):
+    return graph_search(problem, Priority(), reopen=True, trace=trace)
+
+
+def ids(problem, max_depth, trace=None):
+    trace = trace or None
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    expanded = generated = peak = 0
+    res = None
+    for limit in range(max_depth + 1):
+        if trace is not None:
+            trace.event('depth limit %d' % limit)
+        res = dls(problem, limit, trace)
+        expanded += res.expanded
+        generated += res.generated
+        peak = max(peak, res.max_frontier)
+        if res.found:
+            break
+    return Result(res.path, res.actions, expanded, generated, peak,
+                  time.perf_counter() - t0, get_memory_kb() - m0)
+
+
+def ils(problem, max_restarts=5, seed=None, trace=None):
+    # randomized depth-first restarts; keeps the shortest path found
+    trace = trace or None
+    tick = trace.gap() if trace is not None and trace.full else 0
+    rnd = random.Random(seed)
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    decode = getattr(problem, 'decode', None)
+    best = None
+    expanded = generated = peak = 0
+    for restart in range(max_restarts):
+        if trace is not None:
+            trace.event('restart %d' % restart)
+        s0 = problem.start
+        parent = {s0: None}
+        stack = [s0]
+        while stack:
+            peak = max(peak, len(stack))
+            s = stack.pop()
+            expanded += 1
+            if tick:
+                tick -= 1
+                if not tick:
+                    trace.step(expanded, s, frontier=len(stack))
+                    tick = trace.gap()
+            if problem.is_goal(s):
+                found = rebuild(parent, s, decode)
+                if best is None or len(found[0]) < len(best[0]):
+                    best = found
+                break
+            nxt = list(problem.next_states(s))
+            rnd.shuffle(nxt)
+            for ns, a in nxt:
+                generated += 1
+                if ns not in parent:
+                    parent[ns] = (s, a)
+                    stack.append(ns)
+    path, actions = best or (None, None)
+    res = Result(path, actions, expanded, generated, peak,
+                 time.perf_counter() - t0, get_memory_kb() - m0)
+    if trace is not None:
+        summarize(trace, res)
+    return res
+
+
+ALGORITHMS = {'BFS': bfs, 'DFS': dfs, 'DLS': dls, 'IDS': ids, 'UCS': ucs, 'ILS': ils}
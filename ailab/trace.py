@@ -0,0 +1,195 @@
+# trace.py
+#
+# Step tracing for the solvers. The file is opened once and written through a
+# large buffer; per-step records can be thinned with every=N or sample=p.
+# Solvers do the thinning themselves with a countdown from gap(), so a step
+# that is not logged costs one decrement:
+#
+#   tick = trace.gap() if trace is not None and trace.full else 0
+#   ...
+#   if tick:
+#       tick -= 1
+#       if not tick:
+#           trace.step(n, state, cost, depth, frontier)
+#           tick = trace.gap()
+#
+#   level 'off'      nothing is written (a Tracer at this level is falsy, so
+#                    solvers skip the hook entirely)
+#   level 'summary'  events (restarts, depth changes) and the final summary
+#   level 'full'     also one record per logged step
+#
+# Steps are written as text, or with binary=True as fixed-size records (the
+# state as a u64, or length-prefixed bytes when it does not fit or is None),
+# so nothing is formatted while the solver runs. A text trace can take a
+# line=callable(n, state, cost, depth, frontier) for solvers whose step file
+# has its own layout (the day 6 best_first boards). The offline
+# pretty-printer turns a binary trace back into text:
+#
+#   python -m ailab.trace run.trc [--problem river|hanoi:10|npuzzle:3] [--limit 100]
+
+import argparse
+import json
+import math
+import random
+import struct
+import sys
+import time
+
+LEVELS = ('off', 'summary', 'full')
+MAGIC = b'TRC1'
+STEP, BIGSTEP, EVENT = 1, 2, 3
+REC = struct.Struct('<BQdiIQ')   # kind, step, cost, depth, frontier, state
+BIG = struct.Struct('<BQdiII')   # same, then the state length and its bytes
+EVT = struct.Struct('<BI')       # kind, text length
+U64 = 1 << 64
+BUFSIZE = 1 << 16
+
+
+class Tracer:
+
+    def __init__(self, path=None, level='full', every=1, sample=None, binary=False,
+                 fmt=None, line=None, meta=None, seed=0):
+        if level not in LEVELS:
+            raise ValueError('level must be one of %s' % (LEVELS,))
+        if sample is not None and not 0 < sample <= 1:
+            raise ValueError('sample must be in (0, 1]')
+        self.level = level
+        self.every = max(1, every)
+        self.sample = sample
+        self.rnd = random.Random(seed)
+        self.binary = binary
+        self.fmt = fmt or str
+        self.line = line
+        self.logged = 0
+        self.t0 = time.perf_counter()
+        self.f = None
+        if level != 'off' and path:
+            self.f = open(path, 'wb' if binary else 'w', buffering=BUFSIZE)
+            if binary:
+                head = json.dumps(meta or {}).encode()
+                self.f.write(MAGIC + struct.pack('<I', len(head)) + head)
+        # per-step records only at 'full' and with somewhere to write them
+        self.full = level == 'full' and self.f is not None
+
+    def __bool__(self):
+        return self.level != 'off'
+
+    def gap(self):
+        # steps until the next one to log (>= 1)
+        if self.sample is None or self.sample == 1:
+            return self.every
+        return self.every * (int(math.log(1.0 - self.rnd.random()) / math.log1p(-self.sample)) + 1)
+
+    def step(self, n, state=None, cost=0, depth=0, frontier=0):
+        self.logged += 1
+        if self.binary:
+            if state is None:
+                self.f.write(BIG.pack(BIGSTEP, n, cost, depth, frontier, 0))
+            elif state < U64:
+                self.f.write(REC.pack(STEP, n, cost, depth, frontier, state))
+            else:
+                raw = state.to_bytes((state.bit_length() + 7) // 8, 'little')
+                self.f.write(BIG.pack(BIGSTEP, n, cost, depth, frontier, len(raw)) + raw)
+        elif self.line is not None:
+            self.f.write(self.line(n, state, cost, depth, frontier))
+        elif state is None:
+            # solvers without a state code (the TSP annealer) log the cost only
+            self.f.write(f"Step {n}: cost={cost}\n")
+        else:
+            self.f.write(f"Step {n}: {self.fmt(state)} cost={cost} depth={depth} frontier={frontier}\n")
+
+    def event(self, msg):
+        if self.f is None:
+            return
+        if self.binary:
+            raw = msg.encode()
+            self.f.write(EVT.pack(EVENT, len(raw)))
+            self.f.write(raw)
+        else:
+            self.f.write(msg + '\n')
+
+    def summary(self, **kv):
+        kv.setdefault('logged', self.logged)
+        kv.setdefault('elapsed', round(time.perf_counter() - self.t0, 6))
+        self.event('summary ' + ' '.join('%s=%s' % kv_ for kv_ in kv.items()))
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path):
+    # yields the meta dict, then ('step', n, cost, depth, frontier, state) or ('event', text)
+    with open(path, 'rb') as f:
+        if f.read(4) != MAGIC:
+            raise ValueError('%s is not a binary trace' % path)
+        (n,) = struct.unpack('<I', f.read(4))
+        yield json.loads(f.read(n))
+        while True:
+            kind = f.read(1)
+            if not kind:
+                return
+            if kind[0] == STEP:
+                yield ('step',) + REC.unpack(kind + f.read(REC.size - 1))[1:]
+            elif kind[0] == BIGSTEP:
+                _, step, cost, depth, frontier, ln = BIG.unpack(kind + f.read(BIG.size - 1))
+                yield ('step', step, cost, depth, frontier, int.from_bytes(f.read(ln), 'little') if ln else None)
+            elif kind[0] == EVENT:
+                _, ln = EVT.unpack(kind + f.read(EVT.size - 1))
+                yield ('event', f.read(ln).decode())
+            else:
+                raise ValueError('corrupt trace record %r' % kind)
+
+
+def decoder(spec):
+    # state formatter for --problem
+    from ailab.problems import Hanoi, NPuzzle, RiverCrossing
+    if not spec:
+        return str
+    name, _, arg = spec.partition(':')
+    if name == 'river':
+        return RiverCrossing.state_str
+    if name == 'hanoi':
+        return Hanoi(int(arg)).decode
+    if name == 'npuzzle':
+        k = int(arg)
+        cells = list(range(k * k))
+        return NPuzzle(k, cells, cells).decode
+    raise ValueError('unknown problem %r' % spec)
+
+
+def pretty(path, problem=None, limit=None, out=sys.stdout):
+    recs = read_trace(path)
+    meta = next(recs)
+    fmt = decoder(problem or meta.get('problem'))
+    for i, r in enumerate(recs):
+        if limit is not None and i >= limit:
+            break
+        if r[0] == 'event':
+            out.write(r[1] + '\n')
+        else:
+            _, n, cost, depth, frontier, state = r
+            if state is None:
+                out.write(f"Step {n}: cost={cost:g}\n")
+            else:
+                out.write(f"Step {n}: {fmt(state)} cost={cost:g} depth={depth} frontier={frontier}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.trace')
+    ap.add_argument('trace')
+    ap.add_argument('--problem', help='river, hanoi:<discs> or npuzzle:<size> (default: from the trace)')
+    ap.add_argument('--limit', type=int)
+    args = ap.parse_args(argv)
+    pretty(args.trace, args.problem, args.limit)
+
+
+if __name__ == '__main__':
+    main()
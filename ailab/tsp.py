@@ -0,0 +1,435 @@
+# tsp.py
+#
+# Simulated annealing for the TSP (day 7/8), reading and writing the
+# assignment's files.
+#
+# The tour lives in an array('i') with a position index, and every move is
+# priced from the few edges it changes, so an iteration costs O(1) plus the
+# work of applying an accepted move:
+#
+#   swap     exchange two cities
+#   2-opt    replace edges (a,b), (c,d) by (a,c), (b,d): reverse the shorter
+#            of the two paths between them
+#   or-opt   move a run of 1-3 cities between two other neighbours, in the
+#            cheaper orientation
+#
+# Distances come from a contiguous float64 matrix (read through a flat
+# memoryview), or for more than MATRIX_MAX cities are computed on demand from
+# coordinates. Above NEIGHBOUR_MIN cities 2-opt and or-opt pick the second
+# city from the K nearest neighbours of the first, and the same lists speed
+# up the nearest-neighbour start tour. A final 2-opt/or-opt descent over the
+# neighbour lists (with don't-look bits) polishes the best tour, and
+# anneal_many() runs independent restarts in a process pool.
+#
+#   python -m ailab.tsp tsp_input.txt tsp_output.txt [--restarts 4] [--trace FILE --every 100]
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MATRIX_MAX = 3000
+NEIGHBOUR_MIN = 50
+K = 10
+EXACT_MAX = 8
+MOVES = (('2opt', 0.6), ('oropt', 0.3), ('swap', 0.1))
+
+
+class TSP:
+
+    def __init__(self, matrix=None, coords=None):
+        if matrix is None and coords is None:
+            raise ValueError('need a distance matrix or coordinates')
+        self.coords = None if coords is None else np.ascontiguousarray(coords, dtype=np.float64)
+        if matrix is not None:
+            self.matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+            if self.matrix.ndim != 2 or self.matrix.shape[0] != self.matrix.shape[1]:
+                raise ValueError('the distance matrix must be square')
+            if not np.allclose(self.matrix, self.matrix.T):
+                raise ValueError('the distance matrix must be symmetric')
+        elif len(self.coords) <= MATRIX_MAX:
+            diff = self.coords[:, None, :] - self.coords[None, :, :]
+            self.matrix = np.sqrt((diff ** 2).sum(axis=2))
+        else:
+            self.matrix = None
+        self.n = len(self.matrix if self.matrix is not None else self.coords)
+        self._neigh = None
+
+    def __getstate__(self):
+        # a matrix derived from coordinates is rebuilt rather than pickled
+        # into every pool worker
+        if self.coords is not None:
+            return {'coords': self.coords}
+        return {'matrix': self.matrix}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def dist(self):
+        # d(i, j) as a plain Python callable
+        if self.matrix is not None:
+            flat, n = memoryview(self.matrix.reshape(-1)), self.n
+            return lambda i, j: flat[i * n + j]
+        xs, ys = self.coords[:, 0].tolist(), self.coords[:, 1].tolist()
+        hypot = math.hypot
+        return lambda i, j: hypot(xs[i] - xs[j], ys[i] - ys[j])
+
+    def row(self, i):
+        # distances from i to every city, as an array
+        if self.matrix is not None:
+            return self.matrix[i]
+        return np.hypot(*(self.coords - self.coords[i]).T)
+
+    def neighbours(self, k=K):
+        # k nearest cities of each city, nearest first
+        if self._neigh is None:
+            k = min(k, self.n - 1)
+            if self.matrix is None:
+                from scipy.spatial import cKDTree
+                _, idx = cKDTree(self.coords).query(self.coords, k + 1)
+                self._neigh = [r[1:] for r in idx.tolist()]
+            else:
+                m = self.matrix.copy()
+                np.fill_diagonal(m, np.inf)
+                idx = np.argpartition(m, k - 1, axis=1)[:, :k]
+                order = np.take_along_axis(m, idx, 1).argsort(axis=1)
+                self._neigh = np.take_along_axis(idx, order, 1).tolist()
+        return self._neigh
+
+    def cost(self, tour):
+        d = self.dist()
+        return sum(d(tour[i - 1], tour[i]) for i in range(len(tour)))
+
+
+def read_input(path):
+    # matrix rows, then start city, initial temperature, cooling rate and
+    # iterations on one line each (the day 7 tsp_input.txt)
+    with open(path) as f:
+        lines = [line.split() for line in f if line.strip()]
+    n = len(lines[0])
+    rows = lines[:n]
+    if any(len(r) != n for r in rows):
+        raise ValueError('%s: expected a %dx%d distance matrix' % (path, n, n))
+    rest = [r[0] for r in lines[n:n + 4]]
+    return (TSP(matrix=[list(map(float, r)) for r in rows]), int(rest[0]), float(rest[1]),
+            float(rest[2]), int(rest[3]))
+
+
+def write_output(path, tour, cost):
+    with open(path, "w") as f:
+        f.write(f"Best Tour: {list(tour)}\n")
+        f.write(f"Best Cost: {cost:.2f}\n")
+
+
+def rotate(tour, start):
+    i = list(tour).index(start)
+    return list(tour[i:]) + list(tour[:i])
+
+
+def nearest_neighbour(tsp, start, neigh=None):
+    # the first unvisited city of a sorted neighbour list is the nearest one;
+    # only when the whole list is visited does a step scan every city (in numpy)
+    seen = np.zeros(tsp.n, bool)
+    tour = [start]
+    seen[start] = True
+    c = start
+    for _ in range(tsp.n - 1):
+        nxt = None
+        if neigh is not None:
+            for x in neigh[c]:
+                if not seen[x]:
+                    nxt = x
+                    break
+        if nxt is None:
+            nxt = int(np.where(seen, np.inf, tsp.row(c)).argmin())
+        c = nxt
+        seen[c] = True
+        tour.append(c)
+    return tour
+
+
+def exact(tsp, start):
+    # every tour through start, for tiny instances
+    d = tsp.dist()
+    others = [c for c in range(tsp.n) if c != start]
+    best, best_cost = None, math.inf
+    for p in itertools.permutations(others):
+        t = (start,) + p
+        c = sum(d(t[i - 1], t[i]) for i in range(len(t)))
+        if c < best_cost:
+            best, best_cost = list(t), c
+    return best, best_cost
+
+
+class Tour:
+    # array('i') tour + position index with O(1) move pricing
+
+    def __init__(self, tsp, cities):
+        self.n = len(cities)
+        self.t = array('i', cities)
+        self.pos = array('i', bytes(4 * self.n))
+        for p, c in enumerate(cities):
+            self.pos[c] = p
+        self.d = tsp.dist()
+
+    def reverse(self, i, j):
+        # reverse the cyclic path t[i..j]
+        t, pos, n = self.t, self.pos, self.n
+        L = (j - i) % n + 1
+        if 2 * L > n:
+            i, j, L = (j + 1) % n, (i - 1) % n, n - L
+        for _ in range(L // 2):
+            a, b = t[i], t[j]
+            t[i], t[j] = b, a
+            pos[b], pos[a] = i, j
+            i = i + 1 if i + 1 < n else 0
+            j = j - 1 if j else n - 1
+
+    def two_opt_delta(self, i, j):
+        t, d, n = self.t, self.d, self.n
+        a, b, c, e = t[i], t[(i + 1) % n], t[j], t[(j + 1) % n]
+        return d(a, c) + d(b, e) - d(a, b) - d(c, e)
+
+    def two_opt(self, i, j):
+        self.reverse((i + 1) % self.n, j)
+
+    def swap_delta(self, i, j):
+        t, d, n = self.t, self.d, self.n
+        if i > j:
+            i, j = j, i
+        a, b = t[i], t[j]
+        pa, na, pb, nb = t[i - 1], t[(i + 1) % n], t[j - 1], t[(j + 1) % n]
+        if j == i + 1:
+            return d(pa, b) + d(a, nb) - d(pa, a) - d(b, nb)
+        if i == 0 and j == n - 1:
+            return d(pb, a) + d(b, na) - d(pb, b) - d(a, na)
+        return d(pa, b) + d(b, na) + d(pb, a) + d(a, nb) - d(pa, a) - d(a, na) - d(pb, b) - d(b, nb)
+
+    def swap(self, i, j):
+        t, pos = self.t, self.pos
+        a, b = t[i], t[j]
+        t[i], t[j] = b, a
+        pos[a], pos[b] = j, i
+
+    def or_delta(self, i, L, k):
+        # run t[i..i+L-1] (1 <= i, i+L < n) reinserted after t[k];
+        # returns (delta, reversed)
+        t, d, n = self.t, self.d, self.n
+        s1, sL = t[i], t[i + L - 1]
+        p, nx = t[i - 1], t[i + L]
+        x, y = t[k], t[(k + 1) % n]
+        gain = d(p, nx) - d(p, s1) - d(sL, nx) - d(x, y)
+        fwd, rev = d(x, s1) + d(sL, y), d(x, sL) + d(s1, y)
+        return (gain + rev, True) if rev < fwd else (gain + fwd, False)
+
+    def or_move(self, i, L, k, rev):
+        t, pos = self.t, self.pos
+        seg = t[i:i + L]
+        if rev:
+            seg.reverse()
+        if k < i:
+            lo, hi = k + 1, i + L
+            t[lo:hi] = seg + t[k + 1:i]
+        else:
+            lo, hi = i, k + 1
+            t[lo:hi] = t[i + L:k + 1] + seg
+        for q in range(lo, hi):
+            pos[t[q]] = q
+
+    def cost(self):
+        t, d = self.t, self.d
+        return sum(d(t[i - 1], t[i]) for i in range(self.n))
+
+
+def improve(tour, neigh, a):
+    # first improving 2-opt or or-opt move around city a, applied; returns
+    # the cities whose edges changed, or None
+    n, t, pos, d = tour.n, tour.t, tour.pos, tour.d
+    i = pos[a]
+    succ, pred = t[(i + 1) % n], t[i - 1]
+    ds, dp = d(a, succ), d(pred, a)
+    for c in neigh[a]:
+        dac = d(a, c)
+        if dac >= ds and dac >= dp:
+            break
+        j = pos[c]
+        # new edge (a, c) joined with a's and c's successors, or predecessors
+        for ii, jj, da in ((i, j, ds), ((i - 1) % n, (j - 1) % n, dp)):
+            if dac >= da or (jj - ii) % n in (0, 1, n - 1):
+                continue
+            delta = tour.two_opt_delta(ii, jj)
+            if delta < -1e-9:
+                touched = [t[ii], t[(ii + 1) % n], t[jj], t[(jj + 1) % n]]
+                tour.two_opt(ii, jj)
+                return delta, touched
+    for L in (1, 2, 3):
+        if i < 1 or i + L >= n:
+            break
+        for c in neigh[a]:
+            for k in (pos[c], pos[c] - 1):
+                k %= n
+                if i - 1 <= k <= i + L - 1:
+                    continue
+                delta, rev = tour.or_delta(i, L, k)
+                if delta < -1e-9:
+                    touched = [t[i - 1], t[i + L], a, t[i + L - 1], t[k], t[(k + 1) % n]]
+                    tour.or_move(i, L, k, rev)
+                    return delta, touched
+    return 0.0, None
+
+
+def polish(tour, neigh):
+    # 2-opt/or-opt descent with don't-look bits: only cities next to a
+    # changed edge are examined again. Returns the total delta.
+    queue = deque(range(tour.n))
+    queued = bytearray(b'\x01') * tour.n
+    total = 0.0
+    while queue:
+        a = queue.popleft()
+        queued[a] = 0
+        delta, touched = improve(tour, neigh, a)
+        if touched:
+            total += delta
+            for c in touched:
+                if not queued[c]:
+                    queued[c] = 1
+                    queue.append(c)
+    return total
+
+
+def anneal(tsp, start_city=0, init_temp=1000.0, cooling_rate=0.95, iterations=10000,
+           seed=None, seed_city=None, moves=MOVES, finish=True, trace=None):
+    # returns (best tour starting at start_city, best cost)
+    n = tsp.n
+    if n <= EXACT_MAX:
+        return exact(tsp, start_city)
+    rnd = random.Random(seed)
+    trace = trace or None
+    tick = trace.gap() if trace is not None and trace.full else 0
+    neigh = tsp.neighbours() if n > NEIGHBOUR_MIN else None
+    tour = Tour(tsp, nearest_neighbour(tsp, start_city if seed_city is None else seed_city, neigh))
+    t, pos = tour.t, tour.pos
+    cur = tour.cost()
+    best, best_cost = array('i', t), cur
+    names = [m for m, _ in moves]
+    weights = list(itertools.accumulate(w for _, w in moves))
+    kinds = [names[x] for x in rnd.choices(range(len(names)), cum_weights=weights, k=min(iterations, 1 << 16))]
+    nk = len(kinds)
+    random_ = rnd.random
+    randrange = rnd.randrange
+    exp = math.exp
+    temp = init_temp
+    for it in range(iterations):
+        if tick:
+            tick -= 1
+            if not tick:
+                trace.step(it, None, cur)
+                tick = trace.gap()
+        kind = kinds[it % nk]
+        if kind == '2opt':
+            if neigh is None:
+                i, j = randrange(n), randrange(n)
+            else:
+                a = randrange(n)
+                i, j = pos[a], pos[neigh[a][randrange(len(neigh[a]))]]
+            if (j - i) % n in (0, 1, n - 1):
+                temp *= cooling_rate
+                continue
+            delta = tour.two_opt_delta(i, j)
+        elif kind == 'oropt':
+            L = randrange(1, 4)
+            i = randrange(1, n - L)
+            if neigh is None:
+                k = randrange(n)
+            else:
+                k = (pos[neigh[t[i]][randrange(len(neigh[t[i]]))]] - randrange(2)) % n
+            if i - 1 <= k <= i + L - 1:
+                temp *= cooling_rate
+                continue
+            delta, rev = tour.or_delta(i, L, k)
+        else:
+            i, j = randrange(n), randrange(n)
+            if i == j:
+                temp *= cooling_rate
+                continue
+            delta = tour.swap_delta(i, j)
+        if delta <= 0 or (temp > 1e-12 and random_() < exp(-delta / temp)):
+            if kind == '2opt':
+                tour.two_opt(i, j)
+            elif kind == 'oropt':
+                tour.or_move(i, L, k, rev)
+            else:
+                tour.swap(i, j)
+            cur += delta
+            if cur < best_cost - 1e-9:
+                best_cost = cur
+                best = array('i', t)
+        temp *= cooling_rate
+    if finish:
+        tour = Tour(tsp, best)
+        polish(tour, neigh or tsp.neighbours())
+        best = tour.t
+    best = rotate(best, start_city)
+    best_cost = tsp.cost(best)
+    if trace is not None:
+        trace.summary(iterations=iterations, best_cost=round(best_cost, 2))
+    return best, best_cost
+
+
+def _anneal_job(args):
+    tsp, kw = args
+    return anneal(tsp, **kw)
+
+
+def anneal_many(tsp, restarts=4, workers=None, seed=0, **kw):
+    # independent restarts, each from the nearest-neighbour tour of a
+    # different city (the first from start_city); returns the best
+    rnd = random.Random(seed)
+    start = kw.get('start_city', 0)
+    jobs = []
+    for r in range(restarts):
+        jkw = dict(kw, seed=rnd.randrange(1 << 30),
+                   seed_city=start if r == 0 else rnd.randrange(tsp.n))
+        jobs.append((tsp, jkw))
+    if restarts == 1 or workers == 1:
+        results = [_anneal_job(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or min(restarts, os.cpu_count() or 1)) as ex:
+            results = list(ex.map(_anneal_job, jobs))
+    return min(results, key=lambda r: r[1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m ailab.tsp')
+    ap.add_argument('input', nargs='?', default='tsp_input.txt')
+    ap.add_argument('output', nargs='?', default='tsp_output.txt')
+    ap.add_argument('--restarts', type=int, default=1)
+    ap.add_argument('--workers', type=int)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--trace', help='intermediate output: iteration and current cost')
+    ap.add_argument('--every', type=int, default=1, help='log every N-th iteration')
+    args = ap.parse_args(argv)
+    tsp, start, init_temp, cooling, iterations = read_input(args.input)
+    kw = dict(start_city=start, init_temp=init_temp, cooling_rate=cooling, iterations=iterations)
+    t0 = time.perf_counter()
+    if args.trace:
+        from ailab.trace import Tracer
+        with Tracer(args.trace, 'full', every=args.every) as tr:
+            tour, cost = anneal(tsp, seed=args.seed, trace=tr, **kw)
+    elif args.restarts > 1:
+        tour, cost = anneal_many(tsp, args.restarts, args.workers, args.seed, **kw)
+    else:
+        tour, cost = anneal(tsp, seed=args.seed, **kw)
+    write_output(args.output, tour, cost)
+    print(f"Best cost {cost:.2f} over {tsp.n} cities in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# bench_games.py
+#
+# ailab.games.Engine against the day 9 ab()/hard_move() (copied below and
+# generalised to n x n) on the same positions: the empty 3x3 board, and 4x4
+# boards with some cells already played, then perfect play from the empty
+# 4x4 board, which the notebook search cannot reach.
+#
+#   python benchmarks/bench_games.py [--prefill 6]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab.games import Engine, Game, solve
+
+
+def win(b, p):
+    n = len(b)
+    for i in range(n):
+        if all(b[i][j] == p for j in range(n)): return True
+        if all(b[j][i] == p for j in range(n)): return True
+    if all(b[i][i] == p for i in range(n)): return True
+    if all(b[i][n - 1 - i] == p for i in range(n)): return True
+    return False
+
+
+def full(b):
+    return all(c != '.' for r in b for c in r)
+
+
+def score(b):
+    if win(b, 'O'): return 1
+    if win(b, 'X'): return -1
+    return 0
+
+
+def ab(b, turn, a, bval, count):
+    count[0] += 1
+    n = len(b)
+    if win(b, 'O') or win(b, 'X') or full(b):
+        return score(b)
+    if turn == 'O':
+        best = -2
+        for i in range(n):
+            for j in range(n):
+                if b[i][j] == '.':
+                    b[i][j] = 'O'
+                    val = ab(b, 'X', a, bval, count)
+                    b[i][j] = '.'
+                    if val > best: best = val
+                    if best >= bval: return best
+                    if best > a: a = best
+        return best
+    best = 2
+    for i in range(n):
+        for j in range(n):
+            if b[i][j] == '.':
+                b[i][j] = 'X'
+                val = ab(b, 'O', a, bval, count)
+                b[i][j] = '.'
+                if val < best: best = val
+                if best <= a: return best
+                if best < bval: bval = best
+    return best
+
+
+def hard_move(b, ai, count):
+    n = len(b)
+    best = -2
+    x, y = -1, -1
+    for i in range(n):
+        for j in range(n):
+            if b[i][j] == '.':
+                b[i][j] = ai
+                val = ab(b, 'X' if ai == 'O' else 'O', -2, 2, count)
+                b[i][j] = '.'
+                if val > best:
+                    best = val
+                    x, y = i, j
+    return x, y
+
+
+def position(n, filled, seed):
+    # a random non-terminal board with `filled` cells played, O to move
+    rnd = random.Random(seed)
+    g = Game(n)
+    while True:
+        pos = g.position()
+        for _ in range(filled):
+            pos.play(rnd.choice(pos.moves()))
+        if not (pos.wins(0) or pos.wins(1) or pos.threats(0) or pos.threats(1)) and pos.turn == 'O':
+            return g, pos
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--prefill', type=int, default=7, help='cells already played on the 4x4 boards')
+    ap.add_argument('-n', type=int, default=3, help='4x4 boards to try')
+    args = ap.parse_args()
+    g3 = Game(3)
+    cases = [('3x3 empty', (g3, g3.position(turn='O')))]
+    for i in range(args.n):
+        cases.append((f'4x4 {args.prefill} played #{i}', position(4, args.prefill, i)))
+    for label, (g, pos) in cases:
+        b = pos.rows()
+        count = [0]
+        t0 = time.perf_counter()
+        hard_move(b, 'O', count)
+        old = time.perf_counter() - t0
+        eng = Engine(g)
+        t0 = time.perf_counter()
+        move, res = solve(pos, eng)
+        new = time.perf_counter() - t0
+        print(f"{label:22s} day 9 ab: {count[0]:9d} nodes {old:8.3f}s | engine: {eng.nodes:7d} nodes "
+              f"{new:7.3f}s  value={res:+d}", flush=True)
+    g = Game(4)
+    eng = Engine(g)
+    t0 = time.perf_counter()
+    move, res = solve(g.position(), eng)
+    print(f"4x4 empty board, perfect play: {['loss', 'draw', 'win'][res + 1]} for X, first move {divmod(move, 4)}, "
+          f"{eng.nodes} nodes, {len(eng.tt)} table entries, {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
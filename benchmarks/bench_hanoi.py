@@ -0,0 +1,104 @@
+# bench_hanoi.py
+#
+# ailab.hanoi (2-bit marks, numpy levels, one-way and bidirectional) against
+# the day 3 bfs_hanoi (copied below, CSV rows kept in memory and written to
+# os.devnull) moving the whole tower from rod 0 to rod 2. The notebook copies
+# the move list into every queue entry, so it is skipped above --old-max discs.
+# Peak memory is a second, tracemalloc-instrumented run.
+#
+#   python benchmarks/bench_hanoi.py [--discs 8,10,12,14,16] [--old-max 12]
+
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import hanoi
+
+
+def valid_move(state, from_rod, to_rod):
+    if not state[from_rod]:
+        return False
+    if not state[to_rod]:
+        return True
+    return state[from_rod][-1] < state[to_rod][-1]
+
+
+def bfs_hanoi(num_discs, init_rod, final_rod, output_file=os.devnull):
+    # day 3 bfs_hanoi for decreasing stacks, without max_steps
+    init = [(), (), ()]
+    init[init_rod] = tuple(range(num_discs, 0, -1))
+    goal = [(), (), ()]
+    goal[final_rod] = tuple(range(num_discs, 0, -1))
+    init, goal = tuple(init), tuple(goal)
+    queue = deque([(init, [])])
+    visited = {init}
+    output_rows = [["S.No.", "Rod 0", "Rod 1", "Rod 2", "Move"]]
+    step_count = 0
+    length = -1
+    while queue:
+        state, path = queue.popleft()
+        if path:
+            fr, to = path[-1]
+            move_desc = f"Move disc {state[to][-1]} from Rod {fr} to Rod {to}"
+        else:
+            move_desc = "Initial state"
+        output_rows.append([step_count + 1, list(state[0]), list(state[1]), list(state[2]), move_desc])
+        if state == goal:
+            length = len(path)
+            output_rows.append([f"Goal state reached after exploring {step_count + 1} states.", "", "", "",
+                                f"Solution path length: {length} moves."])
+            break
+        for from_rod in range(3):
+            for to_rod in range(3):
+                if from_rod != to_rod and valid_move(state, from_rod, to_rod):
+                    new_state = [list(rod) for rod in state]
+                    disc = new_state[from_rod].pop()
+                    new_state[to_rod].append(disc)
+                    new_state_tuple = tuple(tuple(rod) for rod in new_state)
+                    if new_state_tuple not in visited:
+                        visited.add(new_state_tuple)
+                        queue.append((new_state_tuple, path + [(from_rod, to_rod)]))
+        step_count += 1
+    with open(output_file, "w", newline="") as f:
+        csv.writer(f).writerows(output_rows)
+    return length, step_count + 1
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--discs', default='8,10,12,14,16')
+    ap.add_argument('--old-max', type=int, default=12)
+    args = ap.parse_args()
+    for n in [int(x) for x in args.discs.split(',')]:
+        start, goal = [0] * n, [2] * n
+        runs = [('bfs, full CSV', lambda: hanoi.bfs(n, start, goal, os.devnull)),
+                ('bfs', lambda: hanoi.bfs(n, start, goal)),
+                ('bidirectional', lambda: hanoi.bidirectional(n, start, goal))]
+        if n <= args.old_max:
+            runs.insert(0, ('day 3 notebook', lambda: bfs_hanoi(n, 0, 2)))
+        for label, fn in runs:
+            t0 = time.perf_counter()
+            r = fn()
+            dt = time.perf_counter() - t0
+            moves, states = (len(r.actions), r.expanded) if hasattr(r, "actions") else r
+            print(f"n={n:2d}  {label:16s} {dt:8.2f}s  moves={moves:6d}  states={states:9d}  "
+                  f"{states / dt:10.0f} states/s  peak={peak_mb(fn):8.1f} MB")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# bench_npuzzle.py
+#
+# IDA* on random solvable 15-puzzles: Manhattan + linear conflict vs the
+# 5-5-5 additive pattern databases (built on first use, then memory-mapped),
+# and the day 4 recursive dls() on the 8-puzzle input for reference.
+#
+#   python benchmarks/bench_npuzzle.py [-n 10] [--seed 1] [--no-md]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from ailab.npuzzle import Board, PatternDB, read_input, solvable, solve
+
+INPUT8 = os.path.join(HERE, '..', 'day4_ass4', '041_Assignment4_Sushar_Hembram_input.txt')
+
+
+def notebook_dls(state, goal, size, limit, path, seen):
+    # day 4 dls(), with possible_moves/swap inlined
+    if state == goal:
+        return path + [state]
+    if limit == 0:
+        return None
+    seen.add(tuple(state))
+    blank = state.index(0)
+    row, col = divmod(blank, size)
+    for move, ok in ((-size, row > 0), (size, row < size - 1), (-1, col > 0), (1, col < size - 1)):
+        if not ok:
+            continue
+        nxt = state[:]
+        nxt[blank], nxt[blank + move] = nxt[blank + move], nxt[blank]
+        if tuple(nxt) not in seen:
+            res = notebook_dls(nxt, goal, size, limit - 1, path + [state], seen)
+            if res:
+                return res
+    seen.remove(tuple(state))
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('-n', type=int, default=10)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--no-md', action='store_true', help='skip Manhattan + linear conflict (slow on hard instances)')
+    args = ap.parse_args()
+
+    size, start, goal = read_input(INPUT8)
+    t0 = time.perf_counter()
+    p = notebook_dls(start, goal, size, 20, [], set())
+    dt = time.perf_counter() - t0
+    r = solve(size, start, goal)
+    print(f"8-puzzle input: day 4 dls(limit=20) {len(p) - 1} moves {dt:.3f}s | "
+          f"IDA* {len(r.actions)} moves {r.seconds:.3f}s")
+
+    goal = list(range(1, 16)) + [0]
+    t0 = time.perf_counter()
+    PatternDB(Board(4), goal)
+    print(f"pattern databases ready in {time.perf_counter() - t0:.1f}s")
+    rnd = random.Random(args.seed)
+    tot = {}
+    for i in range(args.n):
+        while True:
+            s = goal[:]
+            rnd.shuffle(s)
+            if solvable(4, s, goal):
+                break
+        line = f"#{i:2d}"
+        for label, kw in (('pdb', {'pdb': True}), ('md+lc', {})):
+            if label == 'md+lc' and args.no_md:
+                continue
+            r = solve(4, s, goal, **kw)
+            line += f"  {label}: {len(r.actions):3d} moves {r.expanded:9d} nodes {r.seconds:7.2f}s"
+            tot.setdefault(label, []).append(r.seconds)
+        print(line, flush=True)
+    for label, ts in tot.items():
+        ts.sort()
+        print(f"{label:6s} median {ts[len(ts) // 2]:.2f}s  max {ts[-1]:.2f}s  total {sum(ts):.1f}s")
+
+
+if __name__ == '__main__':
+    main()
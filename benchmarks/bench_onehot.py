@@ -0,0 +1,114 @@
+# bench_onehot.py
+#
+# ailab.onehot against the day 2 pipeline (make_transactions, binary_table,
+# save_csv and the graph-building draw_binary_graph, copied below) on
+# synthetic cancer_demographics.csv-style files. The notebook holds every
+# cell as a Python string, so it is skipped above --old-max rows.
+#
+#   python benchmarks/bench_onehot.py [--rows 1000,10000,100000,1000000] [--values 8]
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from ailab import onehot
+
+
+def make_transactions(filename):
+    with open(filename, 'r') as file:
+        lines = file.readlines()
+    header = lines[0].strip().split(',')[1:]
+    all_data = []
+    for line in lines[1:]:
+        values = line.strip().split(',')[1:]
+        row = [header[i] + "=" + values[i] for i in range(len(values))]
+        all_data.append(row)
+    return all_data
+
+
+def binary_table(data):
+    unique_values = []
+    for row in data:
+        for item in row:
+            if item not in unique_values:
+                unique_values.append(item)
+    table = []
+    for row in data:
+        binary_row = [1 if item in row else 0 for item in unique_values]
+        table.append(binary_row)
+    return unique_values, table
+
+
+def save_csv(filename, header, data):
+    with open(filename, 'w') as file:
+        file.write(','.join(header) + '\n')
+        for row in data:
+            file.write(','.join(map(str, row)) + '\n')
+
+
+def draw_binary_graph(csv_file):
+    with open(csv_file, 'r') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        data = [list(map(int, row)) for row in reader]
+    G = nx.Graph()
+    for name in header:
+        G.add_node(name)
+    for row in data:
+        ones = [header[i] for i in range(len(row)) if row[i] == 1]
+        for i in range(len(ones)):
+            for j in range(i + 1, len(ones)):
+                G.add_edge(ones[i], ones[j])
+    return G
+
+
+def synthetic(path, rows, values, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = {'PatientID': np.arange(rows)}
+    for name in ('Gender', 'AgeGroup', 'FamilyHistory', 'CancerType', 'Stage'):
+        k = 2 if name in ('Gender', 'FamilyHistory') else values
+        cols[name] = np.char.add(name[:3], rng.integers(0, k, rows).astype(str))
+    pd.DataFrame(cols).to_csv(path, index=False)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', default='1000,10000,100000,1000000')
+    ap.add_argument('--values', type=int, default=8, help='values per non-binary attribute')
+    ap.add_argument('--old-max', type=int, default=100000)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = os.path.join(tmp, 'in.csv'), os.path.join(tmp, 'binary_data.csv')
+        for n in [int(x) for x in args.rows.split(',')]:
+            synthetic(src, n, args.values)
+            if n <= args.old_max:
+                t0 = time.perf_counter()
+                uv, table = binary_table(make_transactions(src))
+                save_csv(out, uv, table)
+                t1 = time.perf_counter()
+                G = draw_binary_graph(out)
+                t2 = time.perf_counter()
+                print(f"rows={n:8d}  day 2 notebook  table {t1 - t0:7.2f}s  graph {t2 - t1:7.2f}s  "
+                      f"edges={G.number_of_edges()}")
+            t0 = time.perf_counter()
+            oh = onehot.read_onehot(src)
+            oh.write_csv(out)
+            t1 = time.perf_counter()
+            C = onehot.cooccurrence(oh.to_csr())
+            G = onehot.graph(C, oh.vocab.items)
+            t2 = time.perf_counter()
+            print(f"rows={n:8d}  ailab.onehot    table {t1 - t0:7.2f}s  graph {t2 - t1:7.2f}s  "
+                  f"edges={G.number_of_edges()}  {n / (t2 - t0):10.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# bench_rules.py
+#
+# ailab.rules (Eclat on int bitsets) against a plain Apriori over Python
+# sets, on synthetic transactions: --items items with Zipf-like popularity,
+# about --length items per row. Apriori rescans every row for every
+# candidate, so it is skipped above --old-max rows. --workers splits the
+# first-item branches across processes.
+#
+#   python benchmarks/bench_rules.py [--rows 1000,10000,100000,1000000] [--support 0.02] [--workers 2]
+
+import argparse
+import os
+import sys
+import time
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ailab.rules import Miner
+
+
+def synthetic(rows, items, length, seed=0):
+    rng = np.random.default_rng(seed)
+    p = 1.0 / np.arange(1, items + 1)
+    p /= p.sum()
+    sizes = rng.poisson(length, rows).clip(1, items)
+    return [sorted(set(rng.choice(items, k, p=p).tolist())) for k in sizes]
+
+
+def apriori(transactions, min_count):
+    rows = [frozenset(t) for t in transactions]
+    counts = {}
+    for r in rows:
+        for i in r:
+            counts[frozenset([i])] = counts.get(frozenset([i]), 0) + 1
+    level = {s: c for s, c in counts.items() if c >= min_count}
+    found = dict(level)
+    k = 2
+    while level:
+        prev = list(level)
+        cands = {a | b for a, b in combinations(prev, 2) if len(a | b) == k}
+        cands = {c for c in cands if all(c - {x} in level for x in c)}
+        level = {}
+        for c in cands:
+            n = sum(1 for r in rows if c <= r)
+            if n >= min_count:
+                level[c] = n
+        found.update(level)
+        k += 1
+    return found
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', default='1000,10000,100000,1000000')
+    ap.add_argument('--items', type=int, default=100)
+    ap.add_argument('--length', type=int, default=8)
+    ap.add_argument('--support', type=float, default=0.02)
+    ap.add_argument('--confidence', type=float, default=0.5)
+    ap.add_argument('--workers', type=int, default=2)
+    ap.add_argument('--old-max', type=int, default=10000)
+    args = ap.parse_args()
+    for n in [int(x) for x in args.rows.split(',')]:
+        data = synthetic(n, args.items, args.length)
+        if n <= args.old_max:
+            t0 = time.perf_counter()
+            found = apriori(data, max(1, int(np.ceil(args.support * n - 1e-9))))
+            print(f"rows={n:8d}  apriori (sets)   itemsets {time.perf_counter() - t0:7.2f}s  "
+                  f"count={len(found)}")
+        for workers in (1, args.workers):
+            t0 = time.perf_counter()
+            m = Miner(data, args.support)
+            t1 = time.perf_counter()
+            k = sum(1 for _ in m.itemsets(workers))
+            t2 = time.perf_counter()
+            m.counts.clear()
+            r = sum(1 for _ in m.rules(args.confidence, workers=workers))
+            t3 = time.perf_counter()
+            print(f"rows={n:8d}  eclat, {workers} worker{'s' if workers > 1 else ' '} tidlists {t1 - t0:6.2f}s  "
+                  f"itemsets {t2 - t1:7.2f}s  count={k}  itemsets+rules {t3 - t2:7.2f}s  count={r}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# bench_search.py
+#
+# Parent-pointer BFS (ailab.search) vs the notebook style that copies
+# path + [ns] / actions + [a] into every frontier entry. Each run happens in
+# a forked child so the ru_maxrss high-water mark of one run does not hide
+# the next one.
+#
+#   python benchmarks/bench_search.py
+
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab.problems import Hanoi, NPuzzle, RiverCrossing
+from ailab.search import bfs, get_memory_kb
+
+
+def bfs_copying(problem):
+    # the day 5 bfs(), on the same encoded states
+    t0 = time.perf_counter()
+    m0 = get_memory_kb()
+    queue = deque([(problem.start, [problem.start], [])])
+    visited = {problem.start}
+    expanded = 0
+    while queue:
+        s, path, actions = queue.popleft()
+        expanded += 1
+        if problem.is_goal(s):
+            break
+        for ns, a in problem.next_states(s):
+            if ns not in visited:
+                visited.add(ns)
+                queue.append((ns, path + [ns], actions + [a]))
+    return len(actions), expanded, time.perf_counter() - t0, get_memory_kb() - m0
+
+
+def bfs_parents(problem):
+    r = bfs(problem)
+    return len(r.actions), r.expanded, r.seconds, r.memory_kb
+
+
+def _child(fn, problem, q):
+    q.put(fn(problem))
+
+
+def isolated(fn, problem):
+    q = mp.get_context('fork').Queue()
+    p = mp.get_context('fork').Process(target=_child, args=(fn, problem, q))
+    p.start()
+    res = q.get()
+    p.join()
+    return res
+
+
+def main():
+    cases = [('river crossing', RiverCrossing()),
+             ('8-puzzle', NPuzzle(3, [1, 2, 3, 4, 5, 6, 7, 8, 0], [8, 6, 7, 2, 5, 4, 3, 0, 1])),
+             ('hanoi 10', Hanoi(10)), ('hanoi 12', Hanoi(12))]
+    for name, problem in cases:
+        for label, fn in (('path copies', bfs_copying), ('parent dict', bfs_parents)):
+            moves, expanded, dt, mem = isolated(fn, problem)
+            rate = expanded / dt if dt else 0.0
+            print(f"{name:15s} {label:12s} moves={moves:5d} expanded={expanded:8d} "
+                  f"time={dt:8.3f}s  {rate:10.0f} nodes/s  mem={mem:8d} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# bench_trace.py
+#
+# Cost of tracing a BFS run: no tracer vs the Tracer levels/formats, and the
+# day 5 log_step style (reopen the file in append mode and format the whole
+# frontier, twice per expansion) on a smaller problem since it grows with the
+# frontier.
+#
+#   python benchmarks/bench_trace.py [--problem npuzzle|hanoi]
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab.problems import Hanoi, NPuzzle
+from ailab.search import FIFO, bfs
+from ailab.trace import Tracer
+
+
+def bfs_log_step(problem, path):
+    # the day 5 bfs() logging: two log_step calls per expansion
+    def log_step(msg):
+        with open(path, 'a') as f:
+            f.write(msg + '\n')
+    fmt = problem.decode
+    queue = FIFO()
+    queue.push(problem.start, 0)
+    seen = {problem.start}
+    step = 0
+    while queue:
+        s, g = queue.pop()
+        step += 1
+        log_step(f"Step {step}: Expanding {fmt(s)}")
+        if problem.is_goal(s):
+            break
+        for ns, _ in problem.next_states(s):
+            if ns not in seen:
+                seen.add(ns)
+                queue.push(ns, g + 1)
+        log_step(f"Queue: {[fmt(x[0]) for x in queue]}")
+    return step
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--problem', choices=('npuzzle', 'hanoi'), default='npuzzle')
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+    if args.problem == 'npuzzle':
+        problem = NPuzzle(3, [1, 2, 3, 4, 5, 6, 7, 8, 0], [8, 6, 7, 2, 5, 4, 3, 0, 1])
+        spec, small = 'npuzzle:3', NPuzzle(3, [1, 2, 3, 4, 5, 6, 7, 8, 0], [1, 2, 3, 7, 4, 6, 0, 5, 8])
+    else:
+        problem, spec, small = Hanoi(11), 'hanoi:11', Hanoi(6)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'trace')
+        runs = [
+            ('no tracer', lambda: None),
+            ('off', lambda: Tracer(out, 'off')),
+            ('summary', lambda: Tracer(out, 'summary')),
+            ('full binary', lambda: Tracer(out, 'full', binary=True, meta={'problem': spec})),
+            ('full binary every=10', lambda: Tracer(out, 'full', every=10, binary=True)),
+            ('full text every=100', lambda: Tracer(out, 'full', every=100, fmt=problem.decode)),
+            ('full text', lambda: Tracer(out, 'full', fmt=problem.decode)),
+        ]
+        # round-robin over the configurations so drift hits all of them alike
+        best, size = {}, {}
+        for _ in range(args.repeat):
+            for label, make in runs:
+                gc.collect()
+                tr = make()
+                dt = timed(lambda: bfs(problem, trace=tr))
+                if tr is not None:
+                    tr.close()
+                best[label] = min(best.get(label, dt), dt)
+                size[label] = os.path.getsize(out) if os.path.exists(out) else 0
+                if os.path.exists(out):
+                    os.remove(out)
+        base = best['no tracer']
+        for label, _ in runs:
+            print(f"{label:22s} {best[label]:8.3f}s  {100 * (best[label] / base - 1):+7.1f}%  "
+                  f"file={size[label] / 1024:9.0f} KB")
+        # notebook logging on the smaller instance, against the same run untraced
+        plain = min(timed(lambda: bfs(small)) for _ in range(args.repeat))
+        nb = timed(lambda: bfs_log_step(small, out))
+        print(f"smaller instance: untraced {plain:.4f}s  day 5 log_step {nb:.4f}s ({nb / plain:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
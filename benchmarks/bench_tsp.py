@@ -0,0 +1,120 @@
+# bench_tsp.py
+#
+# ailab.tsp against the day 7 solve_tsp_simulated_annealing (copied below,
+# logging to os.devnull) on random Euclidean instances, with the parameters of
+# the assignment's tsp_input.txt. The notebook version needs the matrix as
+# lists of Python floats, so it is skipped above --old-max cities.
+#
+#   python benchmarks/bench_tsp.py [--sizes 10,100,1000,2000,10000] [--iterations 10000]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ailab.tsp import TSP, anneal, anneal_many
+
+
+def calculate_tour_cost(tour, dist_matrix):
+    cost = 0
+    n = len(tour)
+    for i in range(n):
+        cost += dist_matrix[tour[i]][tour[(i + 1) % n]]
+    return cost
+
+
+def get_neighbor_tour(curr_tour, n):
+    neighbor_tour = curr_tour[:]
+    i, j = random.sample(range(n), 2)
+    neighbor_tour[i], neighbor_tour[j] = neighbor_tour[j], neighbor_tour[i]
+    return neighbor_tour
+
+
+def acceptance_probability(curr_cost, neighbor_cost, temp):
+    if temp == 0:
+        return 0.0
+    if neighbor_cost < curr_cost:
+        return 1.0
+    return math.exp((curr_cost - neighbor_cost) / temp)
+
+
+def solve_tsp_simulated_annealing(dist_matrix, start_city, init_temp, cooling_rate, iterations, output_file=os.devnull):
+    n = len(dist_matrix)
+    curr_tour = [start_city]
+    unvisited = list(range(n))
+    unvisited.remove(start_city)
+    curr_city = start_city
+    while unvisited:
+        nearest_city = None
+        min_dist = float('inf')
+        for city in unvisited:
+            if dist_matrix[curr_city][city] < min_dist:
+                min_dist = dist_matrix[curr_city][city]
+                nearest_city = city
+        curr_tour.append(nearest_city)
+        unvisited.remove(nearest_city)
+        curr_city = nearest_city
+    curr_cost = calculate_tour_cost(curr_tour, dist_matrix)
+    best_tour = curr_tour[:]
+    best_cost = curr_cost
+    temp = init_temp
+    with open(output_file, "w") as f:
+        for i in range(iterations):
+            neighbor_tour = get_neighbor_tour(curr_tour, n)
+            neighbor_cost = calculate_tour_cost(neighbor_tour, dist_matrix)
+            prob = acceptance_probability(curr_cost, neighbor_cost, temp)
+            rand_num = random.random()
+            if prob > rand_num or neighbor_cost < curr_cost:
+                curr_tour = neighbor_tour[:]
+                curr_cost = neighbor_cost
+            if curr_cost < best_cost:
+                best_tour = curr_tour[:]
+                best_cost = curr_cost
+            temp *= cooling_rate
+            f.write(f"Iteration: {i+1}, Temp: {temp:.4f}, Current Tour: {curr_tour}, Current Cost: {curr_cost:.2f}\n")
+    return best_tour, best_cost
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='10,100,1000,2000,10000')
+    ap.add_argument('--iterations', type=int, default=10000)
+    ap.add_argument('--temp', type=float, default=1000.0)
+    ap.add_argument('--cooling', type=float, default=0.95)
+    ap.add_argument('--restarts', type=int, default=4)
+    ap.add_argument('--old-max', type=int, default=2000)
+    args = ap.parse_args()
+    kw = dict(start_city=0, init_temp=args.temp, cooling_rate=args.cooling, iterations=args.iterations)
+    for n in [int(x) for x in args.sizes.split(',')]:
+        xy = np.random.default_rng(n).uniform(0, 1000, (n, 2))
+        tsp = TSP(coords=xy)
+        rows = []
+        if n <= args.old_max:
+            random.seed(0)
+            m = np.hypot(*(xy[:, None] - xy[None]).transpose(2, 0, 1)).tolist()
+            t0 = time.perf_counter()
+            _, c = solve_tsp_simulated_annealing(m, 0, args.temp, args.cooling, args.iterations)
+            rows.append(('day 7 notebook', time.perf_counter() - t0, c))
+        t0 = time.perf_counter()
+        _, c = anneal(tsp, seed=0, finish=False, **kw)
+        rows.append(('anneal', time.perf_counter() - t0, c))
+        t0 = time.perf_counter()
+        _, c = anneal(tsp, seed=0, **kw)
+        rows.append(('anneal + polish', time.perf_counter() - t0, c))
+        t0 = time.perf_counter()
+        _, c = anneal_many(tsp, restarts=args.restarts, seed=0, **kw)
+        rows.append(('%d restarts (pool)' % args.restarts, time.perf_counter() - t0, c))
+        for label, dt, c in rows:
+            print(f"n={n:6d}  {label:20s} {dt:9.3f}s  cost={c:12.1f}  "
+                  f"{args.iterations / dt:10.0f} it/s")
+        print()
+
+
+if __name__ == '__main__':
+    main()
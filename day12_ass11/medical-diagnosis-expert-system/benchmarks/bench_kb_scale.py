@@ -0,0 +1,130 @@
+# bench_kb_scale.py
+#
+# Query cost vs catalog size on synthetic KBs (gen_kb.py). Every size keeps
+# the number of diseases per symptom fixed, so an indexed query touches
+# about the same number of candidates while the catalog grows.
+#
+#   native: full scan over the catalog vs KBEngine.candidates()
+#   prolog: diag_row_scan/6 vs indexed diag_row/6, in Prolog inferences and
+#           CPU time per query (needs swipl)
+#
+#   python benchmarks/bench_kb_scale.py --sizes 100,1000,10000 -q 200
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from gen_kb import write_kb
+from kb_engine import KBEngine, parse_facts
+from prolog_session import mk_list
+
+PROLOG_BENCH = """
+bench_one(S, R, Pred, Inf, T) :-
+    statistics(inferences, I0), statistics(cputime, T0),
+    forall(call(Pred, S, R, _, _, _, _), true),
+    statistics(inferences, I1), statistics(cputime, T1),
+    Inf is I1 - I0, T is T1 - T0.
+
+bench :-
+    forall(q(S, R), forall(diag_row(S, R, _, _, _, _), true)),   % fill the tables
+    findall(I1-T1-I2-T2,
+            ( q(S, R),
+              bench_one(S, R, diag_row_scan, I1, T1),
+              bench_one(S, R, diag_row, I2, T2) ),
+            Rows),
+    length(Rows, N),
+    foldl([A-B-C-D, a(W,X,Y,Z), a(W1,X1,Y1,Z1)]>>(W1 is W+A, X1 is X+B, Y1 is Y+C, Z1 is Z+D),
+          Rows, a(0,0,0,0), a(SI, ST, XI, XT)),
+    maplist([Sum, Mean]>>(Mean is Sum / N), [SI, ST, XI, XT], Avg),
+    format('~w ~w ~w ~w~n', Avg).
+"""
+
+
+def queries(path, n, seed=0):
+    # two core symptoms of a random disease (plus one of its risks half the time)
+    f = parse_facts(path, ('symptom', 'risk_factor'))
+    rnd = random.Random(seed)
+    syms, risks = {}, {}
+    for d, s in f['symptom']:
+        syms.setdefault(d, []).append(s)
+    for d, r in f['risk_factor']:
+        risks.setdefault(d, []).append(r)
+    ds = sorted(syms)
+    out = []
+    for _ in range(n):
+        d = rnd.choice(ds)
+        r = [rnd.choice(risks[d])] if d in risks and rnd.random() < 0.5 else []
+        out.append((rnd.sample(syms[d], 2), r))
+    return out
+
+
+def native(path, qs):
+    eng = KBEngine(path)
+
+    def scan(s, r):
+        sm, rm = eng.mask(s), eng.mask(r)
+        for i in range(len(eng.diseases)):
+            if eng._severity(i, sm, rm, s):
+                return i
+        return None
+
+    def indexed(s, r):
+        sm, rm = eng.mask(s), eng.mask(r)
+        for i in eng.candidates(s):
+            if eng._severity(i, sm, rm, s):
+                return i
+        return None
+
+    out = []
+    for f in (scan, indexed):
+        t0 = time.perf_counter()
+        res = [f(s, r) for s, r in qs]
+        out.append(((time.perf_counter() - t0) / len(qs), res))
+    assert out[0][1] == out[1][1], 'indexed lookup disagrees with the full scan'
+    cands = sum(len(eng.candidates(s)) for s, _ in qs) / len(qs)
+    return out[0][0], out[1][0], cands
+
+
+def prolog(path, qs, tmp):
+    qfile = os.path.join(tmp, 'queries.pl')
+    with open(qfile, 'w') as f:
+        for s, r in qs:
+            f.write('q(%s, %s).\n' % (mk_list(s), mk_list(r)))
+        f.write(PROLOG_BENCH)
+    p = subprocess.run(['swipl', '-q', '-s', path, '-s', qfile, '-g', 'bench', '-t', 'halt'],
+                       capture_output=True, text=True, check=True)
+    return [float(x) for x in p.stdout.split()]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='100,1000,10000')
+    ap.add_argument('-q', type=int, default=200, help='queries per size')
+    ap.add_argument('--no-prolog', action='store_true')
+    args = ap.parse_args()
+    use_prolog = not args.no_prolog and shutil.which('swipl')
+    if not use_prolog:
+        print('(swipl not found: native engine only)')
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(x) for x in args.sizes.split(',')]:
+            path = os.path.join(tmp, 'kb%d.pl' % n)
+            write_kb(path, n)
+            qs = queries(path, args.q)
+            scan, idx, cands = native(path, qs)
+            print(f"diseases={n:6d}  candidates/query={cands:5.1f}  "
+                  f"native scan={scan * 1e6:9.1f} us  indexed={idx * 1e6:7.1f} us")
+            if use_prolog:
+                si, st, xi, xt = prolog(path, qs, tmp)
+                print(f"{'':14s}prolog scan={si:9.0f} inf {st * 1e3:7.3f} ms  "
+                      f"indexed={xi:7.0f} inf {xt * 1e3:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# bench_planner.py
+#
+# 1. Simulated patients on the real KB: questions asked by adaptive_prob_dialog
+#    and whether the patient's disease was found.
+# 2. Planner cost per answered question (update + next_question) as the
+#    catalog grows, on synthetic diseases.
+#
+#   python benchmarks/bench_planner.py
+
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+from kb_engine import KBEngine, parse_facts
+from planner import QuestionPlanner
+
+
+def simulated_patients():
+    eng = KBEngine()
+    facts = parse_facts()
+    labels = {}
+    for f in eng.bit:
+        labels[idg._label(f)] = f
+    found = total_q = 0
+    for d in eng.diseases:
+        syms = {s for dd, s in facts['symptom'] if dd == d}
+        asked = []
+        ask = lambda q: asked.append(q) or labels.get(q) in syms
+        res = idg.drive(idg.adaptive_prob_dialog_steps(), ask=ask, infer=eng.diagnose, note=lambda t: None)
+        hit = any(r.disease == d for r in res)
+        found += hit
+        total_q += len(asked)
+        print(f"  {d:18s} questions={len(asked):3d} found={hit}")
+    n = len(eng.diseases)
+    print(f"  mean questions={total_q / n:.1f}  found {found}/{n}")
+
+
+def synthetic(n_dis, n_feat, per=4, seed=0):
+    rnd = random.Random(seed)
+    feats = ['f%d' % i for i in range(n_feat)]
+    mask = lambda k: sum(1 << rnd.randrange(n_feat) for _ in range(k))
+    return SimpleNamespace(diseases=['d%d' % i for i in range(n_dis)],
+                           bit={f: 1 << i for i, f in enumerate(feats)},
+                           sym=[mask(per) for _ in range(n_dis)],
+                           sev=[mask(1) for _ in range(n_dis)],
+                           risk=[mask(2) for _ in range(n_dis)])
+
+
+def scaling(reps=20):
+    for n in (10, 100, 1000, 5000):
+        plan = QuestionPlanner(synthetic(n, max(80, n // 4)))
+        con = plan.start()
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            k = con.next_question()
+            if k is None:
+                break
+            con.update(k, False)
+        dt = (time.perf_counter() - t0) / reps
+        print(f"  diseases={n:5d} features={len(plan.features):5d}  {dt * 1000:8.3f} ms per question")
+
+
+def main():
+    print('simulated patients (real KB):')
+    simulated_patients()
+    print('planner cost vs catalog size:')
+    scaling()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# bench_session.py
+#
+# Per-query latency: fresh swipl per call (run_case_spawn) vs warm session.
+# Run from the project root:  python benchmarks/bench_session.py [-n 30]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from interactive_diagnosis import run_case_spawn
+from prolog_session import PrologSession
+
+CASES = [
+    (['fever', 'chills', 'sweating'], ['travel_to_endemic_regions']),
+    (['fever', 'cough', 'fatigue'], ['no_recent_vaccination']),
+    (['abdominal_pain', 'bloating'], []),
+    (['excessive_thirst', 'frequent_urination'], ['family_history_of_diabetes']),
+    ([], []),
+]
+
+
+def timed(fn, n):
+    lat = []
+    for i in range(n):
+        s, r = CASES[i % len(CASES)]
+        t0 = time.perf_counter()
+        fn(s, r)
+        lat.append(time.perf_counter() - t0)
+    return lat
+
+
+def report(name, lat):
+    lat = sorted(lat)
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+    print(f"{name:10s} n={len(lat):4d}  mean={statistics.mean(lat)*1000:8.2f} ms  "
+          f"p50={statistics.median(lat)*1000:8.2f} ms  p99={p99*1000:8.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('-n', type=int, default=30)
+    args = ap.parse_args()
+
+    report('spawn', timed(run_case_spawn, args.n))
+
+    t0 = time.perf_counter()
+    with PrologSession() as sess:
+        print(f"session start: {(time.perf_counter() - t0)*1000:.2f} ms")
+        sess.run_diag([], [])  # first query pays for page-in
+        report('session', timed(sess.run_diag, args.n))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+# bench_suite.py
+#
+# Benchmark and regression suite for the diagnosis pipeline. Synthetic
+# patients are generated from the KB facts (core symptoms, some risk factors,
+# the odd severe sign and a little noise); each patient answers the three
+# dialogs through a scripted ask() that maps question text back to KB
+# features. Per dialog it reports questions asked, inference calls, hit rate
+# (true disease among the results), wall time, p50/p99 latency per inference
+# call and peak RSS; a direct pass over the cases measures bare inference.
+#
+#   python benchmarks/bench_suite.py --engine native -n 500 --out bench.json
+#   python benchmarks/bench_suite.py --engine native --baseline bench.json   # exit 1 on regression
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+from diag_cache import kb_hash
+from kb_engine import parse_facts
+from prolog_session import KB_PATH
+
+# dialog questions that are not "<label>" or "Do you have <label>?"; a tuple
+# means "yes if the patient has any of these"
+PHRASES = {
+    'Do you have any pain right now?': ('chest_pain', 'abdominal_pain', 'joint_pain', 'painful_urination'),
+    'Is it chest pain?': ('chest_pain',),
+    'Is it abdominal pain?': ('abdominal_pain',),
+    'Is it joint pain?': ('joint_pain',),
+    'Is it pain while peeing?': ('painful_urination',),
+    'Do you have a cough?': ('cough',),
+    'Shortness of breath?': ('shortness_of_breath',),
+    'Any blood when coughing?': ('blood_in_sputum',),
+    'Do you smoke?': ('smoking_history',),
+    'Bloating or change in bowel habit?': ('bloating', 'diarrhea_or_constipation'),
+    'Bloating?': ('bloating',),
+    'Diarrhea or constipation?': ('diarrhea_or_constipation',),
+    'Recent antibiotics or steroids?': ('recent_antibiotics_or_steroids',),
+    'Have you had recent antibiotics or steroids?': ('recent_antibiotics_or_steroids',),
+    'Is the joint stiff?': ('stiffness',),
+    'Is there swelling?': ('swelling',),
+    'Any long-term joint problems or injury?': ('prior_joint_injury',),
+    'Frequent urination?': ('frequent_urination',),
+    'Cloudy urine?': ('cloudy_urine',),
+    'Previous UTIs?': ('previous_uti',),
+    'Family history of diabetes?': ('family_history_of_diabetes',),
+    'Are you immunosuppressed or on long-term steroids?': ('immunosuppressed',),
+    'No recent flu vaccine?': ('no_recent_vaccination',),
+    'Any recent travel to malaria areas?': ('travel_to_endemic_regions',),
+    'Did this start suddenly (minutes–hours)?': ('difficulty_breathing',),
+    'Do you smoke or have a long-term cough?': ('smoking_history', 'persistent_cough'),
+}
+
+# regression thresholds used with --baseline
+MAX_SLOWDOWN = 1.5      # p99 / wall time may grow by this factor
+MAX_EXTRA_Q = 0.5       # mean questions per consultation may grow by this much
+MAX_HIT_DROP = 0.02     # hit rate may drop by this much
+
+
+def question_map(facts):
+    qmap = {q: (k,) for k, q in idg._m + idg._r}
+    qmap.update((q, (k,)) for k, q in idg._sev_prompt.items())
+    feats = {f for name in ('symptom', 'severe_symptom', 'risk_factor') for _, f in facts[name]}
+    for k in feats:
+        lbl = k.replace('_', ' ').capitalize()
+        qmap.setdefault(idg._label(k), (k,))
+        qmap.setdefault('Do you have %s?' % lbl, (k,))
+        qmap.setdefault('Are you having %s (sudden or severe)?' % lbl, (k,))
+        qmap.setdefault('%s now?' % lbl, (k,))
+    qmap.update(PHRASES)
+    return qmap
+
+
+def synthetic_cases(facts, n, seed=0, p_sym=0.8, p_risk=0.5, p_sev=0.05, p_noise=0.03):
+    rnd = random.Random(seed)
+    by = {}
+    for name in ('symptom', 'severe_symptom', 'risk_factor'):
+        for d, f in facts[name]:
+            by.setdefault((name, d), []).append(f)
+    noise = sorted({f for _, f in facts['symptom']})
+    diseases = [d for d, _ in facts['disease']]
+    for i in range(n):
+        d = diseases[i % len(diseases)]
+        core = by.get(('symptom', d), [])
+        s = [f for f in core if rnd.random() < p_sym] or [rnd.choice(core)]
+        s += [f for f in by.get(('severe_symptom', d), []) if rnd.random() < p_sev]
+        s += [f for f in noise if f not in s and rnd.random() < p_noise]
+        r = [f for f in by.get(('risk_factor', d), []) if rnd.random() < p_risk]
+        yield {'id': i, 'disease': d, 'symptoms': s, 'risks': r}
+
+
+def _pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * q))] if xs else 0.0
+
+
+def _peak_rss_kb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def run_dialog(kind, cases, qmap, infer):
+    lat = []
+    questions = calls = hits = unmapped = 0
+
+    def timed(s, r):
+        t0 = time.perf_counter()
+        try:
+            return infer(s, r)
+        finally:
+            lat.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for c in cases:
+        have = set(c['symptoms']) | set(c['risks'])
+
+        def ask(q):
+            nonlocal questions, unmapped
+            questions += 1
+            fs = qmap.get(q)
+            if fs is None:
+                unmapped += 1
+                return False
+            return any(f in have for f in fs)
+
+        n0 = len(lat)
+        res = idg.drive(idg.DIALOGS[kind](), ask=ask, infer=timed, note=lambda t: None)
+        calls += len(lat) - n0
+        hits += any(d.disease == c['disease'] for d in res or [])
+    wall = time.perf_counter() - t0
+    n = len(cases)
+    return {'consultations': n, 'questions': questions, 'questions_mean': questions / n,
+            'inference_calls': calls, 'inference_calls_mean': calls / n, 'hit_rate': hits / n,
+            'unmapped_questions': unmapped, 'wall_s': wall,
+            'p50_ms': statistics.median(lat) * 1000 if lat else 0.0, 'p99_ms': _pct(lat, 0.99) * 1000,
+            'peak_rss_kb': _peak_rss_kb()}
+
+
+def run_direct(cases, infer):
+    lat = []
+    hits = 0
+    t0 = time.perf_counter()
+    for c in cases:
+        t1 = time.perf_counter()
+        res = infer(c['symptoms'], c['risks'])
+        lat.append(time.perf_counter() - t1)
+        hits += any(d.disease == c['disease'] for d in res)
+    return {'cases': len(cases), 'hit_rate': hits / len(cases), 'wall_s': time.perf_counter() - t0,
+            'p50_ms': statistics.median(lat) * 1000, 'p99_ms': _pct(lat, 0.99) * 1000,
+            'peak_rss_kb': _peak_rss_kb()}
+
+
+def run_suite(engine='native', n=200, seed=0, cached=False, dialogs=tuple(idg.DIALOGS), log=sys.stdout):
+    idg.ENGINE = engine
+    facts = parse_facts()
+    cases = list(synthetic_cases(facts, n, seed))
+    qmap = question_map(facts)
+    # the cache would turn most repeated queries into dict hits; measure bare inference by default
+    infer = idg.diagnose_case if cached else idg.infer
+    out = {'meta': {'engine': engine, 'cached': cached, 'cases': n, 'seed': seed,
+                    'kb_sha256': kb_hash(KB_PATH), 'python': platform.python_version(),
+                    'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+           'direct': run_direct(cases, infer), 'dialogs': {}}
+    print('direct      %s' % _fmt(out['direct']), file=log)
+    for kind in dialogs:
+        res = out['dialogs'][kind] = run_dialog(kind, cases, qmap, infer)
+        print('%-11s %s' % (kind, _fmt(res)), file=log)
+    return out
+
+
+def _fmt(r):
+    extra = ''
+    if 'questions_mean' in r:
+        extra = 'q=%.1f calls=%.1f unmapped=%d ' % (r['questions_mean'], r['inference_calls_mean'],
+                                                    r['unmapped_questions'])
+    return ('%shit=%.2f wall=%.2fs p50=%.3fms p99=%.3fms rss=%dKB'
+            % (extra, r['hit_rate'], r['wall_s'], r['p50_ms'], r['p99_ms'], r['peak_rss_kb']))
+
+
+def compare(cur, base, slowdown=MAX_SLOWDOWN):
+    # list of regressions of `cur` against `base` (empty means ok)
+    bad = []
+    if cur['meta']['kb_sha256'] != base['meta']['kb_sha256']:
+        print('note: knowledge base changed since the baseline', file=sys.stderr)
+    pairs = [('direct', cur['direct'], base['direct'])]
+    pairs += [(k, v, base['dialogs'][k]) for k, v in cur['dialogs'].items() if k in base['dialogs']]
+    for name, c, b in pairs:
+        if c['hit_rate'] < b['hit_rate'] - MAX_HIT_DROP:
+            bad.append('%s: hit rate %.3f < %.3f' % (name, c['hit_rate'], b['hit_rate']))
+        if 'questions_mean' in c and c['questions_mean'] > b['questions_mean'] + MAX_EXTRA_Q:
+            bad.append('%s: %.2f questions per consultation > %.2f'
+                       % (name, c['questions_mean'], b['questions_mean']))
+        for k in ('p99_ms', 'wall_s'):
+            # tiny absolute times are noise; only flag once they are measurable
+            if c[k] > b[k] * slowdown and c[k] - b[k] > (1.0 if k == 'p99_ms' else 0.1):
+                bad.append('%s: %s %.3f > %.3f x %.1f' % (name, k, c[k], b[k], slowdown))
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--engine', choices=('prolog', 'native'), default=idg.ENGINE)
+    ap.add_argument('-n', type=int, default=200, help='synthetic patients')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--cached', action='store_true', help='go through the diagnosis cache')
+    ap.add_argument('--dialog', action='append', choices=tuple(idg.DIALOGS),
+                    help='dialog(s) to run (default: all)')
+    ap.add_argument('--out', help='write results as JSON')
+    ap.add_argument('--baseline', help='earlier --out file; exit 1 on regression')
+    ap.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN)
+    args = ap.parse_args(argv)
+    res = run_suite(args.engine, args.n, args.seed, args.cached, tuple(args.dialog or idg.DIALOGS))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(res, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            bad = compare(res, json.load(f), args.max_slowdown)
+        for b in bad:
+            print('REGRESSION', b)
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# gen_kb.py
+#
+# Writes a synthetic knowledge base with a large disease catalog. The facts
+# are generated; the rules (diagnose_from/4, diag_row/6, serve/0, ...) are
+# copied from src/prolog/knowledge_base.pl so the file loads like the real
+# one. Feature pools grow with the catalog, so each symptom is shared by
+# about the same number of diseases at every size.
+#
+#   python benchmarks/gen_kb.py -n 10000 --out /tmp/kb10k.pl
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from prolog_session import KB_PATH
+
+GENERATED = ('disease', 'symptom', 'severe_symptom', 'risk_factor', 'tests', 'treatment')
+
+
+def rules_text(kb=KB_PATH):
+    # everything in the real KB except the catalog facts
+    out = []
+    with open(kb) as f:
+        for line in f:
+            if line.split('(', 1)[0] in GENERATED and ':-' not in line:
+                continue
+            out.append(line)
+    return ''.join(out)
+
+
+def generate(n, per=4, n_sev=2, n_risk=2, share=8, seed=0):
+    # yields fact lines; each symptom belongs to ~share diseases
+    rnd = random.Random(seed)
+    syms = ['s%d' % i for i in range(max(per, n * per // share))]
+    sevs = ['v%d' % i for i in range(max(n_sev, n * n_sev // share))]
+    risks = ['r%d' % i for i in range(max(n_risk, n * n_risk // share))]
+    for i in range(n):
+        d = 'd%d' % i
+        yield 'disease(%s, synthetic).' % d
+        for s in rnd.sample(syms, per):
+            yield 'symptom(%s, %s).' % (d, s)
+        for s in rnd.sample(sevs, n_sev):
+            yield 'severe_symptom(%s, %s).' % (d, s)
+        for r in rnd.sample(risks, n_risk):
+            yield 'risk_factor(%s, %s).' % (d, r)
+        for k in ('mild', 'severe'):
+            yield 'tests(%s, %s, [test_%s]).' % (d, k, k)
+            yield 'treatment(%s, %s, [treatment_%s]).' % (d, k, k)
+
+
+def write_kb(path, n, seed=0, **kw):
+    with open(path, 'w') as f:
+        f.write('%% synthetic catalog: %d diseases (benchmarks/gen_kb.py, seed %d)\n' % (n, seed))
+        for line in generate(n, seed=seed, **kw):
+            f.write(line + '\n')
+        f.write('\n')
+        f.write(rules_text())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('-n', type=int, default=10000, help='diseases')
+    ap.add_argument('--per', type=int, default=4, help='core symptoms per disease')
+    ap.add_argument('--share', type=int, default=8, help='diseases per symptom (on average)')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', required=True)
+    args = ap.parse_args()
+    write_kb(args.out, args.n, args.seed, per=args.per, share=args.share)
+
+
+if __name__ == '__main__':
+    main()
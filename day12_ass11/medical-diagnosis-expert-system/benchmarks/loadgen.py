@@ -0,0 +1,109 @@
+# loadgen.py
+#
+# Many simulated patients against the dialog service. Each client thread runs
+# whole consultations with random yes/no answers and records the latency of
+# every HTTP call.
+#
+#   python benchmarks/loadgen.py --clients 200 --consults 5            # in-process server
+#   python benchmarks/loadgen.py --url http://127.0.0.1:5000 ...       # running service
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+
+def call(url, method='GET', body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, json.loads(resp.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def client(base, consults, dialog, seed, lat, errors):
+    rnd = random.Random(seed)
+    for _ in range(consults):
+        t0 = time.perf_counter()
+        code, st = call(base + '/sessions', 'POST', {'dialog': dialog})
+        lat.append(time.perf_counter() - t0)
+        if code >= 400:
+            errors.append(code)
+            continue
+        while not st['done']:
+            t0 = time.perf_counter()
+            code, st = call('%s/sessions/%s/answer' % (base, st['id']), 'POST',
+                            {'answer': rnd.random() < 0.3})
+            lat.append(time.perf_counter() - t0)
+            if code >= 400:
+                errors.append(code)
+                break
+        if 'id' in st:
+            # error bodies (e.g. a 404) carry no session id
+            call('%s/sessions/%s' % (base, st['id']), 'DELETE')
+
+
+def start_local(engine, workers, timeout):
+    from werkzeug.serving import make_server
+    import interactive_diagnosis as idg
+    from service import create_app
+    idg.ENGINE = engine
+    idg.POOL_SIZE = workers
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    srv = make_server('127.0.0.1', 0, create_app(timeout=timeout), threaded=True)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, 'http://127.0.0.1:%d' % srv.server_port
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--url', help='service base URL; default starts one in-process')
+    ap.add_argument('--clients', type=int, default=50)
+    ap.add_argument('--consults', type=int, default=5, help='consultations per client')
+    ap.add_argument('--dialog', default='prob', choices=('prob', 'adaptive', 'layered'))
+    ap.add_argument('--engine', default='native', choices=('prolog', 'native'))
+    ap.add_argument('--workers', type=int, default=4)
+    ap.add_argument('--timeout', type=float, default=5)
+    args = ap.parse_args()
+
+    srv = None
+    base = args.url
+    if not base:
+        srv, base = start_local(args.engine, args.workers, args.timeout)
+
+    lat, errors = [], []
+    threads = [threading.Thread(target=client, args=(base, args.consults, args.dialog, i, lat, errors))
+               for i in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    dt = time.perf_counter() - t0
+
+    lat.sort()
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] if lat else 0.0
+    print(f"clients={args.clients} consultations={args.clients * args.consults} requests={len(lat)} "
+          f"errors={len(errors)} wall={dt:.2f}s")
+    print(f"throughput={len(lat) / dt:.1f} req/s  {args.clients * args.consults / dt:.1f} consult/s")
+    if lat:
+        print(f"latency p50={statistics.median(lat) * 1000:.2f} ms  p99={p99 * 1000:.2f} ms  "
+              f"max={lat[-1] * 1000:.2f} ms")
+    print('stats:', call(base + '/stats')[1])
+    if srv:
+        srv.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# profile_kb.py
+#
+# Per-predicate SWI-Prolog profile of the diagnosis rules for one case
+# (profile_diag/3 in the KB), and the cost of the Python instrumentation
+# hooks when metrics are off and on.
+#
+#   python benchmarks/profile_kb.py --symptoms fever,chills --risks previous_malaria -n 2000
+#   python benchmarks/profile_kb.py --overhead
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import metrics
+from kb_engine import KBEngine
+from prolog_session import KB_PATH, mk_list
+
+
+def prolog_profile(symptoms, risks, n):
+    goal = 'profile_diag(%s,%s,%d)' % (mk_list(symptoms), mk_list(risks), n)
+    subprocess.run(['swipl', '-q', '-s', KB_PATH, '-g', goal, '-t', 'halt'], check=True)
+
+
+def overhead(reps=200000):
+    eng = KBEngine()
+    s, r = ['fever', 'chills', 'sweating'], ['travel_to_endemic_regions']
+    raw = KBEngine.diagnose.__wrapped__
+    for label, f, on in (('bare', lambda: raw(eng, s, r), False),
+                         ('hooks off', lambda: eng.diagnose(s, r), False),
+                         ('hooks on', lambda: eng.diagnose(s, r), True)):
+        metrics.enable(on)
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            f()
+        dt = time.perf_counter() - t0
+        print(f"  {label:10s} {dt / reps * 1e6:7.3f} us per native diagnose")
+    metrics.enable(False)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--symptoms', default='fever,chills,sweating')
+    ap.add_argument('--risks', default='travel_to_endemic_regions')
+    ap.add_argument('-n', type=int, default=1000, help='repetitions under the profiler')
+    ap.add_argument('--overhead', action='store_true')
+    args = ap.parse_args()
+    if args.overhead:
+        overhead()
+        return
+    if not shutil.which('swipl'):
+        sys.exit('swipl not installed')
+    split = lambda v: [x for x in v.split(',') if x]
+    prolog_profile(split(args.symptoms), split(args.risks), args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -293,14 +293,69 @@ diagnose_from(SGiven, _RGiven, D, mild) :-
     symptom_match_count(D, SGiven, C),
     C >= 2, !.
 
+% one result row of a full pass over the catalog (reference for diag_row/6)
+diag_row_scan(SGiven, RGiven, D, Sev, Tests, Treat) :-
+    ( disease(D,_),
+      diagnose_from(SGiven, RGiven, D, Sev) ->
+          tests_for(D, Sev, Tests),
+          treatment_for(D, Sev, Treat)
+    ).
+
+% --- Indexed inference for large catalogs ---
+% A disease can only be diagnosed if it lists one of the reported symptoms
+% or severe indicators (risk factors alone never suffice), so the inverted
+% index from feature to diseases gives the candidates and nothing else in
+% the catalog is looked at. The index is tabled: each entry is computed once
+% per process and then answered from the table.
+:- table symptom_of/2, severe_of/2.
+symptom_of(S, D) :- symptom(D, S).
+severe_of(S, D) :- severe_symptom(D, S).
+
+% catalog position of each disease; run_diag reports the first match in
+% this order, so candidates are tried by rank
+:- dynamic disease_rank/2.
+index_catalog :-
+    retractall(disease_rank(_, _)),
+    findall(D, disease(D, _), Ds),
+    forall(nth1(I, Ds, D), assertz(disease_rank(D, I))).
+:- initialization(index_catalog).
+
+% same answers as diag_row_scan/6
+diag_row(SGiven, RGiven, D, Sev, Tests, Treat) :-
+    msort(SGiven, Sorted),
+    clumped(Sorted, Counts),               % S-N: member/2 counts duplicates too
+    sort(RGiven, RSet),
+    findall(D0-N, (member(S-N, Counts), symptom_of(S, D0)), Hits),
+    keysort(Hits, ByD),
+    group_pairs_by_key(ByD, Groups),
+    findall(D0-C, (member(D0-Ns, Groups), sum_list(Ns, C)), Tally),
+    list_to_assoc(Tally, Matches),
+    findall(D0, (member(S-_, Counts), severe_of(S, D0)), SevHits),
+    sort(SevHits, SevSet),
+    pairs_keys(Tally, SymDs),
+    ord_union(SymDs, SevSet, Cands),
+    findall(R-D0, (member(D0, Cands), disease_rank(D0, R)), Ranked0),
+    keysort(Ranked0, Ranked),
+    (   member(_-D, Ranked),
+        indexed_severity(D, Matches, SevSet, RSet, Sev)
+    ->  tests_for(D, Sev, Tests),
+        treatment_for(D, Sev, Treat)
+    ).
+
+% diagnose_from/4 on the precomputed match counts
+indexed_severity(D, _, SevSet, _, severe) :-
+    ord_memberchk(D, SevSet), !.
+indexed_severity(D, Matches, _, RSet, severe) :-
+    get_assoc(D, Matches, C), C >= 1,
+    risk_factor(D, R),
+    ord_memberchk(R, RSet), !.
+indexed_severity(D, Matches, _, _, mild) :-
+    get_assoc(D, Matches, C), C >= 2.
+
 % run a full pass and print readable results
 run_diag(SGiven, RGiven) :-
     findall([D, Sev, Tests, Treat],
-            ( disease(D,_),
-              diagnose_from(SGiven, RGiven, D, Sev) ->
-                  tests_for(D, Sev, Tests),
-                  treatment_for(D, Sev, Treat)
-            ),
+            diag_row(SGiven, RGiven, D, Sev, Tests, Treat),
             L),
     ( L = [] ->
         format('No likely diagnoses found.~n')
@@ -312,5 +367,46 @@ run_diag(SGiven, RGiven) :-
                ))
     ).
 
+% machine-readable pass: one diag(Disease, Severity, Tests, Treatment) term per line
+run_diag_terms(SGiven, RGiven) :-
+    forall(diag_row(SGiven, RGiven, D, Sev, Tests, Treat),
+           format('~q.~n', [diag(D, Sev, Tests, Treat)])).
+
+% --- Profiling mode ---
+% run_diag_terms/2 followed by stats(Inferences, CpuSeconds) for the call
+run_diag_stats(SGiven, RGiven) :-
+    statistics(inferences, I0),
+    statistics(cputime, T0),
+    run_diag_terms(SGiven, RGiven),
+    statistics(inferences, I1),
+    statistics(cputime, T1),
+    I is I1 - I0,
+    T is T1 - T0,
+    format('~q.~n', [stats(I, T)]).
+
+% per-predicate profile of N runs of the diagnosis rules, as a text report
+profile_diag(SGiven, RGiven, N) :-
+    profile(forall(between(1, N, _),
+                   forall(diag_row(SGiven, RGiven, _, _, _, _), true)),
+            [top(25), cumulative(true)]).
+
 % optional debug printer
-p(L) :- format('~w~n', [L]).
\ No newline at end of file
+p(L) :- format('~w~n', [L]).
+% --- Persistent worker loop (for Python session pool) ---
+% reads one goal term per line from stdin, runs it, then prints an end marker
+% so the caller knows the reply is complete. KB is consulted only once.
+serve :-
+    prompt(_, ''),
+    repeat,
+    read_term(user_input, Goal, []),
+    ( Goal == end_of_file ->
+        !
+    ;
+        serve_goal(Goal),
+        fail
+    ).
+
+serve_goal(Goal) :-
+    ( catch(Goal, E, (print_message(error, E), format('ERROR: ~q~n', [E]))) -> true ; true ),
+    format('~n<<<END>>>~n'),
+    flush_output.
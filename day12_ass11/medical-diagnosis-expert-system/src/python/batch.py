@@ -0,0 +1,146 @@
+# batch.py
+#
+# Bulk re-scoring of archived cases:
+#   python src/python/interactive_diagnosis.py --batch cases.jsonl [--out res.jsonl]
+#
+# Input is JSONL ({"id": .., "symptoms": [..], "risks": [..]}) or CSV with
+# id,symptoms,risks columns (lists separated by ';'). Cases are read lazily
+# and sent to worker processes in chunks; each worker loads the KB once.
+# Only a bounded number of chunks is in flight, so memory does not grow with
+# the input size. Results are written as each chunk completes.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+def _as_list(v):
+    if v is None or v == '':
+        return []
+    if isinstance(v, str):
+        return [x.strip() for x in v.replace(',', ';').split(';') if x.strip()]
+    if isinstance(v, list) and all(isinstance(x, str) for x in v):
+        return v
+    raise ValueError('expected a list of atoms, got %r' % (v,))
+
+
+def _case(lineno, row):
+    if not isinstance(row, dict):
+        raise ValueError('case must be an object')
+    s = _as_list(row.get('symptoms'))
+    r = _as_list(row.get('risks'))
+    for a in s + r:
+        if not a.replace('_', '').isalnum() or not a[0].islower():
+            raise ValueError('not a valid atom: %r' % a)
+    return {'id': row.get('id', lineno), 'line': lineno, 'symptoms': s, 'risks': r}
+
+
+def read_cases(path):
+    # yields a case dict or an {'line', 'error'} dict per input row; a bad
+    # byte spoils only its own row
+    if path.endswith('.csv'):
+        # undecodable bytes become U+FFFD, which no atom accepts
+        with open(path, newline='', encoding='utf-8', errors='replace') as f:
+            for lineno, row in enumerate(csv.DictReader(f), 2):
+                try:
+                    yield _case(lineno, row)
+                except ValueError as e:
+                    yield {'line': lineno, 'error': str(e)}
+        return
+    with open(path, 'rb') as f:
+        for lineno, raw in enumerate(f, 1):
+            if not raw.strip():
+                continue
+            try:
+                # UnicodeDecodeError is a ValueError
+                yield _case(lineno, json.loads(raw.decode('utf-8')))
+            except ValueError as e:
+                yield {'line': lineno, 'error': str(e)}
+
+
+def chunked(it, n):
+    buf = []
+    for x in it:
+        buf.append(x)
+        if len(buf) >= n:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def _init_worker(engine):
+    import interactive_diagnosis
+    interactive_diagnosis.ENGINE = engine
+
+
+def run_chunk(cases):
+    from interactive_diagnosis import diagnose_case
+    from prolog_session import PrologError
+    out = []
+    for c in cases:
+        if 'error' in c:
+            out.append(c)
+            continue
+        try:
+            res = diagnose_case(c['symptoms'], c['risks'])
+        except (PrologError, TimeoutError) as e:
+            out.append({'id': c['id'], 'line': c['line'], 'error': str(e)})
+            continue
+        out.append({'id': c['id'], 'diagnoses': [d._asdict() for d in res]})
+    return out
+
+
+def run_batch(path, out, workers=None, chunk=200, engine='prolog', log=sys.stderr):
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2
+    done = bad = 0
+    t0 = time.perf_counter()
+
+    def drain(fs):
+        nonlocal done, bad
+        for fut in fs:
+            for rec in fut.result():
+                if 'error' in rec:
+                    bad += 1
+                    print('line %s: %s' % (rec['line'], rec['error']), file=log)
+                done += 1
+                out.write(json.dumps(rec) + '\n')
+        out.flush()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine,)) as ex:
+        pending = set()
+        for ch in chunked(read_cases(path), chunk):
+            pending.add(ex.submit(run_chunk, ch))
+            if len(pending) >= window:
+                fin, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(fin)
+        while pending:
+            fin, pending = wait(pending, return_when=FIRST_COMPLETED)
+            drain(fin)
+
+    dt = time.perf_counter() - t0
+    print('%d cases (%d malformed/failed) in %.2fs -> %.1f cases/s'
+          % (done, bad, dt, done / dt if dt else 0.0), file=log)
+    return done, bad
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog='interactive_diagnosis.py --batch')
+    ap.add_argument('cases')
+    ap.add_argument('--out', help='write JSONL results here (default: stdout)')
+    ap.add_argument('--workers', type=int, default=None)
+    ap.add_argument('--chunk', type=int, default=200)
+    ap.add_argument('--engine', choices=('prolog', 'native'),
+                    default=os.environ.get('DIAG_ENGINE', 'prolog'))
+    args = ap.parse_args(argv)
+    if args.out:
+        with open(args.out, 'w') as out:
+            run_batch(args.cases, out, args.workers, args.chunk, args.engine)
+    else:
+        run_batch(args.cases, sys.stdout, args.workers, args.chunk, args.engine)
+    return 0
@@ -0,0 +1,125 @@
+# diag_cache.py
+#
+# LRU memo in front of the inference call. Keys are the canonical (sorted)
+# symptom and risk lists, so question order does not matter; duplicates are
+# kept because symptom_match_count/3 counts them. Entries are tied to a
+# content hash of knowledge_base.pl and dropped when the KB changes.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+from diagnosis import Diagnosis
+from prolog_session import KB_PATH
+
+
+def kb_hash(path=KB_PATH):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def cache_key(slist, rlist):
+    return tuple(sorted(slist)), tuple(sorted(rlist))
+
+
+class DiagnosisCache:
+
+    def __init__(self, maxsize=4096, path=None, kb=KB_PATH):
+        self.maxsize = maxsize
+        self.path = path
+        self.kb = kb
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._mtime = os.stat(kb).st_mtime_ns
+        self.kb_hash = kb_hash(kb)
+        if path and os.path.exists(path):
+            self.load()
+
+    def check_kb(self):
+        # cheap stat first; only re-hash when the file was touched
+        mt = os.stat(self.kb).st_mtime_ns
+        if mt == self._mtime:
+            return False
+        self._mtime = mt
+        h = kb_hash(self.kb)
+        if h == self.kb_hash:
+            return False
+        with self.lock:
+            self.kb_hash = h
+            self.data.clear()
+            self.invalidations += 1
+        return True
+
+    def get(self, slist, rlist):
+        key = cache_key(slist, rlist)
+        with self.lock:
+            v = self.data.get(key)
+            if v is None:
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return v
+
+    def put(self, slist, rlist, value):
+        key = cache_key(slist, rlist)
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def lookup(self, slist, rlist, compute):
+        v = self.get(slist, rlist)
+        metrics.incr('cache.hit' if v is not None else 'cache.miss')
+        if v is None:
+            v = compute(slist, rlist)
+            self.put(slist, rlist, v)
+        return v
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'invalidations': self.invalidations,
+        }
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            entries = [[list(s), list(r), [list(d) for d in v]] for (s, r), v in self.data.items()]
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'kb_hash': self.kb_hash, 'entries': entries}, f)
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        path = path or self.path
+        try:
+            with open(path) as f:
+                blob = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if blob.get('kb_hash') != self.kb_hash:
+            # stale warm-start file from another KB version
+            return 0
+        with self.lock:
+            for s, r, v in blob.get('entries', [])[-self.maxsize:]:
+                self.data[cache_key(s, r)] = [Diagnosis(*d) for d in v]
+        return len(self.data)
@@ -0,0 +1,85 @@
+# diagnosis.py
+#
+# Structured result type shared by the Prolog session and the native engine,
+# plus a small reader for the ground Prolog terms they exchange.
+
+import re
+from collections import namedtuple
+
+Diagnosis = namedtuple('Diagnosis', 'disease severity tests treatment')
+
+_tok = re.compile(r"\s*(?:([a-z][A-Za-z0-9_]*)|'((?:[^'\\]|\\.|'')*)'|([A-Z_][A-Za-z0-9_]*)"
+                  r"|(-?\d+)|([(),\[\]]))")
+
+
+def _next(src, pos):
+    m = _tok.match(src, pos)
+    if not m:
+        raise ValueError('bad term at %d: %r' % (pos, src[pos:pos + 30]))
+    return m
+
+
+def _seq(src, pos, close):
+    items = []
+    while True:
+        t, pos = read_term(src, pos)
+        items.append(t)
+        m = _next(src, pos)
+        pos = m.end()
+        if m.group(5) == close:
+            return items, pos
+        if m.group(5) != ',':
+            raise ValueError('expected , or %s at %d' % (close, pos))
+
+
+def read_term(src, pos=0):
+    # atoms -> str, variables -> None, ints -> int, lists -> list,
+    # compounds -> (functor, [args]); returns (term, end position)
+    m = _next(src, pos)
+    plain, quoted, var, num, punct = m.groups()
+    pos = m.end()
+    if punct == '[':
+        m2 = _next(src, pos)
+        if m2.group(5) == ']':
+            return [], m2.end()
+        return _seq(src, pos, ']')
+    if var is not None:
+        return None, pos
+    if num is not None:
+        return int(num), pos
+    if punct is not None:
+        raise ValueError('unexpected %r at %d' % (punct, pos))
+    atom = plain if plain is not None else quoted.replace("''", "'").replace("\\'", "'")
+    if pos < len(src) and src[pos] == '(':
+        args, pos = _seq(src, pos + 1, ')')
+        return (atom, args), pos
+    return atom, pos
+
+
+def fmt_term(t):
+    # mirrors format('~w') for atoms and flat lists
+    if isinstance(t, list):
+        return '[' + ','.join(fmt_term(x) for x in t) + ']'
+    return str(t)
+
+
+def parse_diag_terms(text):
+    out = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith('diag('):
+            continue
+        (_, args), _ = read_term(line)
+        out.append(Diagnosis(*args))
+    return out
+
+
+def format_diagnoses(diags):
+    # same text run_diag/2 prints (after strip)
+    if not diags:
+        return 'No likely diagnoses found.'
+    out = []
+    for d in diags:
+        out.append('\n--- %s (%s) ---\nRecommended tests: %s\nSuggested treatment: %s\n'
+                   % (d.disease, d.severity, fmt_term(d.tests), fmt_term(d.treatment)))
+    return ''.join(out).strip()
@@ -0,0 +1,251 @@
+# dialog_tree.py
+#
+# Offline compiler for adaptive_dialog. The KB is static between deployments,
+# so the dialog's question sequence for every answer prefix can be worked out
+# ahead of time and stored as a binary decision tree, one node per answer
+# prefix. (adaptive_dialog asks in a fixed order and every answer after the
+# severity checks changes the s/r it sends to inference, so no two prefixes
+# reach the same state and there is nothing to merge.) The tree is written
+# to a flat binary file that is mmap'ed at startup; at runtime an answer is
+# one record lookup and finished paths carry their diagnoses, so no
+# inference call is made. Paths cut off by --max-nodes fall back to the live
+# dialog.
+#
+#   python src/python/dialog_tree.py compile --out adaptive.tree
+#   python src/python/dialog_tree.py verify --tree adaptive.tree -n 500
+#   DIAG_TREE=adaptive.tree python src/python/interactive_diagnosis.py
+
+import argparse
+import json
+import mmap
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+import interactive_diagnosis as idg
+from diag_cache import kb_hash
+from diagnosis import Diagnosis
+from prolog_session import KB_PATH
+
+MAGIC = b'DTR1'
+HEADER = struct.Struct('<4sI32sIIQQ')  # magic, version, kb sha256, nodes, root, meta off, meta len
+NODE = struct.Struct('<iiii')           # question, note, yes child, no child
+VERSION = 1
+PRUNED = -1
+# child >= 0: node index; child == PRUNED: continue live; child <= -2: result -(child + 2)
+
+
+def _leaf(k):
+    return -(k + 2)
+
+
+class _Interner:
+
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def add(self, v):
+        key = json.dumps(v, sort_keys=True)
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.items)
+            self.items.append(v)
+        return i
+
+
+def _replay(factory, answers, infer):
+    # run a fresh dialog along `answers`; returns the state after them
+    steps = factory()
+    notes = []
+    reply = None
+    it = iter(answers)
+    try:
+        while True:
+            msg = steps.send(reply)
+            if isinstance(msg, idg.Ask):
+                a = next(it, None)
+                if a is None:
+                    return 'ask', msg.question, notes
+                notes = []
+                reply = a
+            elif isinstance(msg, idg.Infer):
+                reply = infer(msg.s, msg.r)
+            else:
+                notes.append(msg.text)
+                reply = None
+    except StopIteration as e:
+        return 'done', e.value or [], notes
+
+
+def compile_tree(factory=None, infer=None, max_nodes=50000, log=sys.stderr):
+    factory = factory or idg.adaptive_dialog_steps
+    memo = {}
+
+    def infer_memo(s, r):
+        key = (tuple(sorted(s)), tuple(sorted(r)))
+        if key not in memo:
+            memo[key] = (infer or idg.get_engine().diagnose)(s, r)
+        return memo[key]
+
+    questions, notes, results = _Interner(), _Interner(), _Interner()
+    nodes = []
+    pruned = 0
+
+    def note_id(ns):
+        return notes.add(ns) if ns else -1
+
+    kind, q, ns = _replay(factory, [], infer_memo)
+    if kind != 'ask':
+        raise ValueError('dialog asks no questions')
+    nodes.append([questions.add(q), note_id(ns), PRUNED, PRUNED])
+    todo = deque([(0, [])])
+    t0 = time.perf_counter()
+    while todo:
+        nid, path = todo.popleft()
+        for slot, ans in ((2, True), (3, False)):
+            kind, v, ns = _replay(factory, path + [ans], infer_memo)
+            if kind == 'done':
+                child = _leaf(results.add({'notes': ns, 'diagnoses': [list(d) for d in v]}))
+            elif len(nodes) >= max_nodes:
+                child = PRUNED
+                pruned += 1
+            else:
+                child = len(nodes)
+                nodes.append([questions.add(v), note_id(ns), PRUNED, PRUNED])
+                todo.append((child, path + [ans]))
+            nodes[nid][slot] = child
+    print('compiled %d nodes, %d results, %d pruned edges, %d inferences in %.1fs'
+          % (len(nodes), len(results.items), pruned, len(memo), time.perf_counter() - t0), file=log)
+    meta = {'questions': questions.items, 'notes': notes.items, 'results': results.items}
+    return nodes, meta
+
+
+def write_tree(path, nodes, meta, kb=KB_PATH):
+    blob = json.dumps(meta, separators=(',', ':')).encode()
+    off = HEADER.size + NODE.size * len(nodes)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bytes.fromhex(kb_hash(kb)), len(nodes), 0, off, len(blob)))
+        for n in nodes:
+            f.write(NODE.pack(*n))
+        f.write(blob)
+
+
+class DialogTree:
+
+    def __init__(self, path):
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, ver, h, self.nnodes, self.root, off, ln = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or ver != VERSION:
+            raise ValueError('%s is not a dialog tree' % path)
+        self.kb_hash = h.hex()
+        meta = json.loads(self.mm[off:off + ln])
+        self.questions = meta['questions']
+        self.notes = meta['notes']
+        self.results = [([Diagnosis(*d) for d in r['diagnoses']], r['notes']) for r in meta['results']]
+
+    def node(self, i):
+        return NODE.unpack_from(self.mm, HEADER.size + NODE.size * i)
+
+    def fresh(self, kb=KB_PATH):
+        return self.kb_hash == kb_hash(kb)
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+    def steps(self, fallback=None):
+        # dialog generator with the same protocol as adaptive_dialog_steps
+        fallback = fallback or idg.adaptive_dialog_steps
+        answers = []
+        i = self.root
+        while True:
+            q, note, yes, no = self.node(i)
+            if note >= 0:
+                for t in self.notes[note]:
+                    yield idg.Note(t)
+            a = bool((yield idg.Ask(self.questions[q])))
+            answers.append(a)
+            nxt = yes if a else no
+            if nxt >= 0:
+                i = nxt
+                continue
+            if nxt == PRUNED:
+                return (yield from _resume(fallback(), answers))
+            diags, notes = self.results[-nxt - 2]
+            for t in notes:
+                yield idg.Note(t)
+            return diags
+
+
+def _resume(steps, answers):
+    # replay recorded answers into a live dialog, then hand it over; notes
+    # from the replayed part were already shown by the tree walk
+    left = len(answers)
+    it = iter(answers)
+    reply = None
+    try:
+        while True:
+            msg = steps.send(reply)
+            if isinstance(msg, idg.Ask):
+                if left:
+                    left -= 1
+                    reply = next(it)
+                else:
+                    reply = yield msg
+            elif isinstance(msg, idg.Infer):
+                reply = yield msg
+            else:
+                reply = None
+                if not left:
+                    yield msg
+    except StopIteration as e:
+        return e.value
+
+
+def verify(tree, n=200, p_yes=0.15, seed=0, infer=None, log=sys.stdout):
+    # random answer paths through the tree vs. the live dialog + live inference
+    rnd = random.Random(seed)
+    infer = infer or idg.diagnose_case
+    bad = 0
+    for k in range(n):
+        script = [rnd.random() < p_yes for _ in range(200)]
+        qa, qb = [], []
+        ia = iter(script)
+        ra = idg.drive(tree.steps(), ask=lambda q: qa.append(q) or next(ia), infer=infer, note=lambda t: None)
+        ib = iter(script)
+        rb = idg.drive(idg.adaptive_dialog_steps(), ask=lambda q: qb.append(q) or next(ib), infer=infer,
+                       note=lambda t: None)
+        if qa != qb or list(ra) != list(rb):
+            bad += 1
+            print('path %d differs after %d questions: %s vs %s' % (k, len(qa), ra, rb), file=log)
+    print('%d/%d paths agree' % (n - bad, n), file=log)
+    return bad == 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    c = sub.add_parser('compile')
+    c.add_argument('--out', default='adaptive.tree')
+    c.add_argument('--max-nodes', type=int, default=50000)
+    v = sub.add_parser('verify')
+    v.add_argument('--tree', default='adaptive.tree')
+    v.add_argument('-n', type=int, default=200)
+    v.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args(argv)
+    if args.cmd == 'compile':
+        nodes, meta = compile_tree(max_nodes=args.max_nodes)
+        write_tree(args.out, nodes, meta)
+        return 0
+    tree = DialogTree(args.tree)
+    if not tree.fresh():
+        print('warning: tree was compiled from a different knowledge_base.pl', file=sys.stderr)
+    return 0 if verify(tree, args.n, seed=args.seed) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
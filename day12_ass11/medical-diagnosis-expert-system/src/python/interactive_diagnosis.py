@@ -1,9 +1,29 @@
 # interactive_diagnosis.py
 
+import atexit
+import os
 import subprocess
 import shlex
 import sys
-import re
+import threading
+from collections import namedtuple
+
+from prolog_session import PrologSession, PrologError
+from kb_engine import KBEngine
+from diagnosis import format_diagnoses
+from diag_cache import DiagnosisCache
+from planner import QuestionPlanner
+import metrics
+
+# 'prolog' (warm swipl workers) or 'native' (in-process bitset engine)
+ENGINE = os.environ.get('DIAG_ENGINE', 'prolog')
+# optional JSON file for warm starts of the diagnosis cache
+CACHE_FILE = os.environ.get('DIAG_CACHE')
+CACHE_SIZE = int(os.environ.get('DIAG_CACHE_SIZE', '4096'))
+# number of warm swipl workers behind run_case / the service
+POOL_SIZE = int(os.environ.get('DIAG_WORKERS', '1'))
+# precompiled adaptive_dialog question tree (see dialog_tree.py)
+TREE_FILE = os.environ.get('DIAG_TREE')
 
 _m = [
     ('fever', 'Fever'),
@@ -57,16 +77,77 @@ _sev_checks = [
     'diabetic_ketoacidosis','organ_damage'
 ]
 
+_sev_prompt = {
+    'organ_failure': 'Very low urine output, severe confusion or very yellow skin/eyes?',
+    'cerebral_malaria': 'Seizures, severe confusion or loss of consciousness?',
+    'jaundice': 'Yellowing of the skin or eyes?',
+    'difficulty_breathing': 'Is breathing very difficult right now?',
+    'chest_pain': 'Are you having severe chest pain?',
+    'severe_fatigue': 'Are you extremely weak or hard to wake?',
+    'inability_to_function': 'Unable to carry out normal daily activities?',
+    'intense_hallucinations': 'Seeing or hearing things that are not there and very distressed?',
+    'chronic_pain': 'Is the pain constant and severe, limiting movement?',
+    'joint_deformity': 'Noticeable deformity or inability to use the joint?',
+    'chronic_severe_pain': 'Long‑standing severe abdominal pain?',
+    'significant_bowel_dysfunction': 'Severe ongoing diarrhea or obstruction signs?',
+    'systemic_fungal_infection': 'High fever with spreading skin involvement or sickness?',
+    'deep_tissue_involvement': 'Deep sore or spreading redness and fever?',
+    'flank_pain': 'Pain on the side of your lower back (flank)?',
+    'fever_with_nausea': 'Fever with vomiting or severe nausea?',
+    'chronic_flashbacks': 'Ongoing uncontrollable flashbacks causing distress?',
+    'severe_emotional_distress': 'Severe panic/very distressed and unsafe?',
+    'diabetic_ketoacidosis': 'Very rapid breathing, vomiting or confusion (possible DKA)?',
+    'organ_damage': 'Symptoms suggesting serious organ problem (liver/kidney)?',
+}
+
+# The dialogs are generators (resumable state machines). They yield
+#   Ask(question)  -> expect True/False back
+#   Infer(s, r)    -> expect a list of Diagnosis back
+#   Note(text)     -> informational, nothing sent back
+# and return the final diagnoses. drive() runs one against a terminal; the
+# HTTP service (service.py) keeps one suspended generator per patient.
+Ask = namedtuple('Ask', 'question')
+Infer = namedtuple('Infer', 's r')
+Note = namedtuple('Note', 'text')
+
 def a_ask(q):
     a = input(q + " (yes/no): ").strip().lower()
     return a.startswith('y')
 
+def drive(steps, ask=a_ask, infer=None, note=print):
+    infer = infer or diagnose_case
+    reply = None
+    asked = calls = 0
+    try:
+        while True:
+            msg = steps.send(reply)
+            if isinstance(msg, Ask):
+                asked += 1
+                reply = ask(msg.question)
+            elif isinstance(msg, Infer):
+                calls += 1
+                with metrics.span('dialog.infer'):
+                    reply = infer(msg.s, msg.r)
+            else:
+                note(msg.text)
+                reply = None
+    except StopIteration as e:
+        record_consultation(asked, calls)
+        return e.value
+
+def record_consultation(asked, calls):
+    metrics.incr('dialog.consultations')
+    metrics.observe('dialog.questions', asked)
+    metrics.observe('dialog.infer_calls', calls)
+
 def mk_list(lst):
     if not lst:
         return '[]'
     return '[' + ','.join(lst) + ']'
 
-def run_case(slist, rlist, timeout=20):
+@metrics.timed('spawn')
+def run_case_spawn(slist, rlist, timeout=20):
+    # old path: one fresh swipl per query (kept for benchmarking)
     sl = mk_list(slist)
     rl = mk_list(rlist)
     cmd = f"swipl -q -s src/prolog/knowledge_base.pl -g \"run_diag({sl},{rl}),halt.\""
@@ -76,53 +157,131 @@ def run_case(slist, rlist, timeout=20):
         out = (p.stderr.strip() or out) + ("\n[rc=%s]" % p.returncode)
     return out
 
-def parse_diags(out):
-    names = []
-    for m in re.finditer(r'^---\s+([^\s(]+)', out, flags=re.M):
-        names.append(m.group(1))
-    return names
+_session = None
+_engine = None
+_cache = None
+_planner = None
+_tree = None
+_lock = threading.Lock()
+
+# stop asking once the top candidate's posterior reaches this
+CONFIDENT = 0.95
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = PrologSession(size=POOL_SIZE)
+        return _session
+
+def get_engine():
+    global _engine
+    with _lock:
+        if _engine is None:
+            _engine = KBEngine()
+        return _engine
+
+def get_planner():
+    global _planner
+    eng = get_engine()
+    with _lock:
+        if _planner is None or _planner.engine is not eng:
+            _planner = QuestionPlanner(eng)
+        return _planner
+
+def get_tree():
+    global _tree
+    with _lock:
+        if _tree is None and TREE_FILE:
+            from dialog_tree import DialogTree
+            _tree = DialogTree(TREE_FILE)
+            if not _tree.fresh():
+                print("warning: %s is stale for this knowledge base; using live dialog" % TREE_FILE,
+                      file=sys.stderr)
+                _tree.close()
+                _tree = False
+        return _tree or None
+
+def _label(k):
+    for a, q in _m:
+        if a == k:
+            return q
+    return k.replace('_', ' ').capitalize()
+
+def get_cache():
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = DiagnosisCache(maxsize=CACHE_SIZE, path=CACHE_FILE)
+            if CACHE_FILE:
+                atexit.register(_cache.save)
+        return _cache
+
+def infer(slist, rlist, timeout=20):
+    if ENGINE == 'native':
+        return get_engine().diagnose(slist, rlist)
+    return get_session().diagnose(slist, rlist, timeout=timeout)
+
+@metrics.timed('diagnose_case')
+def diagnose_case(slist, rlist, timeout=20):
+    # structured results (list of Diagnosis); raises PrologError/TimeoutError
+    global _engine, _session
+    cache = get_cache()
+    if cache.check_kb():
+        # KB was edited: recompile masks and reconsult in fresh workers
+        with _lock:
+            _engine = None
+            if _session is not None:
+                _session.close()
+                _session = None
+    return cache.lookup(slist, rlist, lambda s, r: infer(s, r, timeout))
+
+@metrics.timed('run_case')
+def run_case(slist, rlist, timeout=20):
+    try:
+        return format_diagnoses(diagnose_case(slist, rlist, timeout))
+    except (PrologError, TimeoutError) as e:
+        return "%s\n[rc=error]" % e
 
-def adaptive_dialog():
+def adaptive_dialog_steps():
     s = []
     r = []
     asked = set()
 
-    print("Adaptive symptom questioning (heuristic). I'll ask high-value Qs first.")
+    yield Note("Adaptive symptom questioning (heuristic). I'll ask high-value Qs first.")
     for sv in _sev_checks:
         if sv in asked:
             continue
         lbl = sv.replace('_',' ').capitalize()
-        if a_ask(f"Do you have {lbl}?"):
+        if (yield Ask(f"Do you have {lbl}?")):
             s.append(sv)
-            print("Severe sign reported — will escalate and run inference now.")
-            out = run_case(s, r)
-            return out
+            metrics.incr('dialog.escalations')
+            yield Note("Severe sign reported — will escalate and run inference now.")
+            return (yield Infer(list(s), list(r)))
 
     for k,q in _r:
-        if a_ask(q):
+        if (yield Ask(q)):
             r.append(k)
         asked.add(k)
-        out = run_case(s, r)
-        names = parse_diags(out)
-        if len(names) == 1:
-            return out
+        res = (yield Infer(list(s), list(r)))
+        if len(res) == 1:
+            return res
 
     for k,q in _m:
         if k in asked:
             continue
-        if a_ask(q):
+        if (yield Ask(q)):
             s.append(k)
         asked.add(k)
-        out = run_case(s, r)
-        names = parse_diags(out)
-        if len(names) == 1:
-            return out
-        if 0 < len(names) <= 2:
-            return out
+        res = (yield Infer(list(s), list(r)))
+        if len(res) == 1:
+            return res
+        if 0 < len(res) <= 2:
+            return res
 
-    return run_case(s, r)
+    return (yield Infer(list(s), list(r)))
 
-def adaptive_dialog_layered():
+def adaptive_dialog_layered_steps():
     s = []
     r = []
     asked = set()
@@ -136,59 +295,59 @@ def adaptive_dialog_layered():
 
     for sv in _sev_checks:
         q = sv.replace('_',' ').capitalize()
-        if a_ask(f"Are you having {q} (sudden or severe)?"):
+        if (yield Ask(f"Are you having {q} (sudden or severe)?")):
             s.append(sv)
-            return run_case(s, r)
+            metrics.incr('dialog.escalations')
+            return (yield Infer(list(s), list(r)))
 
     screening = ['fever','cough','abdominal_pain','red_itchy_rash',
                  'painful_urination','excessive_thirst','weight_loss','flashbacks','joint_pain']
     for k in screening:
         if k in asked: continue
-        if a_ask(prompt_for(k)):
+        if (yield Ask(prompt_for(k))):
             s.append(k)
         asked.add(k)
 
     if 'fever' in s:
         for k in ('chills','sweating'):
-            if a_ask(prompt_for(k)): s.append(k)
-        if a_ask(prompt_for('travel_to_endemic_regions')): r.append('travel_to_endemic_regions')
+            if (yield Ask(prompt_for(k))): s.append(k)
+        if (yield Ask(prompt_for('travel_to_endemic_regions'))): r.append('travel_to_endemic_regions')
 
     if 'cough' in s or 'persistent_cough' in s:
         for k in ('blood_in_sputum','shortness_of_breath'):
-            if a_ask(prompt_for(k)): s.append(k)
-        if a_ask(prompt_for('smoking_history')): r.append('smoking_history')
+            if (yield Ask(prompt_for(k))): s.append(k)
+        if (yield Ask(prompt_for('smoking_history'))): r.append('smoking_history')
 
     if 'abdominal_pain' in s:
         for k in ('bloating','diarrhea_or_constipation'):
-            if a_ask(prompt_for(k)): s.append(k)
+            if (yield Ask(prompt_for(k))): s.append(k)
 
     if 'painful_urination' in s:
-        if a_ask("Frequent urination?"): s.append('frequent_urination')
-        if a_ask("Cloudy urine?"): s.append('cloudy_urine')
-        if a_ask("Previous UTIs?"): r.append('previous_uti')
-        if a_ask("Family history of diabetes?"): r.append('family_history_of_diabetes')
+        if (yield Ask("Frequent urination?")): s.append('frequent_urination')
+        if (yield Ask("Cloudy urine?")): s.append('cloudy_urine')
+        if (yield Ask("Previous UTIs?")): r.append('previous_uti')
+        if (yield Ask("Family history of diabetes?")): r.append('family_history_of_diabetes')
 
     if 'excessive_thirst' in s or 'frequent_urination' in s:
-        if a_ask(prompt_for('family_history_of_diabetes')): r.append('family_history_of_diabetes')
+        if (yield Ask(prompt_for('family_history_of_diabetes'))): r.append('family_history_of_diabetes')
 
-    if a_ask("Have you had recent antibiotics or steroids?"):
+    if (yield Ask("Have you had recent antibiotics or steroids?")):
         r.append('recent_antibiotics_or_steroids')
-    if a_ask("Are you immunosuppressed or on long-term steroids?"):
+    if (yield Ask("Are you immunosuppressed or on long-term steroids?")):
         r.append('immunosuppressed')
-    if a_ask("No recent flu vaccine?"):
+    if (yield Ask("No recent flu vaccine?")):
         r.append('no_recent_vaccination')
 
-    out = run_case(s, r)
-    names = parse_diags(out)
+    res = (yield Infer(list(s), list(r)))
 
-    if len(names) > 1:
-        if a_ask("Do you smoke?"):
+    if len(res) > 1:
+        if (yield Ask("Do you smoke?")):
             r.append('smoking_history')
-        if a_ask("Any recent travel to malaria areas?"):
+        if (yield Ask("Any recent travel to malaria areas?")):
             r.append('travel_to_endemic_regions')
-        out = run_case(s, r)
+        res = (yield Infer(list(s), list(r)))
 
-    return out
+    return res
 
 def run_tests():
     tcs = [
@@ -203,79 +362,43 @@ def run_tests():
     bad = 0
     for i,(s,r,exp) in enumerate(tcs,1):
         print(f"\nTC{i}: s={s} r={r} -> expect '{exp}'")
-        o = run_case(s,r)
-        print("OUT:\n", o)
-        if exp in o:
+        res = diagnose_case(s,r)
+        print("OUT:\n", format_diagnoses(res))
+        if any(d.disease == exp for d in res):
             print("-> PASS")
             ok += 1
         else:
             print("-> FAIL")
             bad += 1
     print(f"\nRESULT: {ok} passed, {bad} failed")
+    print("CACHE:", get_cache().stats())
     return bad == 0
 
-def adaptive_prob_dialog():
+def adaptive_prob_dialog_steps():
     s = []
     r = []
     asked = set()
 
-    dm = {
-        'malaria': {'sym':{'fever','chills','sweating'}, 'risk':{'travel_to_endemic_regions','previous_malaria','immunosuppressed'}},
-        'influenza': {'sym':{'fever','cough','fatigue','sore_throat','runny_nose'}, 'risk':{'no_recent_vaccination','asthma_or_copd','immunosuppressed'}},
-        'lung_carcinoma': {'sym':{'persistent_cough','blood_in_sputum','shortness_of_breath','weight_loss','bone_pain'}, 'risk':{'smoking_history','family_history','occupational_exposure'}},
-        'schizophrenia': {'sym':{'delusions','hallucinations','disorganized_thinking'}, 'risk':{'family_history','substance_abuse','trauma_history'}},
-        'osteoarthritis': {'sym':{'joint_pain','stiffness','swelling'}, 'risk':{'family_history','prior_joint_injury','obesity'}},
-        'ibs': {'sym':{'abdominal_pain','bloating','diarrhea_or_constipation'}, 'risk':{'family_history','stress_or_anxiety','antibiotic_use'}},
-        'fungal_infection': {'sym':{'red_itchy_rash','scaling_skin','blisters'}, 'risk':{'immunosuppressed','recent_antibiotics_or_steroids'}},
-        'uti': {'sym':{'painful_urination','frequent_urination','cloudy_urine','flank_pain'}, 'risk':{'previous_uti','diabetes','sexual_activity'}},
-        'ptsd': {'sym':{'flashbacks','avoidance','negative_mood'}, 'risk':{'history_of_trauma','prior_mental_health_conditions'}},
-        'diabetes_type2': {'sym':{'excessive_thirst','frequent_urination','unexplained_weight_loss','elevated_blood_sugar'}, 'risk':{'family_history_of_diabetes','obesity','sedentary_lifestyle'}},
-    }
-
     loc_map = {
         'chest': {'lung_carcinoma','influenza'},
         'abdomen': {'ibs','uti','fungal_infection'},
         'joint': {'osteoarthritis'},
         'urine': {'uti','diabetes_type2'},
-        'general': set(dm.keys()),
+        'general': set(get_planner().diseases),
     }
 
-    def score_now(cands):
-        scores = {d:0 for d in cands}
-        for d in cands:
-            v = dm[d]
-            for ss in s:
-                if ss in v['sym']:
-                    scores[d] += 2
-                if ss in _sev_checks:
-                    scores[d] += 5
-            for rr in r:
-                if rr in v['risk']:
-                    scores[d] += 3
-        return scores
-
-    def top_candidate(scores):
-        items = sorted(scores.items(), key=lambda x:-x[1])
-        if not items: return None,0,0
-        top, tscore = items[0]
-        second = items[1][1] if len(items) > 1 else 0
-        total = sum(scores.values()) or 1
-        conf = tscore / total
-        gap = tscore - second
-        return top, conf, gap
-
-    pain = a_ask("Do you have any pain right now?")
+    pain = (yield Ask("Do you have any pain right now?"))
     if pain:
-        if a_ask("Is it chest pain?"):
+        if (yield Ask("Is it chest pain?")):
             s.append('chest_pain')
             loc = 'chest'
-        elif a_ask("Is it abdominal pain?"):
+        elif (yield Ask("Is it abdominal pain?")):
             s.append('abdominal_pain')
             loc = 'abdomen'
-        elif a_ask("Is it joint pain?"):
+        elif (yield Ask("Is it joint pain?")):
             s.append('joint_pain')
             loc = 'joint'
-        elif a_ask("Is it pain while peeing?"):
+        elif (yield Ask("Is it pain while peeing?")):
             s.append('painful_urination')
             loc = 'urine'
         else:
@@ -285,36 +408,36 @@ def adaptive_prob_dialog():
 
     cands = set(loc_map.get(loc, loc_map['general']))
     if not cands:
-        cands = set(dm.keys())
+        cands = set(get_planner().diseases)
 
     for k,q in _r:
         if k in ('travel_to_endemic_regions','no_recent_vaccination','smoking_history','previous_uti','family_history_of_diabetes','immunosuppressed'):
-            if a_ask(q):
+            if (yield Ask(q)):
                 r.append(k)
             asked.add(k)
 
     if loc == 'chest':
-        if a_ask("Do you have a cough?"): s.append('cough')
-        if a_ask("Shortness of breath?"): s.append('shortness_of_breath')
-        if a_ask("Any blood when coughing?"): s.append('blood_in_sputum')
-        if a_ask("Do you smoke?"): r.append('smoking_history')
+        if (yield Ask("Do you have a cough?")): s.append('cough')
+        if (yield Ask("Shortness of breath?")): s.append('shortness_of_breath')
+        if (yield Ask("Any blood when coughing?")): s.append('blood_in_sputum')
+        if (yield Ask("Do you smoke?")): r.append('smoking_history')
 
     if loc == 'abdomen':
-        if a_ask("Bloating or change in bowel habit?"):
-            if a_ask("Bloating?"): s.append('bloating')
-            if a_ask("Diarrhea or constipation?"): s.append('diarrhea_or_constipation')
-        if a_ask("Recent antibiotics or steroids?"): r.append('recent_antibiotics_or_steroids')
+        if (yield Ask("Bloating or change in bowel habit?")):
+            if (yield Ask("Bloating?")): s.append('bloating')
+            if (yield Ask("Diarrhea or constipation?")): s.append('diarrhea_or_constipation')
+        if (yield Ask("Recent antibiotics or steroids?")): r.append('recent_antibiotics_or_steroids')
 
     if loc == 'joint':
-        if a_ask("Is the joint stiff?"): s.append('stiffness')
-        if a_ask("Is there swelling?"): s.append('swelling')
-        if a_ask("Any long-term joint problems or injury?"): r.append('prior_joint_injury')
+        if (yield Ask("Is the joint stiff?")): s.append('stiffness')
+        if (yield Ask("Is there swelling?")): s.append('swelling')
+        if (yield Ask("Any long-term joint problems or injury?")): r.append('prior_joint_injury')
 
     if loc == 'urine':
-        if a_ask("Frequent urination?"): s.append('frequent_urination')
-        if a_ask("Cloudy urine?"): s.append('cloudy_urine')
-        if a_ask("Previous UTIs?"): r.append('previous_uti')
-        if a_ask("Family history of diabetes?"): r.append('family_history_of_diabetes')
+        if (yield Ask("Frequent urination?")): s.append('frequent_urination')
+        if (yield Ask("Cloudy urine?")): s.append('cloudy_urine')
+        if (yield Ask("Previous UTIs?")): r.append('previous_uti')
+        if (yield Ask("Family history of diabetes?")): r.append('family_history_of_diabetes')
 
     sev_by_d = {
         'malaria': ['organ_failure','cerebral_malaria','jaundice'],
@@ -328,33 +451,11 @@ def adaptive_prob_dialog():
         'ptsd': ['chronic_flashbacks','severe_emotional_distress'],
         'diabetes_type2': ['diabetic_ketoacidosis','organ_damage'],
     }
-    sev_prompt = {
-        'organ_failure': 'Very low urine output, severe confusion or very yellow skin/eyes?',
-        'cerebral_malaria': 'Seizures, severe confusion or loss of consciousness?',
-        'jaundice': 'Yellowing of the skin or eyes?',
-        'difficulty_breathing': 'Is breathing very difficult right now?',
-        'chest_pain': 'Are you having severe chest pain?',
-        'severe_fatigue': 'Are you extremely weak or hard to wake?',
-        'inability_to_function': 'Unable to carry out normal daily activities?',
-        'intense_hallucinations': 'Seeing or hearing things that are not there and very distressed?',
-        'chronic_pain': 'Is the pain constant and severe, limiting movement?',
-        'joint_deformity': 'Noticeable deformity or inability to use the joint?',
-        'chronic_severe_pain': 'Long‑standing severe abdominal pain?',
-        'significant_bowel_dysfunction': 'Severe ongoing diarrhea or obstruction signs?',
-        'systemic_fungal_infection': 'High fever with spreading skin involvement or sickness?',
-        'deep_tissue_involvement': 'Deep sore or spreading redness and fever?',
-        'flank_pain': 'Pain on the side of your lower back (flank)?',
-        'fever_with_nausea': 'Fever with vomiting or severe nausea?',
-        'chronic_flashbacks': 'Ongoing uncontrollable flashbacks causing distress?',
-        'severe_emotional_distress': 'Severe panic/very distressed and unsafe?',
-        'diabetic_ketoacidosis': 'Very rapid breathing, vomiting or confusion (possible DKA)?',
-        'organ_damage': 'Symptoms suggesting serious organ problem (liver/kidney)?',
-    }
     rel_sev = []
     if loc == 'general':
         rel_sev = ['difficulty_breathing','chest_pain','organ_failure']
     else:
-        for d in cands:
+        for d in sorted(cands):
             for sv in sev_by_d.get(d, []):
                 if sv not in asked and sv not in rel_sev:
                     rel_sev.append(sv)
@@ -363,96 +464,99 @@ def adaptive_prob_dialog():
             continue
         asked.add(sv)
         if sv == 'difficulty_breathing':
-            q = sev_prompt.get(sv, 'Is breathing very difficult right now?')
-            if a_ask(q):
-                if a_ask("Did this start suddenly (minutes–hours)?"):
+            q = _sev_prompt.get(sv, 'Is breathing very difficult right now?')
+            if (yield Ask(q)):
+                if (yield Ask("Did this start suddenly (minutes–hours)?")):
                     s.append(sv)
-                    print("Acute severe breathing difficulty — escalating and running inference now.")
-                    return run_case(s, r)
+                    metrics.incr('dialog.escalations')
+                    yield Note("Acute severe breathing difficulty — escalating and running inference now.")
+                    return (yield Infer(list(s), list(r)))
                 else:
-                    if 'smoking_history' in r or a_ask("Do you smoke or have a long-term cough?"):
+                    if 'smoking_history' in r or (yield Ask("Do you smoke or have a long-term cough?")):
                         s.append('persistent_cough')
                         continue
                     else:
                         s.append(sv)
-                        print("Breathing difficulty noted — running inference now.")
-                        return run_case(s, r)
+                        metrics.incr('dialog.escalations')
+                        yield Note("Breathing difficulty noted — running inference now.")
+                        return (yield Infer(list(s), list(r)))
         else:
-            qtxt = sev_prompt.get(sv, sv.replace('_',' ').capitalize() + ' now?')
-            if a_ask(qtxt):
+            qtxt = _sev_prompt.get(sv, sv.replace('_',' ').capitalize() + ' now?')
+            if (yield Ask(qtxt)):
                 s.append(sv)
-                print("Urgent sign reported — escalating and running inference now.")
-                return run_case(s, r)
-
-    dis_map = {
-        'malaria':[('fever','Fever'),('chills','Chills'),('sweating','Sweating')],
-        'influenza':[('fever','Fever'),('cough','Cough'),('fatigue','Fatigue')],
-        'lung_carcinoma':[('persistent_cough','Persistent cough'),('blood_in_sputum','Blood in sputum'),('weight_loss','Weight loss')],
-        'osteoarthritis':[('joint_pain','Joint pain'),('stiffness','Stiffness'),('swelling','Swelling')],
-        'ibs':[('abdominal_pain','Abdominal pain'),('bloating','Bloating')],
-        'uti':[('painful_urination','Painful urination'),('frequent_urination','Frequent urination')],
-        'diabetes_type2':[('excessive_thirst','Excessive thirst'),('frequent_urination','Frequent urination')],
-    }
-
-    pool = []
-    for d in cands:
-        pool.extend(dis_map.get(d, []))
-    seen = set(); pool2 = []
-    for k,lab in pool:
-        if k not in seen:
-            seen.add(k); pool2.append((k,lab))
-    pool = pool2
+                metrics.incr('dialog.escalations')
+                yield Note("Urgent sign reported — escalating and running inference now.")
+                return (yield Infer(list(s), list(r)))
 
+    # information-gain questioning over the candidate set
+    con = get_planner().start(cands, s, r, asked)
     max_q = 6
     asked_q = 0
-    while asked_q < max_q:
-        scores = {d:0 for d in cands}
-        for d in cands:
-            v = dm[d]
-            for ss in s:
-                if ss in v['sym']: scores[d] += 2
-                if ss in _sev_checks: scores[d] += 5
-            for rr in r:
-                if rr in v['risk']: scores[d] += 3
-
-        top, conf, gap = top_candidate(scores)
-        if conf >= 0.6 or gap >= 3 or (top and scores[top] >= 6):
+    # with no symptom confirmed yet nothing can fire, so the budget only
+    # starts to bind once there is one
+    while asked_q < max_q or not s:
+        if s and con.top()[1] >= CONFIDENT:
             break
-        next_q = None
-        for k,lab in pool:
-            if k in s or k in asked:
-                continue
-            next_q = (k, lab); break
-        if not next_q:
+        k = con.next_question()
+        if k is None:
             break
-        k, lab = next_q
         asked.add(k); asked_q += 1
-        if a_ask(lab):
+        yes = (yield Ask(_label(k)))
+        if yes:
             s.append(k)
-        scores = {d:0 for d in cands}
-        for d in cands:
-            v = dm[d]
-            for ss in s:
-                if ss in v['sym']: scores[d] += 2
-            for rr in r:
-                if rr in v['risk']: scores[d] += 3
-        items = sorted(scores.items(), key=lambda x:-x[1])
-        if items and items[0][1] - (items[1][1] if len(items)>1 else 0) >= 3:
-            topd = items[0][0]
-            cands = {topd}
-
-    out = run_case(s, r)
-    return out
+        con.update(k, yes)
+    # follow-ups on a confirmed symptom fall outside the max_q budget: they
+    # are what lets a rule fire at all
+    while True:
+        k = con.follow_up(s, r)
+        if k is None:
+            break
+        asked.add(k)
+        yes = (yield Ask(_label(k)))
+        if yes:
+            s.append(k)
+        con.update(k, yes)
+
+    return (yield Infer(list(s), list(r)))
+
+def adaptive_steps():
+    # compiled tree when available, otherwise the live dialog
+    tree = get_tree()
+    return tree.steps() if tree else adaptive_dialog_steps()
+
+def adaptive_dialog():
+    return drive(adaptive_steps())
+
+def adaptive_dialog_layered():
+    return drive(adaptive_dialog_layered_steps())
+
+def adaptive_prob_dialog():
+    return drive(adaptive_prob_dialog_steps())
+
+DIALOGS = {
+    'adaptive': adaptive_steps,
+    'layered': adaptive_dialog_layered_steps,
+    'prob': adaptive_prob_dialog_steps,
+}
 
 def main():
     if len(sys.argv) > 1 and sys.argv[1] in ('--test','-t'):
         ok = run_tests()
         sys.exit(0 if ok else 2)
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        import batch
+        sys.exit(batch.main(sys.argv[2:]))
 
     print("Stepwise adaptive check — will start general then refine.")
-    out = adaptive_prob_dialog()
+    try:
+        res = adaptive_prob_dialog()
+    except (PrologError, TimeoutError) as e:
+        print("Inference failed:", e)
+        sys.exit(1)
     print("\nResult:\n")
-    print(out)
+    print(format_diagnoses(res))
 
 if __name__ == '__main__':
+    # let helper modules that import interactive_diagnosis share this module
+    sys.modules.setdefault('interactive_diagnosis', sys.modules['__main__'])
     main()
\ No newline at end of file
@@ -0,0 +1,162 @@
+# kb_engine.py
+#
+# In-process replacement for diagnose_from/4 and run_diag/2. The facts are read
+# straight out of knowledge_base.pl (it stays the single source of truth) and
+# compiled into one int bitmask per disease for core symptoms, severe
+# indicators and risk factors, so a full pass is a few AND/popcount ops.
+
+import re
+
+import metrics
+from diagnosis import Diagnosis, format_diagnoses, read_term
+from prolog_session import KB_PATH
+
+FACTS = ('disease', 'symptom', 'severe_symptom', 'risk_factor', 'tests', 'treatment', 'map_key')
+
+
+def _strip_comments(text):
+    out = []
+    for line in text.splitlines():
+        if '%' in line:
+            line = line[:line.index('%')]
+        out.append(line)
+    return '\n'.join(out)
+
+
+def parse_facts(path=KB_PATH, wanted=FACTS):
+    # only plain facts are read; clauses with a body (':-') are skipped
+    with open(path) as f:
+        text = _strip_comments(f.read())
+    facts = {k: [] for k in wanted}
+    for clause in re.split(r'\.\s*(?:\n|$)', text):
+        clause = clause.strip()
+        if not clause or ':-' in clause:
+            continue
+        name = clause.split('(', 1)[0].strip()
+        if name not in facts:
+            continue
+        term, _ = read_term(clause)
+        facts[name].append(tuple(term[1]))
+    return facts
+
+
+def _popcount(x):
+    return bin(x).count('1')
+
+
+popcount = getattr(int, 'bit_count', _popcount)
+
+
+class KBEngine:
+
+    def __init__(self, path=KB_PATH):
+        self.path = path
+        f = parse_facts(path)
+        self.diseases = [d for d, _ in f['disease']]
+        self.category = dict(f['disease'])
+        self.bit = {}
+        n = len(self.diseases)
+        self.sym = [0] * n
+        self.sev = [0] * n
+        self.risk = [0] * n
+        idx = {d: i for i, d in enumerate(self.diseases)}
+        for key, masks in (('symptom', self.sym), ('severe_symptom', self.sev), ('risk_factor', self.risk)):
+            for d, feat in f[key]:
+                if d in idx:
+                    masks[idx[d]] |= self._bit(feat)
+        self.tests = {(d, k): v for d, k, v in f['tests']}
+        self.treatment = {(d, k): v for d, k, v in f['treatment']}
+        self.map_key = f['map_key']
+        self.index = idx
+        # inverted index: feature -> catalog positions of the diseases listing it
+        # as a core symptom or severe indicator. Risk factors alone never give a
+        # diagnosis, so these are the only diseases a query has to look at.
+        self.by_feature = {}
+        for key in ('symptom', 'severe_symptom'):
+            for d, feat in f[key]:
+                if d in idx:
+                    self.by_feature.setdefault(feat, set()).add(idx[d])
+
+    def _bit(self, feat):
+        b = self.bit.get(feat)
+        if b is None:
+            b = self.bit[feat] = 1 << len(self.bit)
+        return b
+
+    def mask(self, given):
+        m = 0
+        bit = self.bit
+        for g in given:
+            m |= bit.get(g, 0)
+        return m
+
+    def _extra(self, given, i):
+        # member/2 in symptom_match_count succeeds once per duplicate in Given
+        if len(set(given)) == len(given):
+            return 0
+        seen = set()
+        extra = 0
+        for g in given:
+            if g in seen and self.bit.get(g, 0) & self.sym[i]:
+                extra += 1
+            seen.add(g)
+        return extra
+
+    def _severity(self, i, sm, rm, sgiven):
+        if self.sev[i] & sm:
+            return 'severe'
+        c = popcount(self.sym[i] & sm)
+        if c and sgiven is not None:
+            c += self._extra(sgiven, i)
+        if self.risk[i] & rm and c >= 1:
+            return 'severe'
+        if c >= 2:
+            return 'mild'
+        return None
+
+    def diagnose_from(self, sgiven, rgiven, d):
+        i = self.index.get(d)
+        if i is None:
+            return None
+        return self._severity(i, self.mask(sgiven), self.mask(rgiven), sgiven)
+
+    def diagnose_all(self, sgiven, rgiven):
+        sm = self.mask(sgiven)
+        rm = self.mask(rgiven)
+        out = []
+        for i, d in enumerate(self.diseases):
+            sev = self._severity(i, sm, rm, sgiven)
+            if sev:
+                out.append((d, sev))
+        return out
+
+    def _keys(self, d, sev):
+        for md, ms, k in self.map_key:
+            if (md is None or md == d) and ms == sev:
+                yield k
+
+    def rows(self, d, sev):
+        # tests_for x treatment_for, in Prolog backtracking order
+        ts = [self.tests[(d, k)] for k in self._keys(d, sev) if (d, k) in self.tests]
+        trs = [self.treatment[(d, k)] for k in self._keys(d, sev) if (d, k) in self.treatment]
+        return [Diagnosis(d, sev, t, tr) for t in ts for tr in trs]
+
+    def candidates(self, sgiven):
+        # catalog positions worth checking, in catalog order
+        by = self.by_feature
+        return sorted(set().union(*(by.get(g, ()) for g in sgiven)))
+
+    @metrics.timed('native.diagnose')
+    def diagnose(self, sgiven, rgiven):
+        # run_diag/2 commits to the first disease whose diagnose_from succeeds
+        # (the findall goal is an if-then), so at most one disease is reported
+        sm = self.mask(sgiven)
+        rm = self.mask(rgiven)
+        for i in self.candidates(sgiven):
+            sev = self._severity(i, sm, rm, sgiven)
+            if sev:
+                return self.rows(self.diseases[i], sev)
+        return []
+
+    def run_diag(self, sgiven, rgiven):
+        return format_diagnoses(self.diagnose(sgiven, rgiven))
@@ -0,0 +1,155 @@
+# metrics.py
+#
+# Opt-in instrumentation for the inference hot path: timing spans, counters
+# and histograms, kept in process. Nothing is recorded unless DIAG_METRICS is
+# set; then every hook is one flag test (span() hands back a shared no-op
+# context manager).
+#
+#   DIAG_METRICS=1                   collect; read snapshot() or GET /metrics on the service
+#   DIAG_METRICS=/tmp/metrics.json   collect and write a snapshot there at exit
+#   DIAG_PROLOG_PROFILE=1            also record Prolog inferences / CPU time per run_diag
+#
+# Span names: spawn, prolog.start, prolog.query, parse, native.diagnose,
+# diagnose_case, run_case, planner.next_question, dialog.infer.
+
+import atexit
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+_cfg = os.environ.get('DIAG_METRICS', '')
+ENABLED = _cfg not in ('', '0')
+PROLOG_PROFILE = os.environ.get('DIAG_PROLOG_PROFILE', '') not in ('', '0')
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_counters = {}
+_hists = {}
+_spans = {}
+
+
+class Histogram:
+    # power-of-two buckets; quantiles are bucket upper bounds
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = {}
+
+    def add(self, v):
+        self.count += 1
+        self.total += v
+        self.min = min(self.min, v)
+        self.max = max(self.max, v)
+        e = math.frexp(v)[1] if v > 0 else -1074
+        self.buckets[e] = self.buckets.get(e, 0) + 1
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        want = q * self.count
+        seen = 0
+        for e in sorted(self.buckets):
+            seen += self.buckets[e]
+            if seen >= want:
+                return min(math.ldexp(1.0, e), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'sum': self.total, 'mean': self.total / self.count,
+                'min': self.min, 'max': self.max,
+                'p50': self.quantile(0.5), 'p99': self.quantile(0.99)}
+
+
+class _Span:
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _add(_spans, self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def _add(table, name, v):
+    with _lock:
+        h = table.get(name)
+        if h is None:
+            h = table[name] = Histogram()
+        h.add(v)
+
+
+def span(name):
+    if not ENABLED:
+        return _NULL
+    return _Span(name)
+
+
+def timed(name):
+    def deco(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kw):
+            if not ENABLED:
+                return f(*args, **kw)
+            with _Span(name):
+                return f(*args, **kw)
+        return wrapper
+    return deco
+
+
+def incr(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name, v):
+    if not ENABLED:
+        return
+    _add(_hists, name, v)
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _hists.clear()
+        _spans.clear()
+
+
+def snapshot():
+    # span values are seconds
+    with _lock:
+        return {'enabled': ENABLED,
+                'counters': dict(_counters),
+                'histograms': {k: h.summary() for k, h in _hists.items()},
+                'spans': {k: h.summary() for k, h in _spans.items()}}
+
+
+def dump(path):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+
+if ENABLED and _cfg.lower() not in ('1', 'on', 'true', 'yes'):
+    atexit.register(dump, _cfg)
@@ -0,0 +1,132 @@
+# planner.py
+#
+# Question selection for adaptive_prob_dialog. The compiled KB (kb_engine) is
+# turned into a disease x feature likelihood matrix once; a consultation keeps
+# a log-posterior over the candidate diseases that is updated with one column
+# per answer, and the next question is the unasked symptom with the largest
+# expected information gain. Gain is the mutual information between disease
+# and answer, I = h(p @ L) - p @ h(L), so with h(L) precomputed every feature
+# is scored with two matrix-vector products.
+
+import numpy as np
+
+import metrics
+
+# P(patient says yes | disease has the feature), by kind of feature; severe
+# signs and risk factors are absent in many true cases, so a "no" to them
+# should not rule a disease out the way a missing core symptom does
+P_SYM = 0.8
+P_SEV = 0.2
+P_RISK = 0.4
+# P(yes | disease lacks the feature)
+P_MISS = 0.05
+
+
+def _dense(masks, nbits):
+    # list of int bitmasks -> bool matrix (rows = masks, cols = bits)
+    nbytes = max(1, (nbits + 7) // 8)
+    raw = b''.join(m.to_bytes(nbytes, 'little') for m in masks)
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(len(masks), nbytes),
+                         axis=1, bitorder='little')
+    return bits[:, :nbits].astype(bool)
+
+
+def _h(q):
+    # binary entropy, elementwise
+    q = np.clip(q, 1e-12, 1 - 1e-12)
+    return -(q * np.log2(q) + (1 - q) * np.log2(1 - q))
+
+
+class QuestionPlanner:
+
+    def __init__(self, engine, p_sym=P_SYM, p_sev=P_SEV, p_risk=P_RISK, p_miss=P_MISS):
+        self.engine = engine
+        self.diseases = list(engine.diseases)
+        self.dindex = {d: i for i, d in enumerate(self.diseases)}
+        self.features = sorted(engine.bit, key=engine.bit.get)
+        self.findex = {f: j for j, f in enumerate(self.features)}
+        nf = len(self.features)
+        self.sym = _dense(engine.sym, nf)
+        self.symf = self.sym.astype(np.float32)
+        L = np.full(self.sym.shape, p_miss)
+        for m, p in ((_dense(engine.risk, nf), p_risk), (_dense(engine.sev, nf), p_sev), (self.sym, p_sym)):
+            L = np.where(m, np.maximum(L, p), L)
+        self.L = L
+        self.hL = _h(L)
+        self.logL = (np.log(1 - L), np.log(L))
+
+    def start(self, cands=None, s=(), r=(), asked=()):
+        return Consultation(self, cands, s, r, asked)
+
+
+class Consultation:
+
+    def __init__(self, plan, cands, s, r, asked):
+        self.plan = plan
+        nd = len(plan.diseases)
+        self.logp = np.zeros(nd)
+        if cands is not None:
+            alive = np.zeros(nd, dtype=bool)
+            alive[[plan.dindex[d] for d in cands if d in plan.dindex]] = True
+            self.logp[~alive] = -np.inf
+        self.asked = np.zeros(len(plan.features), dtype=bool)
+        self.yes = np.zeros(len(plan.features), dtype=bool)
+        yes = set(s) | set(r)
+        for f in sorted(yes):
+            self.update(f, True)
+        for f in sorted(set(asked) - yes):
+            self.update(f, False)
+
+    def update(self, feature, answer):
+        j = self.plan.findex.get(feature)
+        if j is None:
+            return
+        self.asked[j] = True
+        self.yes[j] = bool(answer)
+        self.logp += self.plan.logL[bool(answer)][:, j]
+
+    def posterior(self):
+        m = self.logp.max()
+        if not np.isfinite(m):
+            return np.zeros_like(self.logp)
+        p = np.exp(self.logp - m)
+        return p / p.sum()
+
+    def top(self):
+        p = self.posterior()
+        i = int(p.argmax())
+        return self.plan.diseases[i], float(p[i])
+
+    def gains(self):
+        # expected entropy reduction of every feature (ruled-out rows have p=0)
+        p = self.posterior()
+        return _h(p @ self.plan.L) - p @ self.plan.hL, p
+
+    @metrics.timed('planner.next_question')
+    def next_question(self):
+        g, p = self.gains()
+        # only ask about core symptoms of diseases still in play
+        pool = ((p > 1e-12) @ self.plan.symf > 0) & ~self.asked
+        if not pool.any():
+            return None
+        g = np.where(pool, g, -np.inf)
+        j = int(g.argmax())
+        if g[j] <= 1e-9:
+            return None
+        return self.plan.features[j]
+
+    def follow_up(self, s, r=()):
+        # one confirmed symptom never fires a rule (diagnose_from wants two
+        # core matches, a severe sign or a risk factor plus a symptom); until
+        # some disease could fire, the best unasked core symptom of the most
+        # likely candidate that already matches a confirmed symptom
+        eng = self.plan.engine
+        if any(eng.diagnose_from(s, r, eng.diseases[i]) for i in eng.candidates(s)):
+            return None
+        g, p = self.gains()
+        hits = self.plan.sym[:, self.yes].any(axis=1) & (p > 1e-12)
+        for i in sorted(np.flatnonzero(hits), key=lambda i: -p[i]):
+            pool = self.plan.sym[i] & ~self.asked
+            if pool.any():
+                return self.plan.features[int(np.where(pool, g, -np.inf).argmax())]
+        return None
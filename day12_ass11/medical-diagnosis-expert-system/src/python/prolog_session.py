@@ -0,0 +1,173 @@
+# prolog_session.py
+#
+# Long-lived swipl workers that consult knowledge_base.pl once and then answer
+# goals over stdin/stdout (see serve/0 in the KB). Replaces one fork/exec +
+# consult per question with one line written to a warm process.
+
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+import metrics
+from diagnosis import parse_diag_terms
+
+KB_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        '..', 'prolog', 'knowledge_base.pl'))
+END_MARK = '<<<END>>>'
+
+
+class PrologError(RuntimeError):
+    pass
+
+
+def mk_list(lst):
+    if not lst:
+        return '[]'
+    return '[' + ','.join(lst) + ']'
+
+
+def _record_stats(out):
+    m = re.search(r'^stats\((\d+),\s*([-+.\deE]+)\)\.', out, flags=re.M)
+    if m:
+        metrics.observe('prolog.inferences', int(m.group(1)))
+        metrics.observe('prolog.cputime', float(m.group(2)))
+
+
+class PrologWorker:
+    def __init__(self, kb=KB_PATH, swipl='swipl'):
+        self.kb = kb
+        self.swipl = swipl
+        self.proc = None
+        self.lines = None
+        self.starts = 0
+
+    def start(self):
+        with metrics.span('prolog.start'):
+            self.proc = subprocess.Popen(
+                [self.swipl, '-q', '-s', self.kb, '-g', 'serve', '-t', 'halt'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, bufsize=1)
+        # a reader thread turns the blocking pipe into a queue so query() can time out
+        self.lines = queue.Queue()
+        t = threading.Thread(target=self._pump, args=(self.proc.stdout, self.lines), daemon=True)
+        t.start()
+        self.starts += 1
+
+    @staticmethod
+    def _pump(stream, q):
+        for line in stream:
+            q.put(line)
+        q.put(None)
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def restart(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        self.start()
+
+    def query(self, goal, timeout=20):
+        if not self.alive():
+            self.restart()
+        try:
+            self.proc.stdin.write(goal.rstrip().rstrip('.') + '.\n')
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.restart()
+            raise PrologError('worker died before accepting goal')
+        out = []
+        deadline = time.monotonic() + timeout
+        while True:
+            left = deadline - time.monotonic()
+            try:
+                line = self.lines.get(timeout=max(left, 0))
+            except queue.Empty:
+                self.restart()
+                raise TimeoutError('goal timed out after %ss: %s' % (timeout, goal))
+            if line is None:
+                self.restart()
+                raise PrologError('worker exited while running: %s' % goal)
+            if line.rstrip('\n') == END_MARK:
+                break
+            out.append(line)
+        return ''.join(out)
+
+
+class PrologSession:
+    # pool of warm workers; each worker serves one query at a time
+
+    def __init__(self, size=1, kb=KB_PATH, swipl='swipl', timeout=20, retries=1):
+        self.timeout = timeout
+        self.retries = retries
+        self.workers = [PrologWorker(kb, swipl) for _ in range(size)]
+        self.idle = queue.Queue()
+        for w in self.workers:
+            w.start()
+            self.idle.put(w)
+
+    @metrics.timed('prolog.query')
+    def query(self, goal, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        try:
+            # the timeout covers waiting for a free worker as well
+            w = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError('no idle prolog worker within %ss' % timeout)
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    return w.query(goal, max(deadline - time.monotonic(), 0.001))
+                except PrologError:
+                    # crashed worker was restarted by query(); retry on the fresh one
+                    if attempt == self.retries:
+                        raise
+        finally:
+            self.idle.put(w)
+
+    def run_diag(self, slist, rlist, timeout=None):
+        return self.query('run_diag(%s,%s)' % (mk_list(slist), mk_list(rlist)), timeout).strip()
+
+    def diagnose(self, slist, rlist, timeout=None):
+        # profiling mode asks the KB for the inference count and CPU time as well
+        pred = 'run_diag_stats' if metrics.PROLOG_PROFILE else 'run_diag_terms'
+        out = self.query('%s(%s,%s)' % (pred, mk_list(slist), mk_list(rlist)), timeout)
+        if 'ERROR:' in out:
+            raise PrologError(out.strip())
+        with metrics.span('parse'):
+            if metrics.PROLOG_PROFILE:
+                _record_stats(out)
+            return parse_diag_terms(out)
+
+    def restarts(self):
+        return sum(max(w.starts - 1, 0) for w in self.workers)
+
+    def close(self):
+        for w in self.workers:
+            w.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
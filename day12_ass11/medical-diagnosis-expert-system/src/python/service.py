@@ -0,0 +1,253 @@
+# service.py
+#
+# Local HTTP front end for the adaptive dialogs. Each patient is a suspended
+# dialog generator (see drive() in interactive_diagnosis), so no thread is
+# parked waiting on input(); a request only runs the dialog up to its next
+# question. KB queries go through the shared bounded worker pool with a
+# per-request timeout.
+#
+#   python src/python/service.py --port 5000 --workers 4
+#
+#   POST   /sessions               {"dialog": "prob"|"adaptive"|"layered"}
+#   POST   /sessions/<id>/answer   {"answer": "yes"|"no"|true|false|1|0}
+#   GET    /sessions/<id>
+#   DELETE /sessions/<id>
+#   GET    /stats
+#   GET    /metrics                timing spans, counters, histograms (see metrics.py)
+
+import argparse
+import itertools
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+import interactive_diagnosis as idg
+import metrics
+from prolog_session import PrologError
+
+
+class DialogSession:
+
+    def __init__(self, sid, kind, steps):
+        self.id = sid
+        self.kind = kind
+        self.steps = steps
+        self.question = None
+        self.pending = None      # Infer that failed and can be retried
+        self.done = False
+        self.result = None
+        self.asked = 0
+        self.infer_calls = 0
+        self.lock = threading.Lock()
+        self.touched = time.monotonic()
+
+    def advance(self, reply, infer):
+        # run the generator until it asks something or finishes; returns notes.
+        # The caller holds self.lock.
+        if self.done:
+            raise ValueError('session %s is finished' % self.id)
+        notes = []
+        try:
+            if self.pending is not None:
+                msg, self.pending = self.pending, None
+            else:
+                msg = self.steps.send(reply)
+            while True:
+                if isinstance(msg, idg.Ask):
+                    self.question = msg.question
+                    self.asked += 1
+                    return notes
+                if isinstance(msg, idg.Infer):
+                    self.infer_calls += 1
+                    try:
+                        with metrics.span('dialog.infer'):
+                            res = infer(msg.s, msg.r)
+                    except Exception:
+                        # the generator is still paused at this Infer; keep it
+                        # for a retry so the next reply is not sent in its place
+                        self.pending = msg
+                        raise
+                    msg = self.steps.send(res)
+                else:
+                    notes.append(msg.text)
+                    msg = self.steps.send(None)
+        except StopIteration as e:
+            self.done = True
+            self.question = None
+            self.result = e.value or []
+            idg.record_consultation(self.asked, self.infer_calls)
+        return notes
+
+    def view(self, notes=()):
+        out = {'id': self.id, 'dialog': self.kind, 'done': self.done,
+               'question': self.question, 'notes': list(notes),
+               'questions_asked': self.asked, 'inference_calls': self.infer_calls}
+        if self.pending is not None:
+            out['retry'] = True
+        if self.done:
+            out['diagnoses'] = [d._asdict() for d in self.result]
+        return out
+
+
+class SessionStore:
+
+    def __init__(self, max_sessions=10000, ttl=1800):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.created = 0
+        self.expired = 0
+
+    def sweep(self):
+        cutoff = time.monotonic() - self.ttl
+        with self.lock:
+            old = [k for k, v in self.sessions.items() if v.touched < cutoff]
+            for k in old:
+                del self.sessions[k]
+            self.expired += len(old)
+
+    def create(self, kind):
+        if len(self.sessions) >= self.max_sessions:
+            self.sweep()
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            sid = '%x' % next(self.ids)
+            sess = DialogSession(sid, kind, idg.DIALOGS[kind]())
+            self.sessions[sid] = sess
+            self.created += 1
+            return sess
+
+    def get(self, sid):
+        with self.lock:
+            sess = self.sessions.get(sid)
+        if sess is not None:
+            sess.touched = time.monotonic()
+        return sess
+
+    def drop(self, sid):
+        with self.lock:
+            return self.sessions.pop(sid, None) is not None
+
+
+YES = {'y', 'yes', 'true', '1'}
+NO = {'n', 'no', 'false', '0'}
+
+
+def _yes(v):
+    # True/False for a recognised answer, None for anything else
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, int) and v in (0, 1):
+        return bool(v)
+    if isinstance(v, str):
+        v = v.strip().lower()
+        if v in YES:
+            return True
+        if v in NO:
+            return False
+    return None
+
+
+def create_app(infer=None, timeout=5, max_sessions=10000, ttl=1800):
+    infer = infer or (lambda s, r: idg.diagnose_case(s, r, timeout))
+    store = SessionStore(max_sessions, ttl)
+    app = Flask(__name__)
+    app.config['store'] = store
+
+    def step(sess, reply, status=200, answering=False):
+        with sess.lock:
+            # checked again under the lock: a concurrent answer may have
+            # finished the dialog while this request waited
+            if sess.done:
+                return jsonify(sess.view()), 409
+            if answering and sess.pending is None and reply is None:
+                return jsonify(error='missing "answer"'), 400
+            try:
+                notes = sess.advance(reply, infer)
+            except TimeoutError as e:
+                return jsonify(dict(sess.view(), error=str(e))), 504
+            except PrologError as e:
+                return jsonify(dict(sess.view(), error=str(e))), 502
+            except Exception as e:
+                return jsonify(dict(sess.view(), error='%s: %s' % (type(e).__name__, e))), 500
+            return jsonify(sess.view(notes)), status
+
+    @app.post('/sessions')
+    def new_session():
+        kind = (request.get_json(silent=True) or {}).get('dialog', 'prob')
+        if kind not in idg.DIALOGS:
+            return jsonify(error='unknown dialog %r' % kind), 400
+        sess = store.create(kind)
+        if sess is None:
+            return jsonify(error='too many open sessions'), 503
+        return step(sess, None, 201)
+
+    @app.post('/sessions/<sid>/answer')
+    def answer(sid):
+        sess = store.get(sid)
+        if sess is None:
+            return jsonify(error='no such session'), 404
+        if sess.done:
+            return jsonify(sess.view()), 409
+        body = request.get_json(silent=True) or {}
+        reply = None
+        if 'answer' in body:
+            reply = _yes(body['answer'])
+            if reply is None:
+                return jsonify(error='answer must be yes/no, true/false or 1/0, not %r' % (body['answer'],)), 400
+        # without an answer this only retries a failed inference
+        return step(sess, reply, answering=True)
+
+    @app.get('/sessions/<sid>')
+    def show(sid):
+        sess = store.get(sid)
+        if sess is None:
+            return jsonify(error='no such session'), 404
+        return jsonify(sess.view())
+
+    @app.delete('/sessions/<sid>')
+    def close(sid):
+        if not store.drop(sid):
+            return jsonify(error='no such session'), 404
+        return '', 204
+
+    @app.get('/stats')
+    def stats():
+        out = {'engine': idg.ENGINE, 'open_sessions': len(store.sessions),
+               'created': store.created, 'expired': store.expired,
+               'cache': idg.get_cache().stats()}
+        if idg._session is not None:
+            out['worker_restarts'] = idg._session.restarts()
+        return jsonify(out)
+
+    @app.get('/metrics')
+    def show_metrics():
+        return jsonify(metrics.snapshot())
+
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=5000)
+    ap.add_argument('--workers', type=int, default=idg.POOL_SIZE, help='warm swipl workers')
+    ap.add_argument('--timeout', type=float, default=5, help='per-query inference timeout (s)')
+    ap.add_argument('--engine', choices=('prolog', 'native'), default=idg.ENGINE)
+    ap.add_argument('--max-sessions', type=int, default=10000)
+    ap.add_argument('--metrics', action='store_true', help='collect /metrics (same as DIAG_METRICS=1)')
+    args = ap.parse_args()
+    if args.metrics:
+        metrics.enable()
+    idg.ENGINE = args.engine
+    idg.POOL_SIZE = args.workers
+    app = create_app(timeout=args.timeout, max_sessions=args.max_sessions)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
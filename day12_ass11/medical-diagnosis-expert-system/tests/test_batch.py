@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from batch import read_cases, run_batch
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(fd, 'w') as f:
+            f.write(json.dumps({'id': 'a', 'symptoms': ['fever', 'chills'], 'risks': []}) + '\n')
+            f.write('not json\n')
+            f.write(json.dumps({'id': 'b', 'symptoms': ['abdominal_pain', 'bloating']}) + '\n')
+            f.write(json.dumps({'id': 'c', 'symptoms': 'Bad Atom'}) + '\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_read_cases_reports_bad_rows(self):
+        rows = list(read_cases(self.path))
+        self.assertEqual([r.get('id') for r in rows], ['a', None, 'b', None])
+        self.assertEqual([r['line'] for r in rows if 'error' in r], [2, 4])
+
+    def test_bad_bytes_spoil_one_row(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'{"id": "d", "symptoms": ["fever\xff"]}\n')
+            f.write(b'\xfe\xff garbage\n')
+            f.write(json.dumps({'id': 'e', 'symptoms': ['fever']}).encode() + b'\n')
+        rows = list(read_cases(self.path))
+        self.assertEqual([r['line'] for r in rows if 'error' in r], [2, 4, 5, 6])
+        self.assertEqual(rows[-1]['id'], 'e')
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'id,symptoms,risks\nx,fever\xff,\ny,fever,\n')
+        try:
+            rows = list(read_cases(path))
+        finally:
+            os.remove(path)
+        self.assertEqual(rows[0]['line'], 2)
+        self.assertIn('error', rows[0])
+        self.assertEqual(rows[1]['id'], 'y')
+
+    def test_run_batch_native(self):
+        out = io.StringIO()
+        done, bad = run_batch(self.path, out, workers=2, chunk=1, engine='native', log=io.StringIO())
+        self.assertEqual((done, bad), (4, 2))
+        recs = {r['id']: r for r in map(json.loads, out.getvalue().splitlines()) if 'id' in r}
+        self.assertEqual(recs['a']['diagnoses'][0]['disease'], 'malaria')
+        self.assertEqual(recs['b']['diagnoses'][0]['severity'], 'mild')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import copy
+import io
+import os
+import sys
+import unittest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'src', 'python'))
+sys.path.insert(0, os.path.join(here, '..', 'benchmarks'))
+
+import bench_suite
+import interactive_diagnosis as idg
+
+
+class TestBenchSuite(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        engine = idg.ENGINE
+        cls.res = bench_suite.run_suite('native', n=60, log=io.StringIO())
+        idg.ENGINE = engine
+
+    def test_every_question_is_scripted(self):
+        for kind, r in self.res['dialogs'].items():
+            self.assertEqual(r['unmapped_questions'], 0, kind)
+            self.assertEqual(r['consultations'], 60)
+            self.assertGreater(r['inference_calls'], 0)
+
+    def test_cases_come_from_kb(self):
+        facts = bench_suite.parse_facts()
+        cases = list(bench_suite.synthetic_cases(facts, 20, seed=1))
+        self.assertEqual(cases, list(bench_suite.synthetic_cases(facts, 20, seed=1)))
+        syms = {(d, s) for d, s in facts['symptom']}
+        for c in cases:
+            self.assertTrue(any((c['disease'], s) in syms for s in c['symptoms']))
+
+    def test_compare_flags_regressions(self):
+        self.assertEqual(bench_suite.compare(self.res, self.res), [])
+        worse = copy.deepcopy(self.res)
+        worse['dialogs']['prob']['questions_mean'] += 2
+        worse['direct']['hit_rate'] -= 0.1
+        worse['direct']['p99_ms'] = self.res['direct']['p99_ms'] * 3 + 5
+        bad = bench_suite.compare(worse, self.res)
+        self.assertEqual(len(bad), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
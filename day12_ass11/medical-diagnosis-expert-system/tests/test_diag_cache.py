@@ -0,0 +1,64 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from diag_cache import DiagnosisCache
+from kb_engine import KBEngine
+from prolog_session import KB_PATH
+
+
+class TestDiagnosisCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.kb = os.path.join(self.tmp, 'kb.pl')
+        shutil.copy(KB_PATH, self.kb)
+        self.eng = KBEngine(self.kb)
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def compute(self, s, r):
+        self.calls += 1
+        return self.eng.diagnose(s, r)
+
+    def test_order_independent_hits(self):
+        c = DiagnosisCache(kb=self.kb)
+        a = c.lookup(['fever', 'chills', 'sweating'], ['travel_to_endemic_regions'], self.compute)
+        b = c.lookup(['sweating', 'fever', 'chills'], ['travel_to_endemic_regions'], self.compute)
+        self.assertEqual(a, b)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((c.stats()['hits'], c.stats()['misses']), (1, 1))
+
+    def test_lru_bound(self):
+        c = DiagnosisCache(maxsize=2, kb=self.kb)
+        c.lookup(['fever'], [], self.compute)
+        c.lookup(['cough'], [], self.compute)
+        c.lookup(['fever'], [], self.compute)
+        c.lookup(['bloating'], [], self.compute)  # evicts cough
+        self.assertIsNone(c.get(['cough'], []))
+        self.assertIsNotNone(c.get(['fever'], []))
+
+    def test_persist_and_invalidate(self):
+        path = os.path.join(self.tmp, 'cache.json')
+        c = DiagnosisCache(path=path, kb=self.kb)
+        c.lookup(['fever', 'chills'], [], self.compute)
+        c.save()
+        warm = DiagnosisCache(path=path, kb=self.kb)
+        self.assertEqual(warm.get(['chills', 'fever'], []), c.get(['fever', 'chills'], []))
+
+        with open(self.kb, 'a') as f:
+            f.write('\nsymptom(malaria, headache).\n')
+        os.utime(self.kb, ns=(0, 1))
+        self.assertTrue(warm.check_kb())
+        self.assertEqual(warm.stats()['size'], 0)
+        self.assertEqual(DiagnosisCache(path=path, kb=self.kb).stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
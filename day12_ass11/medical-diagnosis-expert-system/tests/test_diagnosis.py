@@ -0,0 +1,30 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from diagnosis import Diagnosis, format_diagnoses, parse_diag_terms, read_term
+
+
+class TestDiagnosisTerms(unittest.TestCase):
+
+    def test_read_term(self):
+        self.assertEqual(read_term('map_key(_, mild, mild)')[0], ('map_key', [None, 'mild', 'mild']))
+        self.assertEqual(read_term("f('Odd atom', [], [a,b])")[0], ('f', ['Odd atom', [], ['a', 'b']]))
+
+    def test_parse_and_format(self):
+        out = ('diag(malaria,severe,[blood_smear,rdt],[iv_artesunate,hospitalization]).\n'
+               'noise\n')
+        res = parse_diag_terms(out)
+        self.assertEqual(res, [Diagnosis('malaria', 'severe', ['blood_smear', 'rdt'],
+                                         ['iv_artesunate', 'hospitalization'])])
+        self.assertEqual(format_diagnoses(res),
+                         '--- malaria (severe) ---\n'
+                         'Recommended tests: [blood_smear,rdt]\n'
+                         'Suggested treatment: [iv_artesunate,hospitalization]')
+        self.assertEqual(format_diagnoses([]), 'No likely diagnoses found.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+from dialog_tree import DialogTree, compile_tree, verify, write_tree
+from kb_engine import KBEngine
+
+
+class TestDialogTree(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.infer = KBEngine().diagnose
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.dir.name, 'adaptive.tree')
+        # small node budget so some paths are pruned and fall back to the live dialog
+        nodes, meta = compile_tree(infer=cls.infer, max_nodes=300, log=io.StringIO())
+        write_tree(cls.path, nodes, meta)
+        cls.tree = DialogTree(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tree.close()
+        cls.dir.cleanup()
+
+    def test_fresh(self):
+        self.assertTrue(self.tree.fresh())
+        self.assertEqual(self.tree.nnodes, 300)
+
+    def test_matches_live_dialog(self):
+        self.assertTrue(verify(self.tree, n=100, infer=self.infer, log=io.StringIO()))
+
+    def test_compiled_path_needs_no_inference(self):
+        # follow the tree to a stored result: answers come from the tree, no KB query is made
+        script, i = [], self.tree.root
+        while i >= 0:
+            _, _, yes, no = self.tree.node(i)
+            a = yes <= -2 or (yes >= 0 and no > -2)
+            script.append(a)
+            i = yes if a else no
+        self.assertLessEqual(i, -2)
+        calls = []
+
+        def infer(s, r):
+            calls.append((s, r))
+            return self.infer(s, r)
+
+        it = iter(script)
+        res = idg.drive(self.tree.steps(), ask=lambda q: next(it), infer=infer, note=lambda t: None)
+        it = iter(script)
+        live = idg.drive(idg.adaptive_dialog_steps(), ask=lambda q: next(it), infer=self.infer,
+                         note=lambda t: None)
+        self.assertEqual(res, live)
+        self.assertEqual(calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
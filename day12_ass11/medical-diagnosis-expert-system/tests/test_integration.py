@@ -1,63 +1,48 @@
-import unittest
+import os
+import shutil
 import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from diagnosis import parse_diag_terms
+from prolog_session import KB_PATH, mk_list
 
+
+@unittest.skipUnless(shutil.which('swipl'), 'swipl not installed')
 class TestIntegration(unittest.TestCase):
 
-    def test_diagnosis_flu(self):
-        symptoms = "fever cough sore_throat"
-        expected_diagnosis = "flu"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
+    def test_diagnosis_malaria(self):
+        self.assertIn('malaria', self.get_diagnosis(['fever', 'chills', 'sweating'], ['travel_to_endemic_regions']))
 
-    def test_diagnosis_cold(self):
-        symptoms = "cough runny_nose"
-        expected_diagnosis = "cold"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
+    def test_diagnosis_influenza(self):
+        self.assertIn('influenza', self.get_diagnosis(['fever', 'cough', 'fatigue'], ['no_recent_vaccination']))
 
-    def test_diagnosis_allergy(self):
-        symptoms = "sneezing itchy_eyes"
-        expected_diagnosis = "allergy"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
+    def test_diagnosis_lung_carcinoma(self):
+        symptoms = ['persistent_cough', 'blood_in_sputum', 'weight_loss']
+        self.assertIn('lung_carcinoma', self.get_diagnosis(symptoms, ['smoking_history']))
 
-    def test_diagnosis_stomach_ache(self):
-        symptoms = "stomach_pain nausea"
-        expected_diagnosis = "stomach_ache"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
+    def test_diagnosis_ibs(self):
+        self.assertIn('ibs', self.get_diagnosis(['abdominal_pain', 'bloating'], ['stress_or_anxiety']))
 
-    def test_diagnosis_migraine(self):
-        symptoms = "headache nausea sensitivity_to_light"
-        expected_diagnosis = "migraine"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
+    def test_diagnosis_uti(self):
+        self.assertIn('uti', self.get_diagnosis(['painful_urination', 'frequent_urination'], ['previous_uti']))
 
     def test_diagnosis_diabetes(self):
-        symptoms = "increased_thirst frequent_urination"
-        expected_diagnosis = "diabetes"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
-
-    def test_diagnosis_heart_disease(self):
-        symptoms = "chest_pain shortness_of_breath"
-        expected_diagnosis = "heart_disease"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
-
-    def test_diagnosis_asthma(self):
-        symptoms = "wheezing shortness_of_breath"
-        expected_diagnosis = "asthma"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
-
-    def test_diagnosis_pneumonia(self):
-        symptoms = "cough fever difficulty_breathing"
-        expected_diagnosis = "pneumonia"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
-
-    def test_diagnosis_anemia(self):
-        symptoms = "fatigue weakness pale_skin"
-        expected_diagnosis = "anemia"
-        self.assertEqual(self.get_diagnosis(symptoms), expected_diagnosis)
-
-    def get_diagnosis(self, symptoms):
-        # Call the Prolog knowledge base and return the diagnosis
-        result = subprocess.run(['swipl', '-s', 'src/prolog/knowledge_base.pl', '-g', f'diagnose({symptoms}, Diagnosis)', '-t', 'halt'], 
+        symptoms = ['excessive_thirst', 'frequent_urination']
+        self.assertIn('diabetes_type2', self.get_diagnosis(symptoms, ['family_history_of_diabetes']))
+
+    def test_no_symptoms(self):
+        self.assertEqual(self.get_diagnosis([], []), [])
+
+    def get_diagnosis(self, symptoms, risks):
+        # Call the Prolog knowledge base and return the diagnosed diseases
+        goal = 'run_diag_terms(%s,%s)' % (mk_list(symptoms), mk_list(risks))
+        result = subprocess.run(['swipl', '-q', '-s', KB_PATH, '-g', goal, '-t', 'halt'],
                                 capture_output=True, text=True)
-        return result.stdout.strip() if result.returncode == 0 else None
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return [d.disease for d in parse_diag_terms(result.stdout)]
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,132 @@
+import itertools
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'src', 'python'))
+sys.path.insert(0, os.path.join(here, '..', 'benchmarks'))
+
+from gen_kb import write_kb
+from kb_engine import KBEngine, parse_facts
+from prolog_session import PrologSession, mk_list
+
+
+class TestKBEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.eng = KBEngine()
+
+    def test_compiles_all_facts(self):
+        f = parse_facts()
+        self.assertEqual(len(self.eng.diseases), len(f['disease']))
+        self.assertIn((None, 'mild', 'mild'), self.eng.map_key)
+
+    def test_rules(self):
+        e = self.eng
+        # severe indicator alone is enough
+        self.assertEqual(e.diagnose_from(['jaundice'], [], 'malaria'), 'severe')
+        # risk factor needs at least one symptom
+        self.assertIsNone(e.diagnose_from([], ['previous_malaria'], 'malaria'))
+        self.assertEqual(e.diagnose_from(['fever'], ['previous_malaria'], 'malaria'), 'severe')
+        self.assertEqual(e.diagnose_from(['fever', 'chills'], [], 'malaria'), 'mild')
+        self.assertIsNone(e.diagnose_from(['fever'], [], 'malaria'))
+        # member/2 counts duplicates
+        self.assertEqual(e.diagnose_from(['fever', 'fever'], [], 'malaria'), 'mild')
+
+    def test_run_diag_text(self):
+        out = self.eng.run_diag(['persistent_cough', 'blood_in_sputum'], [])
+        self.assertEqual(out, '--- lung_carcinoma (mild) ---\n'
+                              'Recommended tests: [chest_xray,ct_scan]\n'
+                              'Suggested treatment: [surgery_lobectomy,radiation]')
+        self.assertEqual(self.eng.run_diag([], []), 'No likely diagnoses found.')
+
+
+def _scan(eng, s, r):
+    # first match over the whole catalog, as diag_row_scan/6 does
+    for d, sev in eng.diagnose_all(s, r):
+        return eng.rows(d, sev)
+    return []
+
+
+class TestIndexedCatalog(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.dir.name, 'kb.pl')
+        write_kb(cls.path, 2000)
+        cls.eng = KBEngine(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def random_cases(self, eng, n=500):
+        rnd = random.Random(0)
+        feats = sorted(eng.bit)
+        for _ in range(n):
+            s = rnd.sample(feats, rnd.randint(0, 4)) * rnd.choice((1, 1, 2))
+            yield s, rnd.sample(feats, rnd.randint(0, 2))
+
+    def test_generated_kb_loads(self):
+        self.assertEqual(len(self.eng.diseases), 2000)
+        self.assertEqual(len(parse_facts(self.path)['tests']), 4000)
+
+    def test_index_matches_scan(self):
+        real = KBEngine()
+        for s, r in _cases(real):
+            self.assertEqual(real.diagnose(s, r), _scan(real, s, r), (s, r))
+        for s, r in self.random_cases(self.eng):
+            self.assertEqual(self.eng.diagnose(s, r), _scan(self.eng, s, r), (s, r))
+
+    def test_candidates_are_local(self):
+        s = sorted(self.eng.bit)[:2]
+        self.assertLess(len(self.eng.candidates(s)), 100)
+
+    @unittest.skipUnless(shutil.which('swipl'), 'swipl not installed')
+    def test_prolog_index_matches_scan(self):
+        goal = ('forall(member(S-R, %s), ((findall(D-V, diag_row(S, R, D, V, _, _), A), '
+                'findall(D-V, diag_row_scan(S, R, D, V, _, _), A)) -> true ; '
+                'format("mismatch ~q~n", [S-R])))')
+        cases = '[%s]' % ','.join('%s-%s' % (mk_list(s), mk_list(r)) for s, r in self.random_cases(self.eng, 200))
+        out = subprocess.run(['swipl', '-q', '-s', self.path, '-g', goal % cases, '-t', 'halt'],
+                             capture_output=True, text=True)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertNotIn('mismatch', out.stdout)
+
+
+def _cases(eng):
+    f = parse_facts()
+    syms = sorted({s for _, s in f['symptom']} | {s for _, s in f['severe_symptom']})
+    risks = sorted({r for _, r in f['risk_factor']})
+    for a, b in itertools.combinations(syms, 2):
+        yield [a, b], []
+    for s in syms:
+        for r in risks:
+            yield [s], [r]
+    for d in eng.diseases:
+        own = sorted({s for dd, s in f['symptom'] if dd == d})
+        for k in range(len(own) + 1):
+            for sub in itertools.combinations(own, k):
+                yield list(sub), []
+
+
+@unittest.skipUnless(shutil.which('swipl'), 'swipl not installed')
+class TestAgainstProlog(unittest.TestCase):
+
+    def test_differential(self):
+        eng = KBEngine()
+        with PrologSession(size=1, timeout=10) as sess:
+            for s, r in _cases(eng):
+                self.assertEqual(eng.run_diag(s, r), sess.run_diag(s, r), (s, r))
+                self.assertEqual(eng.diagnose(s, r), sess.diagnose(s, r), (s, r))
+
+
+if __name__ == '__main__':
+    unittest.main()
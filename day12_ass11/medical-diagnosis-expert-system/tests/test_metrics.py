@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+import metrics
+from kb_engine import KBEngine
+from service import create_app
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.was = metrics.ENABLED
+        metrics.reset()
+        self.eng = KBEngine()
+
+    def tearDown(self):
+        metrics.enable(self.was)
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+        with metrics.span('x'):
+            metrics.incr('c')
+            metrics.observe('h', 1.0)
+        self.eng.diagnose(['fever'], [])
+        snap = metrics.snapshot()
+        self.assertEqual((snap['counters'], snap['histograms'], snap['spans']), ({}, {}, {}))
+
+    def test_dialog_records_spans_and_counts(self):
+        metrics.enable()
+        # first severe-sign question answered yes -> escalation with one inference
+        idg.drive(idg.adaptive_dialog_steps(), ask=lambda q: True, infer=self.eng.diagnose,
+                  note=lambda t: None)
+        snap = metrics.snapshot()
+        self.assertEqual(snap['counters']['dialog.escalations'], 1)
+        self.assertEqual(snap['counters']['dialog.consultations'], 1)
+        self.assertEqual(snap['histograms']['dialog.infer_calls']['max'], 1)
+        self.assertEqual(snap['histograms']['dialog.questions']['max'], 1)
+        self.assertEqual(snap['spans']['native.diagnose']['count'], 1)
+        self.assertEqual(snap['spans']['dialog.infer']['count'], 1)
+
+    def test_histogram_quantiles(self):
+        h = metrics.Histogram()
+        for v in range(1, 101):
+            h.add(v)
+        self.assertEqual(h.summary()['max'], 100)
+        self.assertEqual(h.quantile(0.5), 64)
+        self.assertEqual(h.quantile(0.99), 100)
+
+    def test_service_endpoint(self):
+        metrics.enable()
+        client = create_app(infer=self.eng.diagnose).test_client()
+        st = client.post('/sessions', json={'dialog': 'prob'}).get_json()
+        while not st['done']:
+            st = client.post('/sessions/%s/answer' % st['id'], json={'answer': False}).get_json()
+        snap = client.get('/metrics').get_json()
+        self.assertTrue(snap['enabled'])
+        self.assertEqual(snap['counters']['dialog.consultations'], 1)
+        self.assertEqual(snap['histograms']['dialog.questions']['max'], st['questions_asked'])
+
+
+if __name__ == '__main__':
+    unittest.main()
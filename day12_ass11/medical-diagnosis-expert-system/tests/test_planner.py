@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+from kb_engine import KBEngine, parse_facts
+from planner import QuestionPlanner
+
+
+class TestQuestionPlanner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.eng = KBEngine()
+        cls.plan = QuestionPlanner(cls.eng)
+
+    def test_first_question_splits_candidates(self):
+        # a symptom shared by two diseases carries more information than a private one
+        k = self.plan.start().next_question()
+        shared = [f for f in self.plan.features
+                  if sum(1 for m in self.eng.sym if m & self.eng.bit[f]) > 1]
+        self.assertIn(k, shared)
+
+    def test_gain_matches_direct_entropy(self):
+        con = self.plan.start(s=['fever'])
+        g, p = con.gains()
+        L = self.plan.L
+
+        def H(q):
+            q = q[q > 0]
+            return -(q * np.log2(q)).sum()
+
+        j = self.plan.findex['chills']
+        py = p @ L[:, j]
+        direct = H(p) - py * H(p * L[:, j] / py) - (1 - py) * H(p * (1 - L[:, j]) / (1 - py))
+        self.assertAlmostEqual(g[j], direct, places=6)
+
+    def test_updates_concentrate_posterior(self):
+        con = self.plan.start(cands={'uti', 'diabetes_type2'})
+        con.update('excessive_thirst', True)
+        con.update('frequent_urination', True)
+        top, conf = con.top()
+        self.assertEqual(top, 'diabetes_type2')
+        self.assertGreater(conf, 0.9)
+
+    def test_dialog_finds_symptom_only_patient(self):
+        syms = {'painful_urination', 'frequent_urination', 'cloudy_urine'}
+        labels = {idg._label(f): f for f in self.eng.bit}
+        res = idg.drive(idg.adaptive_prob_dialog_steps(), ask=lambda q: labels.get(q) in syms,
+                        infer=self.eng.diagnose, note=lambda t: None)
+        self.assertEqual([d.disease for d in res], ['uti'])
+
+    def _consult(self, syms):
+        labels = {idg._label(f): f for f in self.eng.bit}
+        return idg.drive(idg.adaptive_prob_dialog_steps(), ask=lambda q: labels.get(q) in syms,
+                         infer=self.eng.diagnose, note=lambda t: None)
+
+    def test_dialog_diagnoses_every_single_disease_patient(self):
+        facts = parse_facts()
+        for d in self.eng.diseases:
+            syms = {s for dd, s in facts['symptom'] if dd == d}
+            with self.subTest(disease=d):
+                self.assertIn(d, [r.disease for r in self._consult(syms)])
+
+    def test_confirmed_symptom_is_followed_up(self):
+        # the question budget used to run out right after the first "yes",
+        # leaving a single symptom that no rule fires on
+        res = self._consult({'fever', 'chills', 'sweating'})
+        self.assertEqual({r.disease for r in res}, {'malaria'})
+
+    def test_follow_up_stops_once_a_rule_can_fire(self):
+        con = self.plan.start(s=['fever'])
+        k = con.follow_up(['fever'])
+        self.assertIsNotNone(k)
+        self.assertTrue(any(self.eng.sym[i] & self.eng.bit[k] and self.eng.sym[i] & self.eng.bit['fever']
+                            for i in range(len(self.eng.diseases))))
+        self.assertIsNone(self.plan.start(s=['fever', 'chills']).follow_up(['fever', 'chills']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+import interactive_diagnosis as idg
+from kb_engine import KBEngine
+from service import create_app
+
+
+class TestDialogSteps(unittest.TestCase):
+
+    def test_scripted_drive(self):
+        answers = iter([False] * 8 + [True] * 3)
+        res = idg.drive(idg.adaptive_prob_dialog_steps(), ask=lambda q: next(answers),
+                        infer=KBEngine().diagnose, note=lambda t: None)
+        self.assertEqual([(d.disease, d.severity) for d in res], [('influenza', 'severe')])
+
+
+class TestService(unittest.TestCase):
+
+    def setUp(self):
+        self.eng = KBEngine()
+        self.app = create_app(infer=self.eng.diagnose, max_sessions=2)
+        self.client = self.app.test_client()
+
+    def consult(self, answers):
+        r = self.client.post('/sessions', json={'dialog': 'prob'})
+        self.assertEqual(r.status_code, 201)
+        st = r.get_json()
+        answers = iter(answers)
+        while not st['done']:
+            st = self.client.post('/sessions/%s/answer' % st['id'], json={'answer': next(answers)}).get_json()
+        return st
+
+    def test_consultation_matches_cli(self):
+        asked = []
+        answers = iter([False] * 8 + [True] * 3)
+        idg.drive(idg.adaptive_prob_dialog_steps(), ask=lambda q: asked.append(q) or next(answers),
+                  infer=self.eng.diagnose, note=lambda t: None)
+        st = self.consult(['no'] * 8 + ['yes'] * 3)
+        self.assertEqual(st['diagnoses'][0]['disease'], 'influenza')
+        self.assertEqual(st['questions_asked'], len(asked))
+
+    def test_interleaved_sessions(self):
+        a = self.client.post('/sessions', json={'dialog': 'adaptive'}).get_json()
+        b = self.client.post('/sessions', json={'dialog': 'layered'}).get_json()
+        self.assertNotEqual(a['id'], b['id'])
+        self.assertEqual(self.client.post('/sessions', json={}).status_code, 503)
+        a2 = self.client.post('/sessions/%s/answer' % a['id'], json={'answer': False}).get_json()
+        self.assertNotEqual(a2['question'], a['question'])
+        self.assertEqual(self.client.get('/sessions/%s' % b['id']).get_json()['question'], b['question'])
+        self.assertEqual(self.client.delete('/sessions/%s' % a['id']).status_code, 204)
+        self.assertEqual(self.client.get('/sessions/%s' % a['id']).status_code, 404)
+
+    def test_timeout_is_retryable(self):
+        calls = []
+
+        def flaky(s, r):
+            calls.append(1)
+            if len(calls) == 1:
+                raise TimeoutError('slow worker')
+            return self.eng.diagnose(s, r)
+
+        client = create_app(infer=flaky).test_client()
+        st = client.post('/sessions', json={'dialog': 'adaptive'}).get_json()
+        sid = st['id']
+        for _ in range(100):
+            r = client.post('/sessions/%s/answer' % sid, json={'answer': False})
+            if r.status_code == 504:
+                break
+        self.assertEqual(r.status_code, 504)
+        self.assertTrue(r.get_json()['retry'])
+        r = client.post('/sessions/%s/answer' % sid, json={})
+        self.assertEqual(r.status_code, 200)
+
+    def test_answer_values(self):
+        st = self.client.post('/sessions', json={'dialog': 'prob'}).get_json()
+        url = '/sessions/%s/answer' % st['id']
+        for bad in ('maybe', 2, None, [1]):
+            self.assertEqual(self.client.post(url, json={'answer': bad}).status_code, 400)
+        self.assertEqual(self.client.post(url, json={}).status_code, 400)
+        self.assertEqual(self.client.get('/sessions/%s' % st['id']).get_json()['questions_asked'], 1)
+        st = self.consult([0] * 8 + ['1', 1, 'Yes'])
+        self.assertEqual(st['diagnoses'][0]['disease'], 'influenza')
+
+    def test_infer_error_is_retryable(self):
+        calls = []
+
+        def broken(s, r):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError('cannot parse reply')
+            return self.eng.diagnose(s, r)
+
+        client = create_app(infer=broken).test_client()
+        sid = client.post('/sessions', json={'dialog': 'adaptive'}).get_json()['id']
+        for _ in range(100):
+            r = client.post('/sessions/%s/answer' % sid, json={'answer': False})
+            if r.status_code != 200:
+                break
+        self.assertEqual(r.status_code, 500)
+        self.assertTrue(r.get_json()['retry'])
+        r = client.post('/sessions/%s/answer' % sid, json={})
+        self.assertEqual(r.status_code, 200)
+        while not r.get_json()['done']:
+            r = client.post('/sessions/%s/answer' % sid, json={'answer': False})
+            self.assertEqual(r.status_code, 200)
+
+    def test_concurrent_final_answers(self):
+        # both requests pass the unlocked done check; only one may finish the dialog
+        gate = threading.Event()
+        entered = []
+
+        def slow(s, r):
+            entered.append(1)
+            gate.wait(5)
+            return self.eng.diagnose(s, r)
+
+        app = create_app(infer=slow)
+        client = app.test_client()
+        gate.set()
+        answers = iter([False] * 8 + [True] * 3)
+        st = client.post('/sessions', json={'dialog': 'prob'}).get_json()
+        used = []
+        while not st['done']:
+            used.append(next(answers))
+            st = client.post('/sessions/%s/answer' % st['id'], json={'answer': used[-1]}).get_json()
+        st = client.post('/sessions', json={'dialog': 'prob'}).get_json()
+        sid = st['id']
+        for a in used[:-1]:
+            st = client.post('/sessions/%s/answer' % sid, json={'answer': a}).get_json()
+        self.assertFalse(st['done'])
+        gate.clear()
+        entered.clear()
+        codes = []
+
+        def post():
+            codes.append(app.test_client().post('/sessions/%s/answer' % sid, json={'answer': used[-1]}))
+
+        threads = [threading.Thread(target=post) for _ in range(2)]
+        for t in threads:
+            t.start()
+        while not entered:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(r.status_code for r in codes), [200, 409])
+        for r in codes:
+            self.assertEqual(r.get_json()['diagnoses'][0]['disease'], 'influenza')
+        st = client.get('/sessions/%s' % sid).get_json()
+        self.assertEqual(st['diagnoses'][0]['disease'], 'influenza')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import shutil
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'python'))
+
+from prolog_session import PrologSession, PrologError
+
+
+@unittest.skipUnless(shutil.which('swipl'), 'swipl not installed')
+class TestPrologSession(unittest.TestCase):
+
+    def setUp(self):
+        self.sess = PrologSession(size=2, timeout=5)
+
+    def tearDown(self):
+        self.sess.close()
+
+    def test_repeated_queries(self):
+        for _ in range(3):
+            out = self.sess.run_diag(['fever', 'chills', 'sweating'], ['travel_to_endemic_regions'])
+            self.assertIn('--- malaria (severe) ---', out)
+        self.assertEqual(self.sess.run_diag([], []), 'No likely diagnoses found.')
+
+    def test_structured_results(self):
+        res = self.sess.diagnose(['fever', 'chills', 'sweating'], ['travel_to_endemic_regions'])
+        self.assertEqual([(d.disease, d.severity) for d in res], [('malaria', 'severe')])
+        self.assertIn('blood_smear', res[0].tests)
+        self.assertEqual(self.sess.diagnose([], []), [])
+
+    def test_restart_after_crash(self):
+        with self.assertRaises(PrologError):
+            self.sess.query('halt')
+        out = self.sess.run_diag(['abdominal_pain', 'bloating'], [])
+        self.assertIn('--- ibs (mild) ---', out)
+
+    def test_restart_after_hang(self):
+        with self.assertRaises(TimeoutError):
+            self.sess.query('repeat, fail', timeout=1)
+        self.assertGreaterEqual(self.sess.restarts(), 1)
+        out = self.sess.run_diag(['excessive_thirst', 'frequent_urination'], [])
+        self.assertIn('diabetes_type2', out)
+
+
+if __name__ == '__main__':
+    unittest.main()
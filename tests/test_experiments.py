@@ -0,0 +1,42 @@
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import experiments
+
+DAY5 = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day5_ass5',
+                    '041_Sushar_Hembram_Assignment5_results_summary.csv')
+
+
+class TestExperiments(unittest.TestCase):
+
+    def test_specs(self):
+        self.assertEqual(experiments.parse_spec('dls:2,3'), [('dls', '2'), ('dls', '3')])
+        self.assertEqual(experiments.parse_spec('bfs'), [('bfs', None)])
+        with self.assertRaises(ValueError):
+            experiments.parse_spec('astar:3')
+
+    def test_isolated_run_keeps_day5_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'results.csv')
+            rows = experiments.run(['bfs', 'ids:3', 'hanoi:4'], out, repeat=2, warmup=0, log=None)
+            with open(out) as f, open(DAY5) as g:
+                header = next(csv.reader(f))
+                self.assertEqual(header[:4], next(csv.reader(g)))
+            self.assertEqual(experiments.load(out)[1]['param'], '3')
+            jl = os.path.join(tmp, 'results.jsonl')
+            experiments.write(jl, rows)
+            self.assertEqual(experiments.load(jl), rows)
+        bfs, ids, hanoi = rows
+        self.assertEqual((bfs['algorithm'], bfs['param'], bfs['nodes']), ('BFS', '', 10))
+        self.assertEqual(ids['nodes'], 11)
+        self.assertEqual(hanoi['nodes'], 71)
+        self.assertTrue(all(r['time'] > 0 and r['memory'] > 0 and r['maxrss_kb'] > 0 for r in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
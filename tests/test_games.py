@@ -0,0 +1,119 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from functools import lru_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import games
+from ailab.games import Engine, Game, medium_move, solve
+
+DAY6 = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day6_ass6')
+G3 = Game(3)
+
+
+@lru_cache(None)
+def minimax(x, o, side):
+    # plain negamax over the whole 3x3 tree: 1 win, 0 draw, -1 loss
+    mine, theirs = (x, o) if side == 0 else (o, x)
+    best = -1
+    for c in range(9):
+        if (x | o) >> c & 1:
+            continue
+        nm = mine | 1 << c
+        if any(nm & L == L for L in G3.lines):
+            return 1
+        if (nm | theirs) == G3.full:
+            v = 0
+        else:
+            v = -minimax(*((nm, theirs) if side == 0 else (theirs, nm)), side ^ 1)
+        best = max(best, v)
+    return best
+
+
+class TestGames(unittest.TestCase):
+
+    def test_best_first_matches_day6_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            steps, out = os.path.join(tmp, 'steps.txt'), os.path.join(tmp, 'output.txt')
+            games.best_first(os.path.join(DAY6, 'input (3).txt'), steps, out)
+            for mine, theirs in ((steps, 'steps.txt'), (out, 'output (3).txt')):
+                with open(mine) as a, open(os.path.join(DAY6, theirs)) as b:
+                    self.assertEqual(a.read(), b.read())
+
+    def test_best_first_trace_levels(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            inp = os.path.join(DAY6, 'input (3).txt')
+            steps, out = os.path.join(tmp, 's.txt'), os.path.join(tmp, 'o.txt')
+            games.best_first(inp, steps, out)
+            with open(steps) as f:
+                full = f.read().split('-' * 10 + '\n')[:-1]
+            games.best_first(inp, steps, out, every=2)
+            with open(steps) as f:
+                text = f.read()
+            self.assertEqual(text.split('-' * 10 + '\n')[:-1], full[1::2])
+            self.assertIn('summary found=True expanded=%d' % len(full), text)
+            games.best_first(inp, steps, out, level='summary')
+            with open(steps) as f:
+                self.assertTrue(f.read().startswith('summary found=True'))
+            os.remove(steps)
+            games.best_first(inp, steps, out, level='off')
+            self.assertFalse(os.path.exists(steps))
+            with open(out) as a, open(os.path.join(DAY6, 'output (3).txt')) as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_engine_against_minimax(self):
+        rnd = random.Random(0)
+        eng = Engine(G3)
+        for _ in range(150):
+            pos = G3.position()
+            for _ in range(rnd.randrange(7)):
+                if pos.threats(pos.side):
+                    break
+                pos.play(rnd.choice(pos.moves()))
+            if pos.threats(pos.side):
+                continue
+            move, res = solve(pos, eng)
+            self.assertEqual(res, minimax(pos.bits[0], pos.bits[1], pos.side), pos.rows())
+
+    def test_symmetric_positions_share_a_key(self):
+        a, b = G3.position(), G3.position()
+        a.play(0)
+        a.play(4)
+        b.play(8)
+        b.play(4)
+        self.assertEqual(a.canonical()[0], b.canonical()[0])
+        a.undo()
+        a.undo()
+        self.assertEqual(a.hash, G3.position().hash)
+        self.assertEqual((a.score, a.open), (0, [8, 8]))
+
+    def test_medium_move_wins_then_blocks(self):
+        pos = G3.position([['X', 'X', '.'], ['O', 'O', '.'], ['.', '.', '.']], 'O')
+        self.assertEqual(medium_move(pos), 5)
+        pos = G3.position([['X', 'X', '.'], ['O', '.', '.'], ['.', '.', '.']], 'O')
+        self.assertEqual(medium_move(pos), 2)
+
+    def test_larger_boards(self):
+        # 3 in a row on 4x4 is a first-player win
+        move, res = solve(Game(4, 3).position())
+        self.assertEqual(res, 1)
+
+    def test_console_game(self):
+        answers = iter(['X', 'hard', '0 0', '0 1', '1 1', '2 0', '1 2', '2 2', '0 2', '2 1', '1 0'])
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'output.txt')
+            with redirect_stdout(io.StringIO()):
+                games.play(3, out=out, ask=lambda prompt: next(answers))
+            with open(out) as f:
+                text = f.read()
+        self.assertTrue(text.startswith('You are X, computer is O\n'))
+        self.assertFalse('You win!' in text)
+
+
+if __name__ == '__main__':
+    unittest.main()
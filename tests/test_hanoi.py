@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import hanoi, search
+from ailab.problems import Hanoi
+
+DAY3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day3_ass3')
+
+
+class TestHanoi(unittest.TestCase):
+
+    def test_csv_matches_day3_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'out.csv')
+            r = hanoi.bfs(3, [0] * 3, [2] * 3, out)
+            with open(out) as a, open(os.path.join(DAY3, '041_Output_Assignment3_SusharHembram.csv')) as b:
+                self.assertEqual(a.read(), b.read())
+        self.assertEqual((len(r.actions), r.expanded), (7, 25))
+
+    def test_max_steps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'out.csv')
+            r = hanoi.bfs(3, [0] * 3, [2] * 3, out, max_steps=10)
+            with open(out) as f:
+                lines = f.read().splitlines()
+        self.assertFalse(r.found)
+        self.assertEqual(len(lines), 12)
+        self.assertTrue(lines[-1].startswith('Max steps (10) reached'))
+
+    def test_paths_against_generic_bfs(self):
+        rnd = random.Random(0)
+        for _ in range(40):
+            n = rnd.randrange(1, 6)
+            start = [rnd.randrange(3) for _ in range(n)]
+            goal = [rnd.randrange(3) for _ in range(n)]
+            h = Hanoi(n, start=start, goal=goal)
+            ref = search.bfs(h)
+            for r in (hanoi.bfs(n, start, goal), hanoi.bidirectional(n, start, goal)):
+                self.assertEqual(len(r.actions), len(ref.actions))
+                self.assertEqual((r.path[0], r.path[-1]), (h.start, h.goal))
+                for s, ns in zip(r.path, r.path[1:]):
+                    self.assertIn(ns, [t for t, _ in h.next_states(s)])
+
+    def test_large_tower(self):
+        r = hanoi.bidirectional(10, [0] * 10, [1] * 10)
+        self.assertEqual(len(r.actions), 2 ** 10 - 1)
+        self.assertEqual(hanoi.Marks(10).a.nbytes, (3 ** 10 + 3) // 4)
+
+    def test_rejects_increasing_stack(self):
+        with self.assertRaises(ValueError):
+            hanoi.config(3, 0, 'increasing')
+        self.assertEqual(hanoi.config(1, 2, 'increasing'), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import npuzzle
+from ailab.npuzzle import Board, Manhattan, PatternDB, ida_star, solvable
+from ailab.problems import NPuzzle
+from ailab.search import bfs
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+INPUT8 = os.path.join(ROOT, 'day4_ass4', '041_Assignment4_Sushar_Hembram_input.txt')
+INPUT15 = os.path.join(ROOT, 'day4_ass4', '041_Assignment4_Sushar_Hembram_15P_input.txt')
+GOAL8 = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+
+def walk(size, goal, n, rnd):
+    bd = Board(size)
+    s = list(goal)
+    for _ in range(n):
+        z = s.index(0)
+        p, _ = rnd.choice(bd.nbrs[z])
+        s[z], s[p] = s[p], s[z]
+    return s
+
+
+class TestNPuzzle(unittest.TestCase):
+
+    def test_solvable(self):
+        self.assertTrue(solvable(3, [1, 2, 3, 4, 5, 6, 7, 0, 8], GOAL8))
+        self.assertFalse(solvable(3, [2, 1, 3, 4, 5, 6, 7, 8, 0], GOAL8))
+        g15 = list(range(1, 16)) + [0]
+        self.assertFalse(solvable(4, list(range(1, 14)) + [15, 14, 0], g15))
+        # moving the blank up one row keeps it solvable on an even board
+        self.assertTrue(solvable(4, list(range(1, 12)) + [0, 13, 14, 15, 12], g15))
+        r = ida_star(3, [2, 1, 3, 4, 5, 6, 7, 8, 0], GOAL8)
+        self.assertFalse(r.found)
+        self.assertEqual(r.expanded, 0)
+
+    def test_linear_conflict(self):
+        m = Manhattan(Board(3), GOAL8)
+        # 2 and 1 swapped in their goal row: Manhattan 2 + conflict 2
+        self.assertEqual(m.initial([2, 1, 3, 4, 5, 6, 7, 8, 0])[0], 4)
+        # 3 2 1: two of the three must leave the row
+        self.assertEqual(npuzzle.line_conflicts([2, 1, 0]), 2)
+
+    def test_optimal_against_bfs(self):
+        rnd = random.Random(0)
+        for _ in range(10):
+            s = walk(3, GOAL8, 40, rnd)
+            r = ida_star(3, s, GOAL8)
+            self.assertEqual(len(r.actions), len(bfs(NPuzzle(3, s, GOAL8)).actions))
+            self.assertEqual(r.path[0], s)
+            self.assertEqual(r.path[-1], GOAL8)
+
+    def test_pattern_databases(self):
+        rnd = random.Random(1)
+        with tempfile.TemporaryDirectory() as tmp:
+            pdb = PatternDB(Board(3), GOAL8, directory=tmp)
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            self.assertEqual(pdb.initial(GOAL8)[0], 0)
+            for _ in range(5):
+                s = walk(3, GOAL8, 40, rnd)
+                self.assertEqual(len(ida_star(3, s, GOAL8, pdb).actions),
+                                 len(ida_star(3, s, GOAL8).actions))
+            # a second load maps the saved tables instead of rebuilding them
+            mtimes = [os.path.getmtime(os.path.join(tmp, f)) for f in sorted(os.listdir(tmp))]
+            PatternDB(Board(3), GOAL8, directory=tmp)
+            self.assertEqual(mtimes, [os.path.getmtime(os.path.join(tmp, f)) for f in sorted(os.listdir(tmp))])
+
+    def test_assignment_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'out.txt')
+            npuzzle.main([INPUT15, out])
+            with open(out) as f:
+                text = f.read()
+            self.assertTrue(text.startswith('Step 0:\n1 2 3 4\n'))
+            self.assertIn('Output State:\n1 2 3 4\n5 6 7 8\n9 10 11 12\n13 14 15 0\n', text)
+            size, start, goal = npuzzle.read_input(INPUT8)
+            r = ida_star(size, start, goal)
+            npuzzle.write_steps_to_file(out, r.path, size, True)
+            with open(out) as f:
+                blocks = f.read().strip().split('\n\n')
+            self.assertEqual(len(blocks), len(r.actions) + 1)
+            self.assertEqual(blocks[-1], 'Output State:\n1 3 2\n4 5 0\n8 7 6')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ailab import onehot
+
+DAY2 = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day2_ass2')
+INPUT = os.path.join(DAY2, 'cancer_demographics.csv')
+
+
+class TestOneHot(unittest.TestCase):
+
+    def test_binary_csv_matches_day2_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for chunksize in (3, onehot.CHUNK):
+                out = os.path.join(tmp, 'binary_data.csv')
+                onehot.read_onehot(INPUT, chunksize).write_csv(out, chunk=4)
+                with open(out) as a, open(os.path.join(DAY2, 'binary_data.csv')) as b:
+                    self.assertEqual(a.read(), b.read())
+
+    def test_matrices_agree(self):
+        oh = onehot.read_onehot(INPUT)
+        dense = oh.to_csr().toarray()
+        self.assertEqual(dense.shape, (10, 17))
+        self.assertTrue((dense.sum(axis=1) == 5).all())
+        self.assertTrue((np.unpackbits(oh.packed(), axis=1)[:, :17] == dense).all())
+        C = onehot.cooccurrence(oh.to_csr()).toarray()
+        self.assertTrue((C == dense.T @ dense).all())
+        self.assertEqual(oh.transactions()[0], ['Gender=Male', 'AgeGroup=30-39', 'FamilyHistory=Yes',
+                                                 'CancerType=Breast', 'Stage=Stage I'])
+
+    def test_graph_and_shortest_path(self):
+        oh = onehot.read_onehot(INPUT)
+        labels = oh.vocab.items
+        C = onehot.cooccurrence(oh.to_csr())
+        G = onehot.graph(C, labels)
+        self.assertEqual(list(G.nodes()), labels)
+        self.assertEqual(G['Gender=Male']['FamilyHistory=Yes']['weight'], 2)
+        self.assertFalse(G.has_edge('Gender=Male', 'Gender=Female'))
+        self.assertEqual(onehot.shortest_path(C, labels, 'Gender=Male', 'Stage=Stage III'),
+                         ['Gender=Male', 'FamilyHistory=Yes', 'Stage=Stage III'])
+        self.assertEqual(onehot.shortest_path(C, labels, 'Gender=Male', 'Gender=Male'), ['Gender=Male'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import unittest
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab.onehot import read_onehot
+from ailab.rules import Miner
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day2_ass2', 'cancer_demographics.csv')
+
+
+def brute_rules(transactions, min_count, min_conf, min_lift):
+    # every rule from every frequent itemset, by counting subsets directly
+    rows = [set(t) for t in transactions]
+    n = len(rows)
+    items = sorted(set().union(*rows))
+
+    def count(s):
+        return sum(1 for r in rows if s <= r)
+    out = set()
+    for k in range(2, len(items) + 1):
+        level = [frozenset(c) for c in combinations(items, k) if count(set(c)) >= min_count]
+        if not level:
+            break
+        for z in level:
+            c = count(z)
+            for j in range(1, k):
+                for a in combinations(sorted(z), j):
+                    conf = c / count(set(a))
+                    q = z - set(a)
+                    if conf >= min_conf and conf * n / count(q) >= min_lift:
+                        out.add((a, tuple(sorted(q))))
+    return out
+
+
+class TestRules(unittest.TestCase):
+
+    def test_demographics(self):
+        oh = read_onehot(INPUT)
+        m = Miner(oh, min_support=0.2)
+        got = {(r.antecedent, r.consequent): r for r in m.rules(0.6, 1.0)}
+        rule = got[(('Stage=Stage II',), ('FamilyHistory=No',))]
+        self.assertEqual((rule.support, rule.confidence, rule.lift), (0.4, 1.0, 2.0))
+        want = brute_rules(oh.transactions(), 2, 0.6, 1.0)
+        self.assertEqual({(tuple(sorted(a)), tuple(sorted(q))) for a, q in got}, want)
+
+    def test_random_transactions(self):
+        rnd = random.Random(0)
+        items = 'abcdefgh'
+        data = [rnd.sample(items, rnd.randrange(1, 6)) for _ in range(60)]
+        m = Miner(data, min_support=0.1)
+        got = {(tuple(sorted(r.antecedent)), tuple(sorted(r.consequent))) for r in m.rules(0.4, 0.0)}
+        self.assertEqual(got, brute_rules(data, 6, 0.4, 0.0))
+        for items, c in Miner(data, min_support=0.1).itemsets():
+            self.assertEqual(c, sum(1 for t in data if set(m.named(items)) <= set(t)))
+
+    def test_pool_matches_serial(self):
+        oh = read_onehot(INPUT)
+        serial = sorted(Miner(oh, 0.1, max_len=3).itemsets())
+        pooled = sorted(Miner(oh, 0.1, max_len=3).itemsets(workers=2))
+        self.assertEqual(serial, pooled)
+        self.assertTrue(all(len(s) <= 3 for s, _ in serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import search
+from ailab.problems import Hanoi, NPuzzle, RiverCrossing
+
+
+def replay(problem, path, actions):
+    # every step of the path must be a legal move with the reported action
+    s = problem.start
+    for a in actions:
+        s = dict((act, ns) for ns, act in problem.next_states(s))[a]
+    return s
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_river_crossing_all_algorithms(self):
+        p = RiverCrossing()
+        kw = {'DLS': {'limit': 7}, 'IDS': {'max_depth': 10}, 'ILS': {'seed': 0}}
+        for name, fn in search.ALGORITHMS.items():
+            r = fn(p, **kw.get(name, {}))
+            self.assertTrue(r.found, name)
+            self.assertEqual(r.path[0], ('L',) * 5)
+            self.assertEqual(r.path[-1], ('R',) * 5)
+            self.assertEqual(replay(p, r.path, r.actions), p.goal, name)
+        self.assertEqual(len(search.bfs(p).actions), 7)
+
+    def test_depth_limit(self):
+        p = RiverCrossing()
+        self.assertFalse(search.dls(p, 6).found)
+        self.assertTrue(search.dls(p, 7).found)
+        self.assertEqual(len(search.ids(p, 20).actions), 7)
+
+    def test_hanoi(self):
+        p = Hanoi(6)
+        r = search.bfs(p)
+        self.assertEqual(len(r.actions), 2 ** 6 - 1)
+        self.assertEqual(r.path[-1], ((), (), (6, 5, 4, 3, 2, 1)))
+        self.assertEqual(replay(p, r.path, r.actions), p.goal)
+        self.assertEqual(len(search.ucs(p).actions), 63)
+
+    def test_npuzzle(self):
+        start, goal = [1, 2, 3, 4, 5, 6, 7, 8, 0], [1, 3, 2, 4, 5, 0, 8, 7, 6]
+        p = NPuzzle(3, start, goal)
+        self.assertEqual(p.decode(p.start), start)
+        r = search.bfs(p)
+        self.assertEqual(r.path[-1], goal)
+        self.assertEqual(replay(p, r.path, r.actions), p.goal)
+        self.assertEqual(len(search.ucs(p).actions), len(r.actions))
+        self.assertGreater(r.rate, 0)
+
+    def test_unreachable(self):
+        # swapping two tiles flips the permutation parity
+        p = NPuzzle(2, [1, 2, 3, 0], [2, 1, 3, 0])
+        r = search.bfs(p)
+        self.assertFalse(r.found)
+        self.assertEqual(r.expanded, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ailab import search
+from ailab.problems import Hanoi, RiverCrossing
+from ailab.trace import Tracer, pretty, read_trace
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'trace')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def lines(self):
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_off_writes_nothing(self):
+        tr = Tracer(self.path, 'off')
+        self.assertFalse(tr)
+        r = search.bfs(RiverCrossing(), trace=tr)
+        tr.close()
+        self.assertTrue(r.found)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_summary_level(self):
+        with Tracer(self.path, 'summary') as tr:
+            r = search.ids(RiverCrossing(), 10, trace=tr)
+        lines = self.lines()
+        self.assertFalse([l for l in lines if l.startswith('Step')])
+        self.assertEqual(sum(l.startswith('depth limit') for l in lines), 8)
+        self.assertIn('found=True moves=7', lines[-1])
+        self.assertEqual(len(r.actions), 7)
+
+    def test_full_text_every_step(self):
+        p = RiverCrossing()
+        with Tracer(self.path, 'full', fmt=p.state_str) as tr:
+            r = search.bfs(p, trace=tr)
+        steps = [l for l in self.lines() if l.startswith('Step')]
+        self.assertEqual(len(steps), r.expanded)
+        self.assertTrue(steps[0].startswith('Step 1: F:L, W:L, G:L, C:L, B:L cost=0'))
+
+    def test_every_and_sample(self):
+        p = Hanoi(6)
+        with Tracer(self.path, 'full', every=10) as tr:
+            r = search.bfs(p, trace=tr)
+        self.assertEqual(tr.logged, r.expanded // 10)
+        with Tracer(self.path, 'full', sample=0.1, seed=1) as tr:
+            r = search.bfs(p, trace=tr)
+        self.assertLess(abs(tr.logged - r.expanded * 0.1), r.expanded * 0.05)
+
+    def test_binary_round_trip(self):
+        p = Hanoi(5)
+        with Tracer(self.path, 'full', binary=True, meta={'problem': 'hanoi:5'}) as tr:
+            r = search.bfs(p, trace=tr)
+            tr.step(0, 1 << 70)   # a state wider than 64 bits
+        recs = list(read_trace(self.path))
+        self.assertEqual(recs[0], {'problem': 'hanoi:5'})
+        steps = [x for x in recs[1:] if x[0] == 'step']
+        self.assertEqual(len(steps), r.expanded + 1)
+        self.assertEqual(steps[0][5], p.start)
+        self.assertEqual(steps[-1][5], 1 << 70)
+        self.assertTrue(recs[-2][1].startswith('summary found=True moves=31'))
+        out = io.StringIO()
+        pretty(self.path, limit=2, out=out)
+        self.assertEqual(out.getvalue().splitlines()[0],
+                         'Step 1: ((5, 4, 3, 2, 1), (), ()) cost=0 depth=0 frontier=0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ailab import tsp
+from ailab.tsp import TSP, Tour, anneal, anneal_many, nearest_neighbour
+
+INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day7_ass7', 'tsp_input.txt')
+
+
+def cities(n, seed=0):
+    return TSP(coords=np.random.default_rng(seed).uniform(0, 1000, (n, 2)))
+
+
+class TestTSP(unittest.TestCase):
+
+    def test_assignment_input(self):
+        inst, start, temp, cooling, iterations = tsp.read_input(INPUT)
+        self.assertEqual((inst.n, start, temp, cooling, iterations), (4, 0, 1000.0, 0.95, 10000))
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'tsp_output.txt')
+            tsp.main([INPUT, out])
+            with open(out) as f:
+                self.assertEqual(f.read(), 'Best Tour: [0, 1, 3, 2]\nBest Cost: 80.00\n')
+
+    def test_rejects_asymmetric_matrix(self):
+        with self.assertRaises(ValueError):
+            TSP(matrix=[[0, 1, 2], [1, 0, 3], [2, 4, 0]])
+
+    def test_move_deltas(self):
+        inst = cities(30)
+        tour = Tour(inst, list(range(30)))
+        rnd = random.Random(0)
+        n = 30
+        for _ in range(2000):
+            before = tour.cost()
+            kind = rnd.randrange(3)
+            i, j = rnd.randrange(n), rnd.randrange(n)
+            if kind == 0:
+                if (j - i) % n in (0, 1, n - 1):
+                    continue
+                delta = tour.two_opt_delta(i, j)
+                tour.two_opt(i, j)
+            elif kind == 1:
+                if i == j:
+                    continue
+                delta = tour.swap_delta(i, j)
+                tour.swap(i, j)
+            else:
+                L = rnd.randrange(1, 4)
+                i = rnd.randrange(1, n - L)
+                if i - 1 <= j <= i + L - 1:
+                    continue
+                delta, rev = tour.or_delta(i, L, j)
+                tour.or_move(i, L, j, rev)
+            self.assertAlmostEqual(tour.cost() - before, delta, places=6)
+            self.assertEqual([tour.pos[c] for c in tour.t], list(range(n)))
+
+    def test_neighbour_lists_keep_nearest_neighbour_tour(self):
+        inst = cities(300)
+        self.assertEqual(nearest_neighbour(inst, 5, inst.neighbours()), nearest_neighbour(inst, 5))
+
+    def test_anneal_improves_and_restarts(self):
+        inst = cities(200)
+        nn = inst.cost(nearest_neighbour(inst, 0))
+        tour, cost = anneal(inst, iterations=20000, seed=1)
+        self.assertEqual(sorted(tour), list(range(200)))
+        self.assertEqual(tour[0], 0)
+        self.assertAlmostEqual(inst.cost(tour), cost)
+        self.assertLess(cost, nn * 0.95)
+        best = anneal_many(inst, restarts=2, workers=2, seed=0, iterations=5000)
+        self.assertEqual(sorted(best[0]), list(range(200)))
+        self.assertEqual(best, anneal_many(inst, restarts=2, workers=1, seed=0, iterations=5000))
+
+
+if __name__ == '__main__':
+    unittest.main()